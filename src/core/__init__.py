@@ -1 +1,34 @@
-# This file makes the config directory a Python package
+"""
+Browser-driven core components.
+Classes are loaded on first access (PEP 562), so importing the package, or
+anything that only needs the project builder, never pulls in Selenium.
+"""
+
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'BraveController': 'brave_controller',
+    'CodeGenerator': 'code_generator',
+    'PromptEnhancer': 'prompt_enhancer',
+    'ProviderAdapter': 'providers',
+    'load_providers': 'providers',
+    'ProviderRace': 'provider_race',
+    'ShardedGenerator': 'sharded_generation',
+    'JobScheduler': 'scheduler',
+    'QuotaExceeded': 'scheduler',
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -8,13 +8,18 @@ import time
 import subprocess
 import platform
 import socket
-import requests
-import shutil
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from utils.selector_cache import SelectorCache
+from utils.metrics import STAGE_SECONDS, SELECTOR_LOOKUPS, CACHE_REQUESTS
+from utils.webdriver_profiler import WebDriverProfiler
+from utils.stage_history import StageHistory, AdaptivePoll
+from contextlib import nullcontext
+from urllib.parse import urlparse
 
 class BraveController:
     def __init__(self, config, logger):
@@ -23,9 +28,14 @@ class BraveController:
         self.driver = None
         self.original_tabs = []
         self.debug_port = config['browser']['debug_port']
+        self.selector_cache = SelectorCache(config.get('selector_cache', {}).get('path'))
+        self.session_state = {}
+        self.profiler = None
+        self.stage_history = None
         
     def connect_to_browser(self):
         """Connect to existing Brave browser or launch with user's profile"""
+        connect_start = time.time()
         try:
             # First, ensure all Brave processes are closed
             self._close_brave_instances()
@@ -50,6 +60,8 @@ class BraveController:
             self.logger.error(f"Browser connection failed: {e}")
             print(f"  ❌ Connection error: {e}")
             return False
+        finally:
+            STAGE_SECONDS.observe(time.time() - connect_start, stage='browser_connect')
 
     def _close_brave_instances(self):
         """Close all Brave instances"""
@@ -69,25 +81,16 @@ class BraveController:
             self.logger.warning(f"Error closing Brave instances: {e}")
 
     def _get_user_profile_paths(self):
-        """Get the correct paths for user's Brave profile"""
+        """Get the correct paths for user's Brave profile (browser.binary_paths / profile_paths in settings)"""
         system = platform.system().lower()
-        
-        if system == "darwin":  # macOS
-            binary_path = "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
-            # Parent directory (NOT the Default folder itself)
-            profile_parent = os.path.expanduser("~/Library/Application Support/BraveSoftware/Brave-Browser")
-            profile_directory = "Default"  # The actual profile folder name
-            
-        elif system == "windows":
-            binary_path = "C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe"
-            profile_parent = os.path.expanduser("~/AppData/Local/BraveSoftware/Brave-Browser/User Data")
-            profile_directory = "Default"
-            
-        else:  # Linux
-            binary_path = "/usr/bin/brave-browser"
-            profile_parent = os.path.expanduser("~/.config/BraveSoftware/Brave-Browser")
-            profile_directory = "Default"
-        
+        platform_key = {'darwin': 'mac', 'windows': 'windows'}.get(system, 'linux')
+        browser = self.config['browser']
+
+        binary_path = browser['binary_paths'][platform_key]
+        # Parent directory (NOT the Default folder itself)
+        profile_parent = os.path.expanduser(browser['profile_paths'][platform_key])
+        profile_directory = browser.get('profile_directory', 'Default')  # The actual profile folder name
+
         return binary_path, profile_parent, profile_directory
 
     def _launch_brave_with_user_profile(self):
@@ -155,7 +158,8 @@ class BraveController:
             sock.close()
             
             if result == 0:
-                # Test HTTP endpoint
+                # Test HTTP endpoint (requests is only needed here, so it is imported here)
+                import requests
                 response = requests.get(f'http://localhost:{self.debug_port}/json', timeout=5)
                 if response.status_code == 200:
                     return True
@@ -182,6 +186,7 @@ class BraveController:
             
             print("  🔗 Connecting to Brave with your profile...")
             self.driver = webdriver.Chrome(options=options)
+            self._start_profiler()
             
             # Store original tabs
             self.original_tabs = list(self.driver.window_handles)
@@ -201,12 +206,25 @@ class BraveController:
         try:
             self.driver.execute_script("window.open();")
             self.driver.switch_to.window(self.driver.window_handles[-1])
+            site = urlparse(url).hostname or 'local'
+            timeout = self.config['timeouts']['page_load']
+            # Only for logging: a hard cut at the p99 of past loads would never record the slow ones
+            usual = self.adaptive_deadline(site, 'page_load', timeout, floor=5)
+            load_start = time.time()
             self.driver.get(url)
             
             # Wait for page load
-            WebDriverWait(self.driver, self.config['timeouts']['page_load']).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
+            try:
+                WebDriverWait(self.driver, timeout).until(
+                    lambda driver: driver.execute_script("return document.readyState") == "complete"
+                )
+            except TimeoutException:
+                self.record_stage(site, 'page_load', time.time() - load_start, outcome='timeout')
+                raise
+            elapsed = time.time() - load_start
+            if elapsed > usual:
+                self.logger.debug(f"Slow page load for {site}: {elapsed:.1f}s (usually under {usual:.0f}s)")
+            self.record_stage(site, 'page_load', elapsed)
             
             return True
             
@@ -214,6 +232,30 @@ class BraveController:
             self.logger.error(f"Failed to open new tab: {e}")
             return False
 
+    def open_background_tab(self, url):
+        """Open URL in a new tab without switching to it; returns the tab handle"""
+        try:
+            existing = set(self.driver.window_handles)
+            self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+            new_handles = [h for h in self.driver.window_handles if h not in existing]
+            return new_handles[-1] if new_handles else None
+        except Exception as e:
+            self.logger.error(f"Failed to open background tab: {e}")
+            return None
+
+    def switch_to_tab(self, handle, wait_for_load=True):
+        """Switch to an existing tab, optionally waiting for its page to finish loading"""
+        try:
+            self.driver.switch_to.window(handle)
+            if wait_for_load:
+                WebDriverWait(self.driver, self.config['timeouts']['page_load']).until(
+                    lambda driver: driver.execute_script("return document.readyState") == "complete"
+                )
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to switch tab: {e}")
+            return False
+
     def find_element_safe(self, selector, timeout=None):
         """Safely find element with timeout"""
         if timeout is None:
@@ -225,9 +267,52 @@ class BraveController:
             )
             return element
         except Exception as e:
-            self.logger.warning(f"Element not found: {selector} - {e}")
+            self.logger.warning(f"Element not found: {selector} - {e}", extra={'expected_miss': True})
             return None
 
+    def get_session_state(self, key, ttl):
+        """Cached value for this browser session if younger than ttl seconds"""
+        if not self.driver:
+            return None
+        entry = self.session_state.get((self.driver.session_id, key))
+        if entry and time.time() - entry['stored_at'] < ttl:
+            return entry['value']
+        return None
+
+    def set_session_state(self, key, value):
+        """Cache a value (e.g. login status) for the current browser session"""
+        if self.driver:
+            self.session_state[(self.driver.session_id, key)] = {'value': value, 'stored_at': time.time()}
+
+    def find_with_cache(self, site, group, selectors, accept=None):
+        """
+        Probe selectors in the order learned for this site and return
+        (element, selector) for the first element accepted, or (None, None)
+        """
+        for position, selector in enumerate(self.selector_cache.order(site, group, selectors)):
+            start = time.perf_counter()
+            try:
+                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+            except Exception:
+                elements = []
+            
+            for element in elements:
+                try:
+                    if accept is None or accept(element):
+                        self.selector_cache.record_hit(site, group, selector, time.perf_counter() - start)
+                        SELECTOR_LOOKUPS.inc(site=site, group=group, result='hit')
+                        # A cache hit means the first selector probed (the learned winner) matched
+                        CACHE_REQUESTS.inc(cache='selector', result='hit' if position == 0 else 'miss')
+                        return element, selector
+                except Exception:
+                    continue
+            
+            self.selector_cache.record_miss(site, group, selector)
+            SELECTOR_LOOKUPS.inc(site=site, group=group, result='miss')
+        
+        CACHE_REQUESTS.inc(cache='selector', result='miss')
+        return None, None
+
     def cleanup_automation_tabs(self):
         """Close tabs created during automation"""
         try:
@@ -248,9 +333,69 @@ class BraveController:
         except Exception as e:
             self.logger.error(f"Tab cleanup failed: {e}")
 
+    def _history(self):
+        """Shared StageHistory, opened on first use; None when adaptive timeouts are off"""
+        settings = self.config.get('adaptive', {})
+        if not settings.get('enabled'):
+            return None
+        if self.stage_history is None:
+            self.stage_history = StageHistory(
+                settings.get('history_path'), settings.get('min_samples', 5), settings.get('margin', 1.5)
+            )
+        return self.stage_history
+
+    def adaptive_deadline(self, provider, stage, default, size=None, floor=0):
+        """Deadline from the recorded p99 of this provider/stage/size, or the static default"""
+        history = self._history()
+        if history is None:
+            return default
+        deadline = history.deadline(provider, stage, default, size, floor)
+        if deadline != default:
+            self.logger.debug(f"Adaptive deadline {provider}/{stage}: {deadline:.0f}s (static {default}s)")
+        return deadline
+
+    def record_stage(self, provider, stage, seconds, size=None, outcome='ok'):
+        history = self._history()
+        if history is not None:
+            history.record(provider, stage, seconds, size, outcome)
+
+    def new_poll(self, fixed_interval):
+        """Adaptive poll interval, or a fixed one when adaptive timeouts are off"""
+        settings = self.config.get('adaptive', {})
+        if settings.get('enabled'):
+            return AdaptivePoll(settings.get('poll_min', 1.0), settings.get('poll_max', 6.0))
+        return AdaptivePoll(fixed_interval, fixed_interval)
+
+    def _start_profiler(self):
+        """Wrap the driver with the round-trip profiler when profiling is enabled"""
+        settings = self.config.get('profiling', {})
+        if settings.get('enabled'):
+            self.profiler = WebDriverProfiler(
+                self.driver, self.logger, settings.get('budgets'), settings.get('budget_mode', 'warn')
+            ).install()
+            print("  🔬 WebDriver profiling enabled")
+
+    def round_trip_budget(self, name):
+        """Context manager counting WebDriver round trips of one code path against its budget"""
+        return self.profiler.budget(name) if self.profiler else nullcontext()
+
+    def report_profile(self):
+        """Print the top WebDriver offenders and save the full breakdown"""
+        if not self.profiler:
+            return None
+        print(self.profiler.report())
+        path = self.profiler.write_report(self.config.get('profiling', {}).get('report_dir', 'logs'))
+        print(f"  🔬 WebDriver profile written to {path}")
+        return path
+
     def cleanup(self):
         """Clean up browser resources but keep user's browser open"""
         try:
+            self.selector_cache.save(force=True)
+            self.report_profile()
+            if self.stage_history:
+                self.stage_history.close()
+                self.stage_history = None
             if self.driver:
                 self.cleanup_automation_tabs()
                 # Don't quit the driver - let user keep their browser open
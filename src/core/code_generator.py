@@ -4,14 +4,141 @@ FINAL VERSION - Handles contenteditable inputs properly and saves complete respo
 """
 
 import time
-import os
-from datetime import datetime
+import uuid
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
 import re
+from urllib.parse import urlparse
+from utils.response_archive import ResponseArchive
+from utils.metrics import STAGE_SECONDS, RETRIES, CACHE_REQUESTS
+from utils.webdriver_profiler import RoundTripBudgetExceeded
+from core.providers import load_providers, DEFAULT_PROVIDERS
+from core.provider_race import ProviderRace
+from core.sharded_generation import ShardedGenerator
+from core.scheduler import backoff_delay, REMAINING_PATTERN
+from tools.phase2_complete_project_builder import parse_code_components
+from tools.component_checks import is_truncated, check_component, continuation_code, stitch
+
+LOGIN_CACHE_TTL = 900
+
+SESSION_COOKIE_NAMES = {
+    '__Secure-next-auth.session-token',
+    'next-auth.session-token'
+}
+
+LOGIN_USER_SELECTORS = [
+    "[data-testid*='user']",
+    "[data-testid*='profile']",
+    ".user-menu",
+    ".profile-menu",
+    ".user-avatar",
+    "button[aria-label*='user' i]",
+    ".logged-in",
+    ".authenticated"
+]
+
+LOGIN_PHRASES = {
+    'logged_in': ["sign out", "logout", "my account"],
+    'pro': ["pro search", "unlimited", "pro plan", "premium"],
+    'limit': ["searches remaining", "search limit"]
+}
+
+LOGIN_PROBE_SCRIPT = """
+var selectors = arguments[0], phrases = arguments[1], remainingPattern = new RegExp(arguments[2], 'i');
+var userSelector = null;
+for (var i = 0; i < selectors.length; i++) {
+    try {
+        if (document.querySelector(selectors[i])) { userSelector = selectors[i]; break; }
+    } catch (e) {}
+}
+var text = ((document.body && document.body.innerText) || '').toLowerCase();
+function anyOf(list) {
+    for (var j = 0; j < list.length; j++) { if (text.indexOf(list[j]) !== -1) return true; }
+    return false;
+}
+return {
+    user_selector: userSelector,
+    logged_in_text: anyOf(phrases.logged_in),
+    pro_text: anyOf(phrases.pro),
+    limit_text: anyOf(phrases.limit),
+    remaining: (function () { var m = text.match(remainingPattern); return m ? parseInt(m[1], 10) : null; })()
+};
+"""
+
+PAGE_SETTLE_SECONDS = 8
+MAX_CONTINUATIONS = 3
+CONTINUATION_STABLE_SECONDS = 9
+
+# Text of the most recent answer block only, so a follow-up is not mixed with earlier answers
+LAST_ANSWER_SCRIPT = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var nodes = document.querySelectorAll(selectors[i]);
+    if (nodes.length) return nodes[nodes.length - 1].innerText || '';
+}
+return '';
+"""
+STREAM_QUIET_MS = 2000
+
+GENERATION_STOP_SELECTORS = [
+    "button[aria-label*='stop' i]",
+    "button[data-testid*='stop']",
+    "[data-testid='stop-generating-response-button']"
+]
+
+GENERATION_INDICATORS = [
+    "[data-testid*='loading']",
+    "[data-testid*='generating']",
+    "[data-testid*='thinking']",
+    ".loading",
+    ".spinner",
+    ".generating",
+    ".thinking",
+    "[aria-label*='loading' i]",
+    "[aria-label*='generating' i]",
+    "[class*='loading']",
+    "[class*='spinner']",
+    "[class*='generating']"
+]
+
+# Generation state from UI signals only (stop button, aria-busy, loading
+# indicators, recent DOM mutations) - never from the page text, which may
+# itself contain words like "loading" inside the generated code.
+GENERATION_STATE_SCRIPT = """
+var stopSelectors = arguments[0], indicators = arguments[1], quietMs = arguments[2];
+var state = window.__llmStreamState;
+if (!state) {
+    state = window.__llmStreamState = {lastMutation: 0};
+    try {
+        new MutationObserver(function () { state.lastMutation = Date.now(); })
+            .observe(document.body, {childList: true, subtree: true, characterData: true});
+    } catch (e) {}
+}
+function visible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function anyVisible(selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        try {
+            var nodes = document.querySelectorAll(selectors[i]);
+            for (var j = 0; j < nodes.length; j++) { if (visible(nodes[j])) return true; }
+        } catch (e) {}
+    }
+    return false;
+}
+if (anyVisible(stopSelectors)) return {generating: true, signal: 'stop_button'};
+if (document.querySelector("main [aria-busy='true'], [role='article'][aria-busy='true']")) {
+    return {generating: true, signal: 'aria_busy'};
+}
+if (anyVisible(indicators)) return {generating: true, signal: 'indicator'};
+if (state.lastMutation && Date.now() - state.lastMutation < quietMs) {
+    return {generating: true, signal: 'stream'};
+}
+return {generating: false, signal: null};
+"""
 
 class CodeGenerator:
     def __init__(self, brave_controller, config, logger):
@@ -19,18 +146,103 @@ class CodeGenerator:
         self.config = config
         self.logger = logger
         self.perplexity_url = config['urls']['perplexity']
+        self.site = urlparse(self.perplexity_url).hostname
+        self.archive = ResponseArchive(config.get('archive', {}).get('directory'))
+        self.job_id = None
+        self.last_capture_id = None
+        self.prepared_tab = None
+        self.prepared_input = None
+        self.warm_up_started = None
+        self.race_providers = config.get('generation', {}).get('race_providers', [])
+        self.shard_count = config.get('generation', {}).get('shards', 0)
+        self.last_provider = None
+        self.quota_remaining = None
+        self.quota_after_answer = None  # Searches remaining as shown once the last answer was in
+        self.last_error = None
+        retry = config.get('scheduler', {})
+        self.backoff_base = retry.get('backoff_base', 2.0)
+        self.backoff_cap = retry.get('backoff_cap', 30.0)
+
+    def _retry_pause(self, attempt, reason):
+        """Exponential backoff with jitter between attempts instead of fixed sleeps"""
+        RETRIES.inc(reason=reason)
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        print(f"  ⏳ Retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+    def warm_up(self):
+        """Start loading Perplexity in a background tab so it is ready when the prompt is"""
+        self.prepared_input = None
+        self.prepared_tab = self.brave.open_background_tab(self.perplexity_url)
+        if self.prepared_tab:
+            self.warm_up_started = time.time()
+            print("  🔥 Warming up Perplexity in a background tab...")
+        return self.prepared_tab is not None
+
+    def prepare_input(self):
+        """
+        Locate and focus the Perplexity input in the warmed-up tab, then return
+        to the tab we came from. Meant to run while another tab is busy.
+        """
+        if not self.prepared_tab or self.prepared_input:
+            return bool(self.prepared_input)
+        
+        original_tab = self.brave.driver.current_window_handle
+        try:
+            if not self.brave.switch_to_tab(self.prepared_tab):
+                return False
+            self._comprehensive_login_check()
+            self.prepared_input = self._find_input_bulletproof(attempts=1)
+            if self.prepared_input:
+                print("  🔥 Perplexity input ready in background tab")
+            return self.prepared_input is not None
+        except Exception as e:
+            self.logger.warning(f"Perplexity warm-up failed: {e}")
+            return False
+        finally:
+            try:
+                self.brave.driver.switch_to.window(original_tab)
+            except Exception:
+                pass
+
+    def _open_perplexity(self):
+        """Switch to the warmed-up tab if there is one, otherwise open and load a fresh tab"""
+        prepared_tab, self.prepared_tab = self.prepared_tab, None
+        if prepared_tab and self.brave.switch_to_tab(prepared_tab):
+            # Only wait out whatever part of the load time the warm-up did not cover
+            remaining = PAGE_SETTLE_SECONDS - (time.time() - self.warm_up_started)
+            if remaining > 0 and not self.prepared_input:
+                time.sleep(remaining)
+            print("  ⚡ Using pre-warmed Perplexity tab")
+            return True
+        
+        self.prepared_input = None
+        if not self.brave.open_new_tab(self.perplexity_url):
+            return False
+        
+        print("  ⏳ Waiting for page to fully load...")
+        time.sleep(PAGE_SETTLE_SECONDS)
+        return True
 
-    def generate_code(self, user_prompt):
-        """Generate code and save complete response to file - BULLETPROOF VERSION"""
+    def generate_code(self, user_prompt, job_id=None):
+        """Generate code and archive the complete response - BULLETPROOF VERSION"""
         try:
+            self.job_id = job_id or uuid.uuid4().hex[:12]
+            self.last_capture_id = None
+            self.last_provider = None
+            self.last_error = None
+            self.quota_after_answer = None
+            
+            if self.shard_count > 1:
+                return self._generate_sharded(user_prompt)
+            if len(self.race_providers) > 1:
+                return self._generate_with_race(user_prompt)
+            
             print("  🌐 Opening Perplexity Pro...")
             
-            if not self.brave.open_new_tab(self.perplexity_url):
+            if not self._open_perplexity():
                 return None
             
-            print("  ⏳ Waiting for page to fully load...")
-            time.sleep(8)
-            
             # Check login status
             is_logged_in, is_pro = self._comprehensive_login_check()
             if is_logged_in and is_pro:
@@ -39,26 +251,85 @@ class CodeGenerator:
                 print("  ✅ Logged in to Perplexity")
             else:
                 print("  ⚠️ Login status unclear - proceeding anyway")
+            if self.quota_remaining == 0:
+                print("  🚫 No searches remaining on this account")
+                self.last_error = 'quota'
+                return None
             
             # Create the COMPLETE combined prompt - NO SEPARATION
             final_prompt = self._create_complete_unified_prompt(user_prompt)
             
             # Send the UNIFIED prompt and get response
-            generated_response = self._send_unified_prompt_and_capture(final_prompt)
+            generated_response = self._send_unified_prompt_and_capture(final_prompt, user_prompt)
             
             if generated_response:
                 print("  🎉 Response collected and saved successfully!")
                 print(f"  📏 Collected {len(generated_response)} characters")
+                self.quota_after_answer = self._read_quota_remaining()
                 return generated_response
             else:
                 print("  ❌ Failed to collect response")
                 return None
                 
+        except RoundTripBudgetExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"Code generation failed: {e}")
             print(f"  ❌ Generation error: {e}")
             return None
 
+    def _discard_prepared_tab(self):
+        """
+        Parallel modes open their own tabs; a warmed-up Perplexity tab would only sit idle.
+        Closes it and leaves the driver on a live tab (the one we were on, or any other).
+        """
+        if not self.prepared_tab:
+            return
+        prepared_tab, self.prepared_tab, self.prepared_input = self.prepared_tab, None, None
+        driver = self.brave.driver
+        try:
+            original_tab = driver.current_window_handle
+        except WebDriverException:
+            original_tab = None
+        try:
+            if self.brave.switch_to_tab(prepared_tab, wait_for_load=False):
+                driver.close()
+        except WebDriverException as e:
+            self.logger.warning(f"Could not close warm-up tab: {e}")
+        remaining = driver.window_handles
+        if remaining:
+            driver.switch_to.window(original_tab if original_tab in remaining else remaining[0])
+
+    def _generate_sharded(self, user_prompt):
+        """Plan the components, generate them in parallel shards and archive the merged answer"""
+        self._discard_prepared_tab()
+        provider_name = (self.race_providers or ['perplexity'])[0]
+        provider = load_providers(self.config, [provider_name])[provider_name]
+        sharded = ShardedGenerator(self.brave, self.config, self.logger, provider,
+                                   shard_count=self.shard_count)
+        content = sharded.generate(user_prompt)
+        if not content:
+            return None
+        
+        self.last_provider = provider_name
+        self._save_complete_response(content, user_prompt, source=provider.url)
+        return content
+
+    def _generate_with_race(self, user_prompt):
+        """Send the prompt to every configured provider and keep the first valid answer"""
+        self._discard_prepared_tab()
+        providers = load_providers(self.config, self.race_providers)
+        race = ProviderRace(self.brave, self.config, self.logger, list(providers.values()))
+        final_prompt = self._create_complete_unified_prompt(user_prompt)
+        provider_name, answer = race.run(final_prompt)
+        if not answer:
+            return None
+        
+        self.last_provider = provider_name
+        self._save_complete_response(answer, user_prompt, source=providers[provider_name].url)
+        print(f"  📏 Collected {len(answer)} characters from {provider_name}")
+        return answer
+
     def _create_complete_unified_prompt(self, user_prompt):
         """Create ONE unified prompt - user request + instructions seamlessly combined"""
         
@@ -69,7 +340,7 @@ class CodeGenerator:
         print(f"  📝 Preview: {unified_prompt[:100]}...")
         return unified_prompt
 
-    def _send_unified_prompt_and_capture(self, unified_prompt):
+    def _send_unified_prompt_and_capture(self, unified_prompt, user_prompt=None):
         """Send the unified prompt and capture complete response"""
         max_attempts = 3
         
@@ -77,12 +348,12 @@ class CodeGenerator:
             try:
                 print(f"  🔄 Attempt {attempt + 1}/{max_attempts}")
                 
-                # Find input
-                input_element = self._find_input_bulletproof()
+                # Find input (the warm-up may already have located it)
+                input_element = self._take_prepared_input() or self._find_input_bulletproof()
                 if not input_element:
                     print(f"  ❌ Could not find input field on attempt {attempt + 1}")
                     if attempt < max_attempts - 1:
-                        time.sleep(5)
+                        self._retry_pause(attempt, 'input_not_found')
                         continue
                     return None
                 
@@ -91,32 +362,44 @@ class CodeGenerator:
                 if not success:
                     print(f"  ❌ Failed to send unified prompt on attempt {attempt + 1}")
                     if attempt < max_attempts - 1:
-                        time.sleep(5)
+                        self._retry_pause(attempt, 'send_failed')
                         continue
                     return None
                 
                 # Capture complete response
-                response = self._capture_complete_response()
+                response = self._capture_complete_response(user_prompt, len(unified_prompt))
                 if response:
-                    return response
+                    return self._complete_truncated_components(response, user_prompt)
                 
                 if attempt < max_attempts - 1:
                     print(f"  🔄 No response received, retrying...")
-                    time.sleep(10)
+                    self._retry_pause(attempt + 1, 'no_response')
                     
             except Exception as e:
                 print(f"  ⚠️ Attempt {attempt + 1} failed: {e}")
                 if attempt < max_attempts - 1:
-                    time.sleep(5)
+                    self._retry_pause(attempt, 'error')
                     continue
         
         return None
 
-    def _find_input_bulletproof(self):
+    def _take_prepared_input(self):
+        """Hand out the input located during warm-up once, if it is still attached and usable"""
+        element, self.prepared_input = self.prepared_input, None
+        if element is None:
+            return None
+        try:
+            if element.is_displayed() and element.is_enabled():
+                return element
+        except Exception:
+            pass
+        return None
+
+    def _find_input_bulletproof(self, attempts=5):
         """Bulletproof input finding"""
-        for retry in range(5):
+        for retry in range(attempts):
             try:
-                print(f"    🔍 Looking for input field (attempt {retry + 1}/5)")
+                print(f"    🔍 Looking for input field (attempt {retry + 1}/{attempts})")
                 
                 WebDriverWait(self.brave.driver, 15).until(
                     lambda driver: driver.execute_script("return document.readyState") == "complete"
@@ -133,27 +416,14 @@ class CodeGenerator:
                     "[role='textbox']"
                 ]
                 
-                for selector in selectors:
-                    try:
-                        elements = self.brave.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for element in elements:
-                            if (element.is_displayed() and element.is_enabled() and
-                                element.size['height'] > 10 and element.size['width'] > 50):
-                                
-                                # Test if we can interact with it
-                                try:
-                                    self.brave.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                                    time.sleep(1)
-                                    element.click()
-                                    time.sleep(0.5)
-                                    print(f"    ✅ Found working input: {selector}")
-                                    return element
-                                except:
-                                    continue
-                    except:
-                        continue
+                element, selector = self.brave.find_with_cache(
+                    self.site, 'prompt_input', selectors, accept=self._is_usable_input
+                )
+                if element:
+                    print(f"    ✅ Found working input: {selector}")
+                    return element
                 
-                if retry < 4:
+                if retry < attempts - 1:
                     print(f"    ⏳ No input found, waiting...")
                     time.sleep(4)
                 
@@ -164,6 +434,22 @@ class CodeGenerator:
         print("    ❌ Could not find input field")
         return None
 
+    def _is_usable_input(self, element):
+        """Visible, enabled, reasonably sized and accepts a click"""
+        if not (element.is_displayed() and element.is_enabled() and
+                element.size['height'] > 10 and element.size['width'] > 50):
+            return False
+        
+        # Test if we can interact with it
+        try:
+            self.brave.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+            time.sleep(1)
+            element.click()
+            time.sleep(0.5)
+            return True
+        except Exception:
+            return False
+
     def _send_prompt_bulletproof(self, element, prompt):
         """Bulletproof prompt sending - tries multiple methods"""
         
@@ -295,84 +581,109 @@ class CodeGenerator:
             print(f"    ❌ Actions method failed: {e}")
             return False
 
-    def _capture_complete_response(self):
+    def _capture_complete_response(self, user_prompt=None, prompt_size=None):
         """ENHANCED: Wait until Perplexity completely finishes responding before saving"""
+        with STAGE_SECONDS.time(stage='generation_wait'):
+            return self._wait_for_complete_response(user_prompt, prompt_size)
+
+    def _wait_for_complete_response(self, user_prompt=None, prompt_size=None):
         try:
             print("  ⏳ Waiting for Perplexity to completely finish responding...")
             
-            # Enhanced parameters for better stability detection
-            max_wait = 600  # 10 minutes total wait time
-            check_interval = 3  # Check every 3 seconds
+            timeouts = self.config['timeouts']
+            max_wait = timeouts['capture_max']  # Hard ceiling, even while content keeps growing
+            stable_seconds = timeouts['stable_seconds']  # Content unchanged this long = finished
+            # Past the p99 of earlier answers to prompts this size, stop unless content is still moving
+            deadline = self.brave.adaptive_deadline(
+                'perplexity', 'answer', max_wait - stable_seconds, prompt_size, floor=timeouts['response_wait']
+            ) + stable_seconds
+            poll = self.brave.new_poll(3)
             start_time = time.time()
             
+            current_content = None
             last_content = ""
             last_length = 0
-            stable_count = 0
-            required_stable_checks = 12  # Must be stable for 12 consecutive checks (36 seconds)
+            last_change = start_time
+            still_generating_checked = False
             min_content_length = 5000  # Minimum content length to consider complete
             
-            print(f"  📊 Stability requirements: {required_stable_checks} consecutive stable checks")
+            print(f"  📊 Stability requirement: {stable_seconds:.0f}s unchanged (give up after {deadline:.0f}s idle)")
             
             while time.time() - start_time < max_wait:
+                changed = False
                 try:
                     # Get ALL page content with enhanced extraction
-                    current_content = self._get_all_page_content()
+                    with self.brave.round_trip_budget('capture_poll'):
+                        current_content = self._get_all_page_content()
                     current_length = len(current_content) if current_content else 0
+                    now = time.time()
                     
                     if current_content and current_length > min_content_length:
                         # Check if content has stabilized (no changes)
                         if current_content == last_content and current_length == last_length:
-                            stable_count += 1
-                            print(f"  📊 Content stable: {stable_count}/{required_stable_checks} ({current_length:,} chars)")
+                            stable_for = now - last_change
+                            self.logger.debug(f"Content stable for {stable_for:.0f}s/{stable_seconds:.0f}s ({current_length:,} chars)")
                             
                             # Additional check: make sure we're not still generating
-                            if stable_count >= 6:  # After some stability, double-check
+                            if stable_for >= stable_seconds / 2 and not still_generating_checked:
+                                still_generating_checked = True
                                 if self._is_still_generating():
-                                    print("  🔄 Still actively generating, resetting stability counter")
-                                    stable_count = 0
+                                    self.logger.debug("Still actively generating, resetting stability timer")
+                                    last_change = now
+                                    changed = True
                                     
                             # If we've been stable long enough, we're done!
-                            if stable_count >= required_stable_checks:
+                            if not changed and stable_for >= stable_seconds:
                                 print(f"  ✅ Content fully stabilized at {current_length:,} characters")
-                                print(f"  ⏰ Total wait time: {time.time() - start_time:.1f} seconds")
+                                print(f"  ⏰ Total wait time: {now - start_time:.1f} seconds")
+                                self.brave.record_stage('perplexity', 'answer', last_change - start_time, prompt_size)
                                 
                                 # Save the complete response
-                                saved_path = self._save_complete_response(current_content)
-                                if saved_path:
-                                    print(f"  💾 Complete response saved to: {saved_path}")
+                                capture_id = self._save_complete_response(current_content, user_prompt)
+                                if capture_id:
+                                    print(f"  💾 Complete response archived as capture {capture_id}")
                                 
                                 return current_content
                         else:
-                            # Content changed, reset counter
+                            # Content changed, restart the stability timer
                             if current_length > last_length:
                                 growth = current_length - last_length
-                                print(f"  📈 Content growing: {current_length:,} chars (+{growth:,})")
+                                self.logger.debug(f"Content growing: {current_length:,} chars (+{growth:,})")
                             elif current_length < last_length:
-                                print(f"  📉 Content changed: {current_length:,} chars")
+                                self.logger.debug(f"Content changed: {current_length:,} chars")
                                 
-                            stable_count = 0
+                            changed = True
+                            last_change = now
+                            still_generating_checked = False
                             last_content = current_content
                             last_length = current_length
                     else:
-                        print(f"  ⏳ Waiting for substantial content... ({current_length:,} chars)")
-                        stable_count = 0
+                        self.logger.debug(f"Waiting for substantial content ({current_length:,} chars)")
+                        if current_length != last_length:
+                            changed = True
+                            last_change = now
+                            last_length = current_length
                     
-                    # Check if still loading/generating
-                    if self._is_still_generating():
-                        print("  🔄 Still generating content...")
+                    if now - start_time > deadline and now - last_change > stable_seconds:
+                        print(f"  ⏰ No progress past the usual answer time ({deadline:.0f}s)")
+                        break
                     
-                    time.sleep(check_interval)
+                    # Poll quickly while tokens stream, back off while idle
+                    poll.sleep(changed)
                     
+                except RoundTripBudgetExceeded:
+                    raise
                 except Exception as e:
-                    print(f"  ⚠️ Content monitoring error: {e}")
-                    time.sleep(check_interval)
-            
-            print(f"  ⏰ Maximum wait time reached ({max_wait} seconds)")
+                    self.logger.debug(f"Content monitoring error: {e}", extra={'expected_miss': True})
+                    poll.sleep(False)
+            else:
+                print(f"  ⏰ Maximum wait time reached ({max_wait:.0f} seconds)")
+            self.brave.record_stage('perplexity', 'answer', time.time() - start_time, prompt_size, outcome='timeout')
             
             # Save whatever we have as final attempt
             if current_content and len(current_content) > 1000:
-                saved_path = self._save_complete_response(current_content)
-                print(f"  💾 Final response saved: {saved_path}")
+                capture_id = self._save_complete_response(current_content, user_prompt)
+                print(f"  💾 Final response archived as capture {capture_id}")
                 return current_content
             
             print("  ❌ No substantial content captured")
@@ -383,6 +694,81 @@ class CodeGenerator:
             print(f"  ❌ Response capture failed: {e}")
             return None
 
+    def _complete_truncated_components(self, response, user_prompt=None):
+        """
+        Ask for the rest of any component that stops mid-way (unbalanced
+        brackets or JSX) in the same thread and stitch it in, instead of
+        regenerating the whole answer. Returns the (possibly) completed response.
+        """
+        completed = response
+        requests = 0
+        seen = set()
+        for component in parse_code_components(response):
+            if requests >= MAX_CONTINUATIONS:
+                break
+            # The page text can repeat the answer; each file is continued at most once
+            if component['file_path'] in seen or not is_truncated(component['code'], component['file_path']):
+                continue
+            seen.add(component['file_path'])
+            
+            requests += 1
+            file_path = component['file_path']
+            print(f"  ✂️ {file_path} is cut off ({'; '.join(check_component(component['code'], file_path))})")
+            answer = self._request_continuation(file_path)
+            if not answer:
+                print(f"  ⚠️ No continuation received for {file_path}")
+                continue
+            
+            stitched = stitch(component['code'], continuation_code(answer, file_path))
+            if component['code'] in completed:
+                completed = completed.replace(component['code'], stitched, 1)
+            else:
+                completed += f"\n\n// Component: {component['name']}\n// File: {file_path}\n{stitched}\n"
+            state = 'complete' if not is_truncated(stitched, file_path) else 'still incomplete'
+            print(f"  🧵 Stitched continuation into {file_path} ({state})")
+        
+        if completed != response:
+            capture_id = self._save_complete_response(completed, user_prompt)
+            if capture_id:
+                print(f"  💾 Completed response archived as capture {capture_id}")
+        return completed
+
+    def _request_continuation(self, file_path):
+        """Send a follow-up in the current thread and return the text of the new answer"""
+        answer_selectors = DEFAULT_PROVIDERS['perplexity']['answer_selectors']
+        previous = self.brave.driver.execute_script(LAST_ANSWER_SCRIPT, answer_selectors)
+        
+        input_element = self._find_input_bulletproof(attempts=2)
+        if not input_element:
+            return None
+        prompt = (f"Your previous answer was cut off inside // File: {file_path}. Continue exactly where it "
+                  f"stopped, repeating the last complete line first, and finish that component. Start your "
+                  f"answer with // File: {file_path} and send only the remaining code.")
+        if not self._send_prompt_bulletproof(input_element, prompt):
+            return None
+        
+        timeouts = self.config['timeouts']
+        max_wait = self.brave.adaptive_deadline(
+            'perplexity', 'continuation', timeouts['response_wait'] * 5, floor=timeouts['response_wait']
+        )
+        poll = self.brave.new_poll(3)
+        start_time = time.time()
+        last_text = None
+        last_change = start_time
+        while time.time() - start_time < max_wait:
+            text = self.brave.driver.execute_script(LAST_ANSWER_SCRIPT, answer_selectors)
+            if not text or text == previous or text != last_text or self._is_still_generating():
+                poll.sleep(text != last_text)
+                last_text = text
+                last_change = time.time()
+                continue
+            if time.time() - last_change >= CONTINUATION_STABLE_SECONDS:
+                self.brave.record_stage('perplexity', 'continuation', last_change - start_time)
+                return text
+            poll.sleep(False)
+        self.brave.record_stage('perplexity', 'continuation', time.time() - start_time, outcome='timeout')
+        return last_text if last_text and last_text != previous else None
+
     def _get_all_page_content(self):
         """Enhanced: Get ALL content from the page with multiple extraction methods"""
         try:
@@ -409,13 +795,24 @@ class CodeGenerator:
                 ".answer-container"
             ]
             
-            for selector in perplexity_selectors:
+            # Once the answer container for this site is known, read only that one
+            winner = self.brave.selector_cache.winner(self.site, 'answer_area', perplexity_selectors)
+            for selector in self.brave.selector_cache.order(self.site, 'answer_area', perplexity_selectors):
                 try:
                     elements = self.brave.driver.find_elements(By.CSS_SELECTOR, selector)
+                    found = False
                     for elem in elements:
                         text = elem.text.strip()
                         if text and len(text) > 100:
                             response_areas.append(f"=== {selector} ===\n{text}")
+                            found = True
+                    
+                    if found:
+                        self.brave.selector_cache.record_hit(self.site, 'answer_area', selector)
+                        if selector == winner:
+                            break
+                    else:
+                        self.brave.selector_cache.record_miss(self.site, 'answer_area', selector)
                 except:
                     continue
             
@@ -442,139 +839,108 @@ class CodeGenerator:
             print(f"  ⚠️ Error getting enhanced page content: {e}")
             return None
 
-    def _save_complete_response(self, content):
-        """Save complete response to timestamped file with enhanced metadata"""
+    def _save_complete_response(self, content, user_prompt=None, source=None):
+        """Archive the complete response; returns the capture id"""
         try:
-            # Create directory
-            responses_dir = os.path.expanduser("~/Desktop/Perplexity_Responses")
-            os.makedirs(responses_dir, exist_ok=True)
-            
-            # Create filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"perplexity_response_{timestamp}.txt"
-            filepath = os.path.join(responses_dir, filename)
-            
-            # Save with enhanced metadata
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write("="*70 + "\n")
-                f.write("PERPLEXITY COMPLETE RESPONSE CAPTURE - ENHANCED\n")
-                f.write("="*70 + "\n")
-                f.write(f"Capture Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Content Length: {len(content):,} characters\n")
-                f.write(f"Content Lines: {len(content.splitlines()):,} lines\n")
-                f.write(f"Word Count (approx): {len(content.split()):,} words\n")
-                f.write("="*70 + "\n\n")
-                f.write(content)
-            
-            return filepath
+            record = self.archive.add(
+                content,
+                job_id=self.job_id,
+                prompt=user_prompt,
+                source=source or self.perplexity_url
+            )
+            self.last_capture_id = record['id']
+            print(f"  📏 {record['size']:,} bytes, {len(content.splitlines()):,} lines, "
+                  f"~{len(content.split()):,} words")
+            return record['id']
             
         except Exception as e:
             print(f"  ❌ Save error: {e}")
             return None
 
     def _is_still_generating(self):
-        """Enhanced: Check if Perplexity is still actively generating content"""
+        """Check if Perplexity is still generating - one in-page probe, returns a boolean"""
         try:
-            # Check for loading/generating UI indicators
-            loading_indicators = [
-                "[data-testid*='loading']",
-                "[data-testid*='generating']",
-                "[data-testid*='thinking']",
-                ".loading",
-                ".spinner", 
-                ".generating",
-                ".thinking",
-                "[aria-label*='loading' i]",
-                "[aria-label*='generating' i]",
-                "[class*='loading']",
-                "[class*='spinner']",
-                "[class*='generating']"
-            ]
-            
-            for selector in loading_indicators:
-                try:
-                    elements = self.brave.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        # Check if any are actually visible
-                        for elem in elements:
-                            if elem.is_displayed():
-                                return True
-                except:
-                    continue
-            
-            # Check page text for generation indicators
-            try:
-                page_text = self.brave.driver.find_element(By.TAG_NAME, "body").text.lower()
-                generation_phrases = [
-                    "generating",
-                    "thinking", 
-                    "processing",
-                    "searching",
-                    "analyzing",
-                    "loading",
-                    "please wait"
-                ]
-                
-                for phrase in generation_phrases:
-                    if phrase in page_text:
-                        return True
-            except:
-                pass
-            
+            with self.brave.round_trip_budget('generation_probe'):
+                state = self.brave.driver.execute_script(
+                    GENERATION_STATE_SCRIPT,
+                    GENERATION_STOP_SELECTORS,
+                    GENERATION_INDICATORS,
+                    STREAM_QUIET_MS
+                ) or {}
+            if state.get('generating'):
+                self.logger.debug(f"Generation signal: {state.get('signal')}")
+                return True
             return False
             
+        except RoundTripBudgetExceeded:
+            raise
         except Exception:
             return False
 
+    def _read_quota_remaining(self):
+        """Searches-remaining count the page shows now, or None; the login-time reading is stale after a submit"""
+        try:
+            probe = self.brave.driver.execute_script(
+                LOGIN_PROBE_SCRIPT, LOGIN_USER_SELECTORS, LOGIN_PHRASES, REMAINING_PATTERN.pattern
+            ) or {}
+        except WebDriverException as e:
+            self.logger.debug(f"Quota re-read failed: {e}", extra={'expected_miss': True})
+            return None
+        return probe.get('remaining')
+
     def _comprehensive_login_check(self):
-        """Check login status"""
+        """
+        Check login and Pro status with one in-page probe. A positive login is
+        cached per browser session; a logged-out result is probed again next
+        time, and the searches-remaining count is never cached.
+        """
         try:
+            ttl = self.config.get('timeouts', {}).get('login_cache_ttl', LOGIN_CACHE_TTL)
+            cached = self.brave.get_session_state(('login', self.site), ttl)
+            CACHE_REQUESTS.inc(cache='login', result='hit' if cached else 'miss')
+            if cached:
+                print("  ⚡ Using cached login status for this browser session")
+                self.quota_remaining = None
+                return cached['is_logged_in'], cached['is_pro']
+            
             is_logged_in = False
             is_pro = False
             
-            # Check UI indicators
-            user_selectors = [
-                "[data-testid*='user']",
-                "[data-testid*='profile']", 
-                ".user-menu",
-                ".profile-menu",
-                ".user-avatar",
-                "button[aria-label*='user' i]",
-                ".logged-in",
-                ".authenticated"
-            ]
-            
-            for selector in user_selectors:
-                try:
-                    element = self.brave.find_element_safe(selector, timeout=2)
-                    if element:
-                        is_logged_in = True
-                        print("  ✅ User interface indicates logged in")
-                        break
-                except:
-                    continue
-            
-            # Check page text
+            # Session cookie: one round trip, no DOM access
             try:
-                page_text = self.brave.driver.find_element(By.TAG_NAME, "body").text.lower()
-                
-                if any(phrase in page_text for phrase in ["sign out", "logout", "my account"]):
+                cookie_names = {cookie['name'] for cookie in self.brave.driver.get_cookies()}
+                if cookie_names & SESSION_COOKIE_NAMES:
                     is_logged_in = True
-                    print("  ✅ Page text indicates logged in")
-                
-                if any(phrase in page_text for phrase in ["pro search", "unlimited", "pro plan", "premium"]):
-                    is_pro = True
-                    print("  🎯 Pro features detected")
-                
-                if not any(phrase in page_text for phrase in ["searches remaining", "search limit"]):
-                    is_pro = True
-                    print("  🎯 No search limits - likely Pro")
-                    
+                    print("  ✅ Session cookie indicates logged in")
             except Exception as e:
-                print(f"  ⚠️ Page check failed: {e}")
-            
+                self.logger.debug(f"Cookie check failed: {e}")
+            
+            # UI indicators and page phrases are evaluated inside the page;
+            # only booleans come back, never the page text
+            probe = self.brave.driver.execute_script(
+                LOGIN_PROBE_SCRIPT, LOGIN_USER_SELECTORS, LOGIN_PHRASES, REMAINING_PATTERN.pattern
+            ) or {}
+            
+            if probe.get('user_selector'):
+                is_logged_in = True
+                print("  ✅ User interface indicates logged in")
+            if probe.get('logged_in_text'):
+                is_logged_in = True
+                print("  ✅ Page text indicates logged in")
+            if probe.get('pro_text'):
+                is_pro = True
+                print("  🎯 Pro features detected")
+            if not probe.get('limit_text'):
+                is_pro = True
+                print("  🎯 No search limits - likely Pro")
+            self.quota_remaining = probe.get('remaining')
+            if self.quota_remaining is not None:
+                print(f"  🔢 {self.quota_remaining} searches remaining")
+            
+            if is_logged_in:
+                self.brave.set_session_state(('login', self.site), {'is_logged_in': True, 'is_pro': is_pro})
             return is_logged_in, is_pro
             
         except Exception as e:
             print(f"  ⚠️ Login check failed: {e}")
-            return False, False
\ No newline at end of file
+            return False, False
@@ -6,6 +6,7 @@ import os
 import re
 import json
 from pathlib import Path
+from tools.postprocess import clean_component, clean_components
 
 class ProjectCreator:
     def __init__(self, config, logger):
@@ -37,14 +38,13 @@ class ProjectCreator:
         
         # Extract React components using regex
         component_pattern = r'(?:const|function)\s+(\w+)\s*=?\s*\([^)]*\)\s*(?:=>)?\s*\{([\s\S]*?)\}'
-        matches = re.finditer(component_pattern, generated_code, re.MULTILINE)
+        matches = [match for match in re.finditer(component_pattern, generated_code, re.MULTILINE)
+                   if match.group(1) not in ['useState', 'useEffect']]  # Skip hooks
         
-        for match in matches:
-            component_name = match.group(1)
-            component_code = match.group(0)
-            
-            if component_name not in ['useState', 'useEffect']:  # Skip hooks
-                components[component_name] = self._clean_component_code(component_code)
+        # Clean all candidates in one batch instead of one pass per candidate
+        cleaned = clean_components([match.group(0) for match in matches])
+        for match, component_code in zip(matches, cleaned):
+            components[match.group(1)] = component_code
         
         # If no components found, create default structure
         if not components:
@@ -52,6 +52,10 @@ class ProjectCreator:
         
         return components
 
+    def _clean_component_code(self, component_code):
+        """Fences, language tags, line endings, trailing whitespace and repeated imports"""
+        return clean_component(component_code)
+
     def _create_default_components(self, generated_code):
         """Create default component structure if parsing fails"""
         return {
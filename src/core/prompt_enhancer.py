@@ -4,11 +4,37 @@ FIXED VERSION - No fallback to pre-built prompts
 """
 
 import time
+from urllib.parse import urlparse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from utils.text_classifier import KeywordClassifier
+from utils.metrics import STAGE_SECONDS
+
+FLEXOS_NAV_KEYWORDS = [
+    'flexos', 'productivity', 'craft perfect ai art prompts',
+    'prompt enhancer ai', 'chatgpt for designers', 'courses',
+    'newsletter', 'subscribe', 'copy link', 'share on linkedin',
+    'share on twitter', 'share on facebook', 'midjourney',
+    'ideogram', 'dall-e', 'your guides to a better future',
+    'type your prompt here'
+]
+
+ENHANCEMENT_INDICATORS = [
+    'create', 'develop', 'build', 'design', 'implement',
+    'website', 'application', 'frontend', 'backend', 'system',
+    'features', 'functionality', 'requirements', 'specifications',
+    'components', 'structure', 'architecture', 'framework',
+    'modern', 'professional', 'responsive', 'interactive',
+    'detailed', 'comprehensive', 'technical', 'advanced'
+]
+
+CONTENT_CLASSIFIER = KeywordClassifier({
+    'navigation': FLEXOS_NAV_KEYWORDS,
+    'enhancement': ENHANCEMENT_INDICATORS
+})
 
 class PromptEnhancer:
     def __init__(self, brave_controller, config, logger):
@@ -16,9 +42,18 @@ class PromptEnhancer:
         self.config = config
         self.logger = logger
         self.flexos_url = config.get('urls', {}).get('flexos', 'https://www.flexos.work/design/prompt')
+        self.site = urlparse(self.flexos_url).hostname
 
-    def enhance_prompt(self, original_prompt):
-        """Enhanced prompt processing - NO fallback to pre-built prompts"""
+    def enhance_prompt(self, original_prompt, while_waiting=None):
+        """
+        Enhanced prompt processing - NO fallback to pre-built prompts.
+        while_waiting is called once while FlexOS processes the prompt, so other
+        tabs can be prepared in that time; it must return to the FlexOS tab.
+        """
+        with STAGE_SECONDS.time(stage='enhancement'):
+            return self._enhance(original_prompt, while_waiting)
+
+    def _enhance(self, original_prompt, while_waiting=None):
         try:
             print("  🌐 Opening FlexOS Prompt Enhancer...")
             
@@ -31,7 +66,7 @@ class PromptEnhancer:
             time.sleep(6)
             
             # Process enhancement
-            enhanced_prompt = self._enhanced_extraction_flow(original_prompt)
+            enhanced_prompt = self._enhanced_extraction_flow(original_prompt, while_waiting)
             
             if enhanced_prompt and len(enhanced_prompt) > len(original_prompt):
                 print("  ✨ Prompt enhanced successfully with FlexOS!")
@@ -44,7 +79,7 @@ class PromptEnhancer:
             print(f"  ❌ Enhancement error: {e}")
             return original_prompt  # Return original, NOT fallback
 
-    def _enhanced_extraction_flow(self, original_prompt):
+    def _enhanced_extraction_flow(self, original_prompt, while_waiting=None):
         """Process FlexOS enhancement"""
         try:
             # Find and fill input
@@ -59,7 +94,7 @@ class PromptEnhancer:
                 return None
             
             # Wait for processing and extract result
-            enhanced_result = self._wait_and_extract_with_copy_button()
+            enhanced_result = self._wait_and_extract_with_copy_button(while_waiting)
             if enhanced_result:
                 print(f"  ✅ Successfully got enhanced prompt from FlexOS!")
                 return enhanced_result
@@ -92,20 +127,12 @@ class PromptEnhancer:
                 "[contenteditable='true']"
             ]
             
-            for i, selector in enumerate(flexos_input_selectors, 1):
-                try:
-                    print(f"    📋 Trying FlexOS selector {i}/{len(flexos_input_selectors)}: {selector}")
-                    
-                    elements = self.brave.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    for element in elements:
-                        if self._is_flexos_input_valid(element):
-                            print(f"    ✅ Found FlexOS input field!")
-                            return element
-                            
-                except Exception as e:
-                    print(f"    ⚠️ Selector failed: {e}")
-                    continue
+            element, selector = self.brave.find_with_cache(
+                self.site, 'prompt_input', flexos_input_selectors, accept=self._is_flexos_input_valid
+            )
+            if element:
+                print(f"    ✅ Found FlexOS input field: {selector}")
+                return element
             
             print("  ❌ Could not find FlexOS input field")
             return None
@@ -172,40 +199,56 @@ class PromptEnhancer:
             print(f"  ❌ Error entering prompt into FlexOS: {e}")
             return False
 
-    def _wait_and_extract_with_copy_button(self):
+    def _wait_and_extract_with_copy_button(self, while_waiting=None):
         """Wait for processing and extract via copy button"""
         try:
             print("  ⏳ Waiting for FlexOS to process prompt...")
             
-            max_wait = 90
-            check_interval = 3
+            if while_waiting:
+                try:
+                    while_waiting()
+                except Exception as e:
+                    self.logger.warning(f"Background preparation failed: {e}")
+            
+            timeouts = self.config['timeouts']
+            # Learned from earlier enhancements; the static value until enough runs are recorded
+            max_wait = self.brave.adaptive_deadline(
+                'flexos', 'enhancement', timeouts['enhancement_max'], floor=timeouts['element_wait'] * 2
+            )
+            poll = self.brave.new_poll(3)
             start_time = time.time()
             
             while time.time() - start_time < max_wait:
+                processing = False
                 try:
                     # Look for enhanced text directly on page
                     direct_result = self._extract_enhanced_text_from_page()
                     if direct_result:
                         print(f"  ✅ Found enhanced text directly on page!")
+                        self.brave.record_stage('flexos', 'enhancement', time.time() - start_time)
                         return direct_result
                     
                     # Check if still processing
-                    if self._is_flexos_processing():
-                        print("  🔄 FlexOS still processing...")
+                    processing = self._is_flexos_processing()
+                    if processing:
+                        self.logger.debug("FlexOS still processing")
                     else:
                         # Check for any substantial content changes
                         page_content = self._check_for_content_changes()
                         if page_content:
                             print(f"  ✅ Found content changes on page!")
+                            self.brave.record_stage('flexos', 'enhancement', time.time() - start_time)
                             return page_content
                     
-                    time.sleep(check_interval)
+                    # Output is close while FlexOS shows it is working; back off otherwise
+                    poll.sleep(processing)
                     
                 except Exception as e:
-                    print(f"  ⚠️ FlexOS extraction attempt failed: {e}")
-                    time.sleep(check_interval)
+                    self.logger.debug(f"FlexOS extraction attempt failed: {e}", extra={'expected_miss': True})
+                    poll.sleep(False)
             
-            print(f"  ⏰ FlexOS timeout after {max_wait} seconds")
+            print(f"  ⏰ FlexOS timeout after {max_wait:.0f} seconds")
+            self.brave.record_stage('flexos', 'enhancement', time.time() - start_time, outcome='timeout')
             return None
             
         except Exception as e:
@@ -233,11 +276,12 @@ class PromptEnhancer:
                     for element in elements:
                         text_content = element.text.strip()
                         
-                        if (text_content and 
-                            len(text_content) > 250 and
-                            self._looks_like_enhanced_content(text_content) and
-                            not self._is_flexos_navigation(text_content)):
-                            
+                        if not text_content or len(text_content) <= 250:
+                            continue
+                        
+                        # One scan classifies the block for both keyword sets
+                        score = CONTENT_CLASSIFIER.matches(text_content)
+                        if len(score['enhancement']) >= 4 and not score['navigation']:
                             return text_content
                             
                 except Exception:
@@ -254,27 +298,35 @@ class PromptEnhancer:
             page_text = self.brave.driver.find_element(By.TAG_NAME, "body").text
             
             if len(page_text) > 3000:
-                lines = [line.strip() for line in page_text.split('\n') if len(line.strip()) > 100]
-                
-                for line in lines:
-                    if (self._looks_like_enhanced_content(line) and 
-                        not self._is_flexos_navigation(line)):
-                        
-                        line_index = lines.index(line)
-                        start_index = max(0, line_index - 1)
-                        end_index = min(len(lines), line_index + 3)
-                        
-                        context_lines = lines[start_index:end_index]
-                        combined_content = '\n'.join(context_lines)
-                        
-                        if len(combined_content) > 400:
-                            return combined_content
+                ranked = self._rank_content_blocks(page_text)
+                if ranked:
+                    return ranked[0]
                             
         except Exception as e:
             pass
         
         return None
 
+    def _rank_content_blocks(self, page_text):
+        """
+        Score every line of the page in one scan and return candidate blocks
+        (a matching line plus its neighbours), best first
+        """
+        lines, scores = CONTENT_CLASSIFIER.score_lines(page_text, min_length=100)
+        
+        candidates = []
+        for index, (line, score) in enumerate(zip(lines, scores)):
+            if score['navigation'] or len(line) <= 200 or len(score['enhancement']) < 4:
+                continue
+            
+            context_lines = lines[max(0, index - 1):min(len(lines), index + 3)]
+            combined_content = '\n'.join(context_lines)
+            if len(combined_content) > 400:
+                candidates.append((len(score['enhancement']), len(combined_content), -index, combined_content))
+        
+        candidates.sort(reverse=True)
+        return [candidate[-1] for candidate in candidates]
+
     def _is_flexos_processing(self):
         """Check if FlexOS is still processing"""
         processing_indicators = [
@@ -294,30 +346,10 @@ class PromptEnhancer:
 
     def _is_flexos_navigation(self, text):
         """Check if text is FlexOS navigation content"""
-        nav_keywords = [
-            'flexos', 'productivity', 'craft perfect ai art prompts',
-            'prompt enhancer ai', 'chatgpt for designers', 'courses',
-            'newsletter', 'subscribe', 'copy link', 'share on linkedin',
-            'share on twitter', 'share on facebook', 'midjourney',
-            'ideogram', 'dall-e', 'your guides to a better future',
-            'type your prompt here'
-        ]
-        
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in nav_keywords)
+        return bool(CONTENT_CLASSIFIER.matches(text)['navigation'])
 
     def _looks_like_enhanced_content(self, text):
         """Check if text looks like enhanced prompt content"""
-        enhancement_indicators = [
-            'create', 'develop', 'build', 'design', 'implement',
-            'website', 'application', 'frontend', 'backend', 'system',
-            'features', 'functionality', 'requirements', 'specifications',
-            'components', 'structure', 'architecture', 'framework',
-            'modern', 'professional', 'responsive', 'interactive',
-            'detailed', 'comprehensive', 'technical', 'advanced'
-        ]
-        
-        text_lower = text.lower()
-        matches = sum(1 for indicator in enhancement_indicators if indicator in text_lower)
-        
-        return matches >= 4 and len(text) > 200
\ No newline at end of file
+        if len(text) <= 200:
+            return False
+        return len(CONTENT_CLASSIFIER.matches(text)['enhancement']) >= 4
@@ -0,0 +1,196 @@
+"""
+Provider race
+Submits prompts to LLM web UIs in parallel tabs: race one prompt, or collect many
+"""
+
+import time
+from tools.phase2_complete_project_builder import parse_code_components
+
+POLL_INTERVAL = 1.0
+STABLE_POLLS = 2
+
+
+def has_components(content):
+    """Default validator: the answer must parse into at least one component"""
+    return len(parse_code_components(content)) > 0
+
+
+class ProviderRace:
+    """
+    One tab per provider, all loaded in the background at once. The race loop
+    visits the tabs round-robin with a single poll script each; an answer is
+    accepted once its provider has stopped generating, its text has stayed the
+    same for STABLE_POLLS visits and it passes the validator. The remaining
+    providers are then stopped and their tabs closed.
+    """
+
+    def __init__(self, brave_controller, config, logger, providers, validator=None):
+        self.brave = brave_controller
+        self.config = config
+        self.logger = logger
+        self.providers = providers
+        self.validator = validator or has_components
+
+    def _start(self, provider, key=None):
+        """Open a background tab for one provider; returns its entry or None"""
+        handle = self.brave.open_background_tab(provider.url)
+        return {'key': key or provider.name, 'provider': provider, 'handle': handle, 'submitted': False,
+                'last_text': '', 'stable': 0, 'changed': False, 'rejected': False,
+                'answer': None} if handle else None
+
+    def _submit(self, entry, prompt):
+        provider = entry['provider']
+        if not self.brave.switch_to_tab(entry['handle']):
+            return False
+        element = provider.find_input(self.brave)
+        if element is None:
+            self.logger.warning(f"{provider.name}: no prompt input found")
+            return False
+        entry['submitted'] = provider.submit(self.brave, element, prompt)
+        entry['submitted_at'] = time.time()
+        return entry['submitted']
+
+    def _launch(self, jobs):
+        """Open every tab first so the pages load in parallel, then submit; jobs are (key, provider, prompt)"""
+        entries = []
+        for key, provider, prompt in jobs:
+            entry = self._start(provider, key)
+            if entry:
+                entry['prompt'] = prompt
+                entries.append(entry)
+            else:
+                print(f"  ❌ Could not open a tab for {key}")
+        for entry in entries:
+            if not self._submit(entry, entry['prompt']):
+                entry['rejected'] = True
+            else:
+                print(f"  📤 Sent {entry['key']} to {entry['provider'].name}")
+        return entries
+
+    def _check(self, entry):
+        """Poll one tab; returns the answer text once it is complete and valid"""
+        provider = entry['provider']
+        if not self.brave.switch_to_tab(entry['handle'], wait_for_load=False):
+            entry['rejected'] = True
+            return None
+
+        with self.brave.round_trip_budget('race_poll'):
+            generating, text = provider.poll(self.brave)
+        entry['changed'] = text != entry['last_text']
+        if generating or not text or entry['changed']:
+            entry['last_text'] = text
+            entry['stable'] = 0
+            return None
+
+        entry['stable'] += 1
+        if entry['stable'] < STABLE_POLLS:
+            return None
+        if self.validator(text):
+            return text
+
+        # Finished but unusable (refusal, no component headers) - drop out of the race
+        print(f"  ⚠️ {entry['key']} finished without usable components")
+        entry['rejected'] = True
+        return None
+
+    def _close(self, entry, cancel=True):
+        try:
+            if self.brave.switch_to_tab(entry['handle'], wait_for_load=False):
+                if cancel:
+                    entry['provider'].cancel(self.brave)
+                self.brave.driver.close()
+        except Exception as e:
+            self.logger.warning(f"Could not close {entry['provider'].name} tab: {e}")
+
+    def _deadline(self, jobs):
+        """Slowest p99 of the providers involved (prompt size aware), capped by response_wait * 5"""
+        timeouts = self.config['timeouts']
+        default = timeouts['response_wait'] * 5
+        return max(self.brave.adaptive_deadline(provider.name, 'answer', default, len(prompt),
+                                                floor=timeouts['response_wait'])
+                   for _, provider, prompt in jobs) if jobs else default
+
+    def _record(self, entry):
+        self.brave.record_stage(entry['provider'].name, 'answer', time.time() - entry['submitted_at'],
+                                len(entry['prompt']))
+
+    def run(self, prompt, timeout=None):
+        """Race all providers; returns (provider_name, answer_text) or (None, None)"""
+        jobs = [(p.name, p, prompt) for p in self.providers]
+        timeout = timeout or self._deadline(jobs)
+        original_tab = self.brave.driver.current_window_handle
+        print(f"  🏁 Racing {len(self.providers)} providers: {', '.join(p.name for p in self.providers)}")
+
+        entries = self._launch(jobs)
+
+        winner = None
+        answer = None
+        poll = self.brave.new_poll(POLL_INTERVAL)
+        started = time.time()
+        while time.time() - started < timeout:
+            active = [entry for entry in entries if not entry['rejected']]
+            if not active:
+                break
+            for entry in active:
+                answer = self._check(entry)
+                if answer:
+                    winner = entry
+                    break
+            if winner:
+                break
+            poll.sleep(any(entry['changed'] for entry in active))
+
+        for entry in entries:
+            if entry is not winner:
+                self._close(entry, cancel=not entry['rejected'])
+
+        if winner:
+            self.brave.switch_to_tab(winner['handle'], wait_for_load=False)
+            elapsed = time.time() - winner['submitted_at']
+            self._record(winner)
+            print(f"  🏆 {winner['provider'].name} answered first ({elapsed:.1f}s, {len(answer)} chars)")
+            return winner['provider'].name, answer
+
+        try:
+            self.brave.driver.switch_to.window(original_tab)
+        except Exception:
+            pass
+        print("  ❌ No provider returned a usable answer")
+        return None, None
+
+    def run_all(self, jobs, timeout=None):
+        """
+        Submit different prompts in parallel tabs and wait for all of them;
+        jobs are (key, provider, prompt). Returns {key: answer} for the ones
+        that completed with a valid answer before the timeout.
+        """
+        timeout = timeout or self._deadline(jobs)
+        original_tab = self.brave.driver.current_window_handle
+        entries = self._launch(jobs)
+
+        poll = self.brave.new_poll(POLL_INTERVAL)
+        started = time.time()
+        while time.time() - started < timeout:
+            pending = [entry for entry in entries if not entry['rejected'] and entry['answer'] is None]
+            if not pending:
+                break
+            for entry in pending:
+                entry['answer'] = self._check(entry)
+                if entry['answer']:
+                    elapsed = time.time() - entry['submitted_at']
+                    self._record(entry)
+                    print(f"  ✅ {entry['key']} done ({elapsed:.1f}s, {len(entry['answer'])} chars)")
+                    # Close finished tabs right away to keep the browser light
+                    self._close(entry, cancel=False)
+            poll.sleep(any(entry['changed'] for entry in pending))
+
+        for entry in entries:
+            if entry['answer'] is None:
+                print(f"  ⚠️ {entry['key']} did not finish")
+                self._close(entry, cancel=not entry['rejected'])
+
+        try:
+            self.brave.driver.switch_to.window(original_tab)
+        except Exception:
+            pass
+        return {entry['key']: entry['answer'] for entry in entries if entry['answer']}
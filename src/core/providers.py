@@ -0,0 +1,185 @@
+"""
+LLM provider adapters
+Per-site knowledge (input locator, submit, completion signal, extraction) for web LLM UIs
+"""
+
+import time
+from urllib.parse import urlparse
+from selenium.webdriver.common.keys import Keys
+
+DEFAULT_PROVIDERS = {
+    'perplexity': {
+        'url': 'https://www.perplexity.ai',
+        'input_selectors': [
+            "div[contenteditable='true'][role='textbox']",
+            "textarea[placeholder*='Ask anything']",
+            "textarea[placeholder*='Ask']",
+            "div[contenteditable='true']",
+            "textarea"
+        ],
+        'answer_selectors': [
+            "[data-testid*='copilot-answer']",
+            "[data-testid*='answer']",
+            ".prose",
+            "[role='article']"
+        ],
+        'stop_selectors': [
+            "button[aria-label*='stop' i]",
+            "button[data-testid*='stop']"
+        ]
+    },
+    'chatgpt': {
+        'url': 'https://chatgpt.com',
+        'input_selectors': [
+            "#prompt-textarea",
+            "div[contenteditable='true'][id='prompt-textarea']",
+            "textarea"
+        ],
+        'answer_selectors': [
+            "[data-message-author-role='assistant']",
+            ".markdown"
+        ],
+        'stop_selectors': [
+            "[data-testid='stop-button']",
+            "button[aria-label*='stop' i]"
+        ]
+    },
+    'claude': {
+        'url': 'https://claude.ai/new',
+        'input_selectors': [
+            "div[contenteditable='true'].ProseMirror",
+            "div[contenteditable='true']"
+        ],
+        'answer_selectors': [
+            "[data-is-streaming]",
+            ".font-claude-message"
+        ],
+        'stop_selectors': [
+            "button[aria-label*='stop' i]"
+        ]
+    }
+}
+
+# Answer text plus a completion signal in one round trip
+POLL_SCRIPT = """
+var answerSelectors = arguments[0], stopSelectors = arguments[1], quietMs = arguments[2];
+var state = window.__llmStreamState;
+if (!state) {
+    state = window.__llmStreamState = {lastMutation: 0};
+    try {
+        new MutationObserver(function () { state.lastMutation = Date.now(); })
+            .observe(document.body, {childList: true, subtree: true, characterData: true});
+    } catch (e) {}
+}
+function visible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+var generating = false;
+for (var i = 0; i < stopSelectors.length && !generating; i++) {
+    try {
+        var stops = document.querySelectorAll(stopSelectors[i]);
+        for (var j = 0; j < stops.length; j++) { if (visible(stops[j])) { generating = true; break; } }
+    } catch (e) {}
+}
+if (!generating && document.querySelector("[aria-busy='true'], [data-is-streaming='true']")) generating = true;
+if (!generating && state.lastMutation && Date.now() - state.lastMutation < quietMs) generating = true;
+
+var text = '';
+for (var k = 0; k < answerSelectors.length && !text; k++) {
+    try {
+        var nodes = document.querySelectorAll(answerSelectors[k]);
+        var parts = [];
+        for (var n = 0; n < nodes.length; n++) { if (nodes[n].innerText) parts.push(nodes[n].innerText); }
+        text = parts.join('\\n\\n');
+    } catch (e) {}
+}
+if (!text && document.body) text = document.body.innerText;
+return {generating: generating, text: text};
+"""
+
+SET_INPUT_SCRIPT = """
+var element = arguments[0], text = arguments[1];
+element.focus();
+if (element.tagName === "TEXTAREA" || element.tagName === "INPUT") {
+    var setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), 'value').set;
+    setter.call(element, text);
+} else {
+    element.innerText = text;
+}
+element.dispatchEvent(new Event('input', {bubbles: true}));
+element.dispatchEvent(new Event('change', {bubbles: true}));
+return element.tagName === "TEXTAREA" || element.tagName === "INPUT" ? element.value : element.innerText;
+"""
+
+
+class ProviderAdapter:
+    """
+    Drives one LLM web UI. Everything site-specific comes from the settings
+    dict, so a local stub page can stand in for a provider by overriding its
+    url (and selectors) in config['providers'].
+    """
+
+    def __init__(self, name, settings):
+        self.name = name
+        self.url = settings['url']
+        self.site = urlparse(self.url).hostname or name
+        self.input_selectors = list(settings.get('input_selectors', []))
+        self.answer_selectors = list(settings.get('answer_selectors', []))
+        self.stop_selectors = list(settings.get('stop_selectors', []))
+        self.stream_quiet_ms = settings.get('stream_quiet_ms', 2000)
+
+    def find_input(self, brave):
+        """Locate a usable prompt input on the current tab"""
+        def usable(element):
+            return element.is_displayed() and element.is_enabled()
+
+        element, _ = brave.find_with_cache(self.site, 'prompt_input', self.input_selectors, accept=usable)
+        return element
+
+    def submit(self, brave, element, prompt):
+        """Put the prompt into the input and press Enter; falls back to typing"""
+        try:
+            element.click()
+            result = brave.driver.execute_script(SET_INPUT_SCRIPT, element, prompt)
+            if not result or len(result) < len(prompt) * 0.8:
+                element.send_keys(prompt)
+            time.sleep(0.5)
+            element.send_keys(Keys.RETURN)
+            return True
+        except Exception as e:
+            brave.logger.warning(f"{self.name}: submit failed: {e}")
+            return False
+
+    def poll(self, brave):
+        """Return (generating, answer_text) for the current tab in one round trip"""
+        state = brave.driver.execute_script(
+            POLL_SCRIPT, self.answer_selectors, self.stop_selectors, self.stream_quiet_ms
+        ) or {}
+        return bool(state.get('generating')), state.get('text') or ''
+
+    def cancel(self, brave):
+        """Stop a running generation if the page offers a stop button"""
+        for selector in self.stop_selectors:
+            try:
+                for button in brave.driver.find_elements('css selector', selector):
+                    if button.is_displayed():
+                        button.click()
+                        return True
+            except Exception:
+                continue
+        return False
+
+
+def load_providers(config, names=None):
+    """Build adapters from DEFAULT_PROVIDERS merged with config['providers'] overrides"""
+    overrides = config.get('providers', {})
+    adapters = {}
+    for name in names or list(DEFAULT_PROVIDERS) + [n for n in overrides if n not in DEFAULT_PROVIDERS]:
+        settings = dict(DEFAULT_PROVIDERS.get(name, {}))
+        settings.update(overrides.get(name, {}))
+        if name == 'perplexity' and 'url' not in overrides.get(name, {}):
+            settings['url'] = config.get('urls', {}).get('perplexity', settings.get('url'))
+        if not settings.get('url'):
+            raise ValueError(f"Provider '{name}' has no url configured")
+        adapters[name] = ProviderAdapter(name, settings)
+    return adapters
@@ -0,0 +1,350 @@
+"""
+Job scheduler
+Priority queue in front of the generation workers with per-account quotas and backoff
+"""
+
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+
+DEFAULT_STATE_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "scheduler_state.json"
+DEFAULT_BACKOFF_BASE = 2.0
+DEFAULT_BACKOFF_CAP = 120.0
+DEFAULT_QUOTA_RESET_SECONDS = 24 * 3600
+FAILURE_WINDOW = 10
+FAILURE_RATE_LIMIT = 0.5
+MIN_FAILURE_SAMPLES = 3
+
+REMAINING_PATTERN = re.compile(
+    r'(\d+)\s+(?:pro\s+|free\s+)?(?:searches|queries|messages)\s+(?:remaining|left)', re.IGNORECASE
+)
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF_BASE, cap=DEFAULT_BACKOFF_CAP):
+    """Exponential backoff with full jitter: a random delay in [base/2, min(cap, base * 2^attempt)]"""
+    ceiling = min(cap, base * (2 ** attempt))
+    return random.uniform(min(base / 2, ceiling), ceiling)
+
+
+def parse_remaining(text):
+    """Remaining-quota count from page text such as '3 pro searches remaining', or None"""
+    match = REMAINING_PATTERN.search(text or '')
+    return int(match.group(1)) if match else None
+
+
+class QuotaExceeded(Exception):
+    """Raised by a worker when the account it was given has no quota left"""
+
+    def __init__(self, message='Quota exhausted', remaining=0, reset_after=None):
+        super().__init__(message)
+        self.remaining = remaining
+        self.reset_after = reset_after
+
+
+class JobScheduler:
+    """
+    Jobs wait in a priority heap (lower number runs first, FIFO within a
+    priority). A job is dispatched to the account with the most headroom:
+    not cooling down, below its concurrency limit, with quota left, then
+    lowest recent failure rate and most remaining quota. Failed jobs are
+    re-queued with exponential backoff and jitter; an account whose recent
+    failure rate crosses FAILURE_RATE_LIMIT cools down the same way, and an
+    account that reports no quota left is parked until its quota resets.
+    Account state (quota, cooldowns) persists to a small JSON file.
+    """
+
+    def __init__(self, accounts, max_attempts=3, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_cap=DEFAULT_BACKOFF_CAP, quota_reset_seconds=DEFAULT_QUOTA_RESET_SECONDS,
+                 state_path=None, logger=None):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.quota_reset_seconds = quota_reset_seconds
+        self.state_path = Path(os.path.expanduser(str(state_path))) if state_path else DEFAULT_STATE_PATH
+        self.logger = logger
+        self._cond = threading.Condition()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._closed = False
+        self.jobs = {}
+        self.accounts = {}
+
+        saved = self._load_state()
+        for settings in accounts:
+            key = self.account_key(settings['provider'], settings.get('name', 'default'))
+            state = saved.get(key, {})
+            self.accounts[key] = {
+                'key': key,
+                'provider': settings['provider'],
+                'name': settings.get('name', 'default'),
+                'max_concurrent': settings.get('max_concurrent', 1),
+                'in_flight': 0,
+                'remaining': state.get('remaining', settings.get('quota')),
+                'quota_reset_at': state.get('quota_reset_at', 0.0),
+                'cooldown_until': state.get('cooldown_until', 0.0),
+                'consecutive_failures': 0,
+                'recent': deque(maxlen=FAILURE_WINDOW),
+                'completed': state.get('completed', 0),
+                'failed': state.get('failed', 0)
+            }
+
+    @staticmethod
+    def account_key(provider, name='default'):
+        return f"{provider}:{name}"
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self):
+        state = {
+            key: {name: account[name] for name in
+                  ('remaining', 'quota_reset_at', 'cooldown_until', 'completed', 'failed')}
+            for key, account in self.accounts.items()
+        }
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"Could not save scheduler state: {e}")
+
+    def submit(self, payload, priority=5, provider=None, job_id=None):
+        """Queue a job; provider pins it to that provider's accounts. Returns the job id"""
+        job = {
+            'id': job_id or uuid.uuid4().hex[:12],
+            'payload': payload,
+            'priority': priority,
+            'provider': provider,
+            'status': 'queued',
+            'attempts': 0,
+            'not_before': 0.0,
+            'created_at': time.time(),
+            'account': None,
+            'result': None,
+            'error': None
+        }
+        with self._cond:
+            self.jobs[job['id']] = job
+            self._push(job)
+            self._cond.notify_all()
+        return job['id']
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job['priority'], job['not_before'], next(self._sequence), job['id']))
+
+    def _has_capacity(self, account, now):
+        if account['in_flight'] >= account['max_concurrent'] or account['cooldown_until'] > now:
+            return False
+        if account['remaining'] is not None and account['remaining'] <= 0:
+            if account['quota_reset_at'] and account['quota_reset_at'] <= now:
+                # Quota window has passed; the next job will report the real number
+                account['remaining'] = None
+                return True
+            return False
+        return True
+
+    def _failure_rate(self, account):
+        if len(account['recent']) < MIN_FAILURE_SAMPLES:
+            return 0.0
+        return account['recent'].count(False) / len(account['recent'])
+
+    def _pick_account(self, job, now):
+        candidates = [a for a in self.accounts.values()
+                      if (job['provider'] is None or a['provider'] == job['provider']) and self._has_capacity(a, now)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda a: (
+            self._failure_rate(a),
+            -(a['remaining'] if a['remaining'] is not None else float('inf')),
+            a['in_flight']
+        ))
+
+    def _next_wake(self, now):
+        """Earliest time a queued job or parked account becomes eligible"""
+        times = [entry[1] for entry in self._heap if entry[1] > now]
+        for account in self.accounts.values():
+            times += [t for t in (account['cooldown_until'], account['quota_reset_at']) if t > now]
+        return min(times) if times else None
+
+    def acquire(self, timeout=None):
+        """
+        Block until a job and an account for it are available; returns
+        (job, account) or (None, None) once the scheduler is closed and drained
+        or the timeout passes.
+        """
+        deadline = time.time() + timeout if timeout else None
+        with self._cond:
+            while True:
+                now = time.time()
+                deferred = []
+                picked = None
+                while self._heap:
+                    entry = heapq.heappop(self._heap)
+                    job = self.jobs.get(entry[3])
+                    if job is None or job['status'] != 'queued':
+                        continue
+                    account = self._pick_account(job, now) if job['not_before'] <= now else None
+                    if account:
+                        picked = (job, account)
+                        break
+                    deferred.append(entry)
+                for entry in deferred:
+                    heapq.heappush(self._heap, entry)
+
+                if picked:
+                    job, account = picked
+                    job['status'] = 'running'
+                    job['attempts'] += 1
+                    job['account'] = account['key']
+                    job['started_at'] = now
+                    account['in_flight'] += 1
+                    if account['remaining'] is not None:
+                        # Reaching 0 parks the account until its quota window resets
+                        self._set_remaining(account, account['remaining'] - 1)
+                    return job, account
+
+                if self._closed and not any(j['status'] in ('queued', 'running') for j in self.jobs.values()):
+                    return None, None
+
+                wait = None
+                wake = self._next_wake(now)
+                if wake:
+                    wait = wake - now
+                if deadline:
+                    if now >= deadline:
+                        return None, None
+                    wait = min(wait, deadline - now) if wait else deadline - now
+                self._cond.wait(wait)
+
+    def complete(self, job, account, result=None, remaining=None):
+        """Mark a job done and record the account's success (and reported remaining quota)"""
+        with self._cond:
+            job['status'] = 'done'
+            job['result'] = result
+            job['finished_at'] = time.time()
+            account['in_flight'] -= 1
+            account['completed'] += 1
+            account['consecutive_failures'] = 0
+            account['recent'].append(True)
+            if remaining is not None:
+                self._set_remaining(account, remaining)
+            self._save_state()
+            self._cond.notify_all()
+
+    def fail(self, job, account, error, remaining=None):
+        """Record a failure: retry the job with backoff or give up, and cool the account down if needed"""
+        now = time.time()
+        with self._cond:
+            account['in_flight'] -= 1
+            job['error'] = str(error)
+
+            if isinstance(error, QuotaExceeded):
+                # Not the job's fault: park the account and give the attempt back
+                self._set_remaining(account, 0, error.reset_after)
+                job['attempts'] -= 1
+            else:
+                # Quota exhaustion is not unreliability; only real failures count against the account
+                account['failed'] += 1
+                account['recent'].append(False)
+                account['consecutive_failures'] += 1
+                if remaining is not None:
+                    self._set_remaining(account, remaining)
+                if self._failure_rate(account) >= FAILURE_RATE_LIMIT:
+                    delay = backoff_delay(account['consecutive_failures'], self.backoff_base, self.backoff_cap)
+                    account['cooldown_until'] = now + delay
+                    if self.logger:
+                        self.logger.warning(f"{account['key']} failing often, cooling down {delay:.0f}s")
+
+            if job['attempts'] >= self.max_attempts:
+                job['status'] = 'failed'
+                job['finished_at'] = now
+            else:
+                job['status'] = 'queued'
+                job['not_before'] = now + backoff_delay(job['attempts'], self.backoff_base, self.backoff_cap)
+                self._push(job)
+            self._save_state()
+            self._cond.notify_all()
+
+    def _set_remaining(self, account, remaining, reset_after=None):
+        account['remaining'] = remaining
+        if remaining <= 0:
+            account['quota_reset_at'] = time.time() + (reset_after or self.quota_reset_seconds)
+
+    def update_quota(self, provider, name, remaining, reset_after=None):
+        """Record a remaining-quota reading (e.g. parsed from the provider's page)"""
+        with self._cond:
+            account = self.accounts.get(self.account_key(provider, name))
+            if account:
+                self._set_remaining(account, remaining, reset_after)
+                self._save_state()
+                self._cond.notify_all()
+
+    def close(self):
+        """No more submissions; acquire() returns (None, None) once the queue drains"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def run(self, worker, workers=None):
+        """
+        Drain the queue with worker threads. worker(job, account) returns the
+        result (or (result, remaining_quota)); raising marks an attempt failed.
+        Returns the job records.
+        """
+        def loop():
+            while True:
+                job, account = self.acquire()
+                if job is None:
+                    return
+                try:
+                    outcome = worker(job, account)
+                    result, remaining = outcome if isinstance(outcome, tuple) else (outcome, None)
+                    if result is None:
+                        raise RuntimeError('Worker returned no result')
+                    self.complete(job, account, result, remaining)
+                except Exception as e:
+                    self.fail(job, account, e)
+
+        self.close()
+        count = workers or sum(a['max_concurrent'] for a in self.accounts.values())
+        threads = [threading.Thread(target=loop, daemon=True) for _ in range(max(1, count))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return list(self.jobs.values())
+
+    def stats(self):
+        with self._cond:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return {
+                'jobs': counts,
+                'accounts': {
+                    key: {
+                        'remaining': a['remaining'],
+                        'in_flight': a['in_flight'],
+                        'failure_rate': round(self._failure_rate(a), 2),
+                        'cooldown_seconds': max(0.0, round(a['cooldown_until'] - time.time(), 1)),
+                        'completed': a['completed'],
+                        'failed': a['failed']
+                    }
+                    for key, a in self.accounts.items()
+                }
+            }
@@ -0,0 +1,164 @@
+"""
+Sharded generation
+Plan the components first, then request them in parallel tabs and merge the answers
+"""
+
+import re
+from core.provider_race import ProviderRace
+from tools.phase2_complete_project_builder import parse_code_components
+
+DEFAULT_SHARD_COUNT = 4
+PLAN_LINE = re.compile(r'Component:\s*([A-Za-z_][\w]*)\W+File:\s*([\w./@-]+\.(?:jsx|tsx|js|ts))')
+INSTALL_LINE = re.compile(r'^\s*(?:npm|yarn|pnpm)\s+(?:i|install|add)\b.*$', re.MULTILINE)
+
+
+def parse_component_plan(text):
+    """Component names and file paths from a plan answer, in order, one entry per file path"""
+    plan = []
+    seen = set()
+    for match in PLAN_LINE.finditer(text):
+        name, file_path = match.group(1), match.group(2)
+        if file_path not in seen:
+            seen.add(file_path)
+            plan.append({'name': name, 'file_path': file_path})
+    return plan
+
+
+def has_plan(text):
+    return len(parse_component_plan(text)) > 0
+
+
+def group_plan(plan, shard_count=DEFAULT_SHARD_COUNT):
+    """Split the plan into at most shard_count groups of neighbouring components"""
+    shard_count = max(1, min(shard_count, len(plan)))
+    size, extra = divmod(len(plan), shard_count)
+    groups = []
+    start = 0
+    for index in range(shard_count):
+        end = start + size + (1 if index < extra else 0)
+        groups.append(plan[start:end])
+        start = end
+    return groups
+
+
+def merge_shards(answers, groups):
+    """
+    Merge shard answers into one response in the // Component: / // File: format.
+    A file path is owned by the shard it was assigned to; another shard's
+    version (e.g. a helper it wrote inline) only wins if the owner did not
+    deliver it. Between equal claims the more complete (longer) code wins.
+    Returns (content, report) where report lists conflicts and missing files.
+    """
+    owners = {}
+    for index, group in enumerate(groups):
+        for item in group:
+            owners[item['file_path']] = index
+
+    chosen = {}
+    order = []
+    conflicts = []
+    install_lines = []
+    for index in sorted(answers):
+        answer = answers[index]
+        for line in INSTALL_LINE.findall(answer):
+            if line.strip() not in install_lines:
+                install_lines.append(line.strip())
+
+        for component in parse_code_components(answer):
+            path = component['file_path']
+            rank = (owners.get(path) == index, len(component['code']))
+            if path not in chosen:
+                chosen[path] = (rank, component)
+                order.append(path)
+                continue
+            conflicts.append(path)
+            if rank > chosen[path][0]:
+                chosen[path] = (rank, component)
+
+    # Planned files first, in plan order, then anything extra the shards produced
+    planned = [item['file_path'] for group in groups for item in group]
+    ordered = [path for path in planned if path in chosen] + [path for path in order if path not in owners]
+    missing = [path for path in planned if path not in chosen]
+
+    parts = install_lines[:]
+    for path in ordered:
+        component = chosen[path][1]
+        parts.append(f"// Component: {component['name']}\n// File: {path}\n{component['code']}")
+
+    report = {'components': len(ordered), 'conflicts': sorted(set(conflicts)), 'missing': missing}
+    return '\n\n'.join(parts) + '\n', report
+
+
+class ShardedGenerator:
+    """
+    Asks one provider for a component plan (names and file paths only), then
+    sends one request per group of components in parallel tabs. Each shard
+    prompt carries the whole plan so imports between components line up.
+    Components a shard failed to deliver are requested once more in a
+    single follow-up round.
+    """
+
+    def __init__(self, brave_controller, config, logger, provider, shard_count=DEFAULT_SHARD_COUNT):
+        self.brave = brave_controller
+        self.config = config
+        self.logger = logger
+        self.provider = provider
+        self.shard_count = shard_count
+        self.last_report = None
+
+    def _plan_prompt(self, user_prompt):
+        return (f"{user_prompt.strip()} - plan this website as React + Tailwind CSS components. "
+                "Do not write any code yet. List every component file the site needs, one per line, exactly "
+                "in this format: // Component: Header // File: src/components/Header/Header.jsx "
+                "Include src/App.jsx. After the list, give the npm i command for every package required.")
+
+    def _shard_prompt(self, user_prompt, plan, group):
+        plan_lines = ' '.join(f"// Component: {item['name']} // File: {item['file_path']}" for item in plan)
+        wanted = ', '.join(item['name'] for item in group)
+        return (f"{user_prompt.strip()} - the site is built from these React + Tailwind CSS components: "
+                f"{plan_lines}. Write the complete, advanced code for ONLY these components: {wanted}. "
+                "Import the other components from the file paths above instead of writing them. "
+                "Directly give the code. Before each component, on the very top, write its name and file path "
+                "in comments exactly like: // Component: Header // File: src/components/Header/Header.jsx "
+                "Also mention the npm i command for the packages these components use.")
+
+    def request_plan(self, user_prompt):
+        race = ProviderRace(self.brave, self.config, self.logger, [self.provider], validator=has_plan)
+        _, answer = race.run(self._plan_prompt(user_prompt))
+        return parse_component_plan(answer) if answer else []
+
+    def generate(self, user_prompt):
+        """Returns the merged response text, or None if no plan or no shard came back"""
+        print("  🧩 Requesting component plan...")
+        plan = self.request_plan(user_prompt)
+        if not plan:
+            print("  ❌ Could not get a component plan")
+            return None
+        print(f"  📋 Planned {len(plan)} components")
+
+        groups = group_plan(plan, self.shard_count)
+        race = ProviderRace(self.brave, self.config, self.logger, [self.provider])
+        jobs = [(index, self.provider, self._shard_prompt(user_prompt, plan, group))
+                for index, group in enumerate(groups)]
+        print(f"  🧩 Generating {len(plan)} components in {len(groups)} parallel shards...")
+        answers = race.run_all(jobs)
+        if not answers:
+            return None
+
+        content, report = merge_shards(answers, groups)
+        if report['missing']:
+            # One follow-up shard for whatever did not come back
+            retry_group = [item for item in plan if item['file_path'] in report['missing']]
+            print(f"  🔁 Re-requesting {len(retry_group)} missing components")
+            retry_index = len(groups)
+            retry = race.run_all([(retry_index, self.provider, self._shard_prompt(user_prompt, plan, retry_group))])
+            answers.update(retry)
+            content, report = merge_shards(answers, groups + [retry_group])
+
+        self.last_report = report
+        if report['conflicts']:
+            print(f"  ⚠️ {len(report['conflicts'])} files were produced by more than one shard")
+        if report['missing']:
+            print(f"  ⚠️ Missing components: {', '.join(report['missing'])}")
+        print(f"  🧩 Merged {report['components']} components from {len(answers)} shards")
+        return content
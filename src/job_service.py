@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Local job service
+HTTP API and persistent SQLite queue around AIWebsiteGenerator
+
+    POST   /jobs                {"prompt": "...", "enhance": false, "priority": 5}
+    GET    /jobs                recent jobs
+    GET    /jobs/<id>           status, stage timings, project path, error
+    GET    /jobs/<id>/archive   finished project as a .zip
+    POST   /jobs/<id>/cancel    (or DELETE /jobs/<id>)
+    GET    /health
+    GET    /metrics             Prometheus text
+"""
+
+import argparse
+import io
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+src_dir = os.path.dirname(os.path.abspath(__file__))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from core.scheduler import backoff_delay
+from utils.logger import setup_logger, shutdown_logging, log_context
+from utils.metrics import REGISTRY
+
+DEFAULT_DB_PATH = "~/Desktop/LLM_Jobs/jobs.sqlite3"
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+ARCHIVE_EXCLUDES = ('node_modules', '.git', 'dist', 'build')
+FINAL_STATES = ('done', 'failed', 'cancelled')
+# Every worker would share one Brave user-data-dir, and connecting pkills running Brave
+# instances, so parallel workers would tear down each other's sessions. Running more
+# needs a separate logged-in profile per worker first.
+MAX_WORKERS = 1
+
+
+class JobQueue:
+    """
+    Jobs live in SQLite so they survive restarts: a job that was running when
+    the service stopped is queued again on start. Workers claim jobs with a
+    single UPDATE, lowest priority number first, then oldest.
+    """
+
+    def __init__(self, db_path=None, max_attempts=3):
+        self.db_path = Path(os.path.expanduser(db_path or DEFAULT_DB_PATH))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    prompt TEXT NOT NULL,
+                    enhance INTEGER NOT NULL DEFAULT 0,
+                    priority INTEGER NOT NULL DEFAULT 5,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    not_before REAL NOT NULL DEFAULT 0,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    project_path TEXT,
+                    capture_id TEXT,
+                    timings TEXT,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority, created_at);
+            """)
+            # Jobs interrupted by a shutdown go back to the queue
+            self._conn.execute("UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running'")
+
+    def submit(self, prompt, enhance=False, priority=5):
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, prompt, enhance, priority, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, prompt, int(bool(enhance)), int(priority), time.time())
+            )
+        return self.get(job_id)
+
+    def claim(self, worker):
+        """Atomically take the next eligible job for a worker, or None"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' AND not_before <= ? "
+                "ORDER BY priority, created_at LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, attempts = attempts + 1, "
+                "error = NULL WHERE id = ?", (worker, now, row['id'])
+            )
+        return self.get(row['id'])
+
+    def finish(self, job_id, project_path, capture_id=None, timings=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, project_path = ?, capture_id = ?, timings = ? "
+                "WHERE id = ?",
+                (time.time(), str(project_path), capture_id, json.dumps(timings or {}), job_id)
+            )
+
+    def fail(self, job_id, error, timings=None, retry=True):
+        """Record a failed attempt; re-queue with backoff while attempts remain"""
+        job = self.get(job_id)
+        now = time.time()
+        with self._lock, self._conn:
+            if job['cancel_requested']:
+                status, not_before = 'cancelled', 0
+            elif retry and job['attempts'] < self.max_attempts:
+                status, not_before = 'queued', now + backoff_delay(job['attempts'])
+            else:
+                status, not_before = 'failed', 0
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, not_before = ?, error = ?, timings = ?, worker = NULL, "
+                "finished_at = CASE WHEN ? = 'queued' THEN NULL ELSE ? END WHERE id = ?",
+                (status, not_before, str(error), json.dumps(timings or {}), status, now, job_id)
+            )
+        return status
+
+    def cancel(self, job_id):
+        """Queued jobs are cancelled at once; running ones stop at their next stage boundary"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+            )
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['enhance'] = bool(job['enhance'])
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        job['timings'] = json.loads(job['timings']) if job['timings'] else {}
+        return job
+
+    def list(self, limit=50, status=None):
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [self.get(row['id']) for row in rows]
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def close(self):
+        self._conn.close()
+
+
+def parse_job_request(payload):
+    """(prompt, enhance, priority) from a POST /jobs body; ValueError with a client-facing message"""
+    if not isinstance(payload, dict):
+        raise ValueError('body must be a JSON object')
+    prompt = payload.get('prompt')
+    if prompt is None:
+        prompt = ''
+    if not isinstance(prompt, str):
+        raise ValueError('prompt must be a string')
+    prompt = prompt.strip()
+    if len(prompt) < 10:
+        raise ValueError('prompt must be at least 10 characters')
+    enhance = payload.get('enhance', False)
+    if not isinstance(enhance, bool):
+        raise ValueError('enhance must be true or false')
+    priority = payload.get('priority', 5)
+    if isinstance(priority, bool):
+        raise ValueError('priority must be an integer')
+    try:
+        priority = int(priority)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('priority must be an integer') from None
+    return prompt, enhance, priority
+
+
+def zip_project(project_path):
+    """Zip a project directory in memory, leaving out installed and built folders"""
+    project_path = Path(project_path)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for dirpath, dirnames, filenames in os.walk(project_path):
+            dirnames[:] = sorted(d for d in dirnames if d not in ARCHIVE_EXCLUDES)
+            for filename in sorted(filenames):
+                full_path = Path(dirpath) / filename
+                archive.write(full_path, Path(project_path.name) / full_path.relative_to(project_path))
+    return buffer.getvalue()
+
+
+class GenerationWorker(threading.Thread):
+    """
+    Owns one AIWebsiteGenerator (and so one browser connection). Only one
+    worker is supported: connecting restarts Brave on the shared logged-in
+    profile, which would kill any other worker's browser (see MAX_WORKERS).
+    """
+
+    def __init__(self, index, queue, config, poll_interval=1.0):
+        super().__init__(name=f"worker-{index}", daemon=True)
+        self.index = index
+        self.queue = queue
+        self.config = config
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.generator = None
+
+    def _start_generator(self):
+        from main import AIWebsiteGenerator
+        generator = AIWebsiteGenerator()
+        generator.config = self.config
+        if not generator.initialize_components():
+            raise RuntimeError('Could not initialize browser components')
+        return generator
+
+    def run(self):
+        while not self.stop_event.is_set():
+            job = self.queue.claim(self.name)
+            if job is None:
+                self.stop_event.wait(self.poll_interval)
+                continue
+            self.process(job)
+        if self.generator:
+            self.generator.cleanup()
+
+    def process(self, job):
+        with log_context(job_id=job['id']):
+            self._process(job)
+
+    def _process(self, job):
+        print(f"📦 {self.name}: job {job['id']} (attempt {job['attempts']})")
+        try:
+            if self.generator is None:
+                self.generator = self._start_generator()
+            self.generator.should_cancel = lambda: self.queue.is_cancel_requested(job['id'])
+            ok = self.generator.generate_website(job['prompt'], job['enhance'], job_id=job['id'])
+            timings = dict(self.generator.stage_timings)
+            if ok:
+                self.queue.finish(job['id'], self.generator.last_project_path,
+                                  self.generator.code_generator.last_capture_id, timings)
+                print(f"✅ {self.name}: job {job['id']} done")
+                return
+            retry = self.generator.code_generator.last_error != 'quota'
+            status = self.queue.fail(job['id'], 'Generation failed', timings, retry=retry)
+        except Exception as e:
+            status = self.queue.fail(job['id'], e)
+            # A broken browser session is rebuilt for the next job
+            if self.generator:
+                self.generator.cleanup()
+            self.generator = None
+        print(f"⚠️ {self.name}: job {job['id']} {status}")
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'LLMJobService/1.0'
+
+    def log_message(self, format, *args):
+        self.server.logger.info(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, indent=2, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _parts(self):
+        return [part for part in self.path.split('?')[0].split('/') if part]
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def do_GET(self):
+        queue = self.server.queue
+        parts = self._parts()
+        if parts == ['metrics']:
+            body = REGISTRY.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if parts == ['health']:
+            return self._send_json(200, {'status': 'ok', 'jobs': queue.counts(), 'workers': self.server.worker_count})
+        if parts == ['jobs']:
+            return self._send_json(200, {'jobs': queue.list()})
+        if len(parts) >= 2 and parts[0] == 'jobs':
+            job = queue.get(parts[1])
+            if job is None:
+                return self._send_json(404, {'error': 'job not found'})
+            if len(parts) == 2:
+                return self._send_json(200, job)
+            if parts[2] == 'archive':
+                if job['status'] != 'done' or not job['project_path'] or not Path(job['project_path']).is_dir():
+                    return self._send_json(409, {'error': f"job is {job['status']}, no project to download"})
+                data = zip_project(job['project_path'])
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/zip')
+                self.send_header('Content-Disposition',
+                                 f'attachment; filename="{Path(job["project_path"]).name}.zip"')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+        self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        queue = self.server.queue
+        parts = self._parts()
+        if parts == ['jobs']:
+            try:
+                payload = self._read_json()
+            except (ValueError, UnicodeDecodeError):
+                return self._send_json(400, {'error': 'body must be JSON'})
+            try:
+                prompt, enhance, priority = parse_job_request(payload)
+            except ValueError as e:
+                return self._send_json(400, {'error': str(e)})
+            job = queue.submit(prompt, enhance, priority)
+            return self._send_json(201, job)
+        if len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+            return self._cancel(parts[1])
+        self._send_json(404, {'error': 'not found'})
+
+    def do_DELETE(self):
+        parts = self._parts()
+        if len(parts) == 2 and parts[0] == 'jobs':
+            return self._cancel(parts[1])
+        self._send_json(404, {'error': 'not found'})
+
+    def _cancel(self, job_id):
+        job = self.server.queue.get(job_id)
+        if job is None:
+            return self._send_json(404, {'error': 'job not found'})
+        if job['status'] in FINAL_STATES:
+            return self._send_json(409, {'error': f"job already {job['status']}"})
+        self._send_json(202, self.server.queue.cancel(job_id))
+
+
+class JobService:
+    def __init__(self, config, db_path=None, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=1, logger=None):
+        if workers > MAX_WORKERS:
+            raise ValueError(f"workers={workers} is not supported: at most {MAX_WORKERS} worker can "
+                             f"drive the shared browser profile")
+        self.config = config
+        self.logger = logger or setup_logger()
+        self.queue = JobQueue(db_path, max_attempts=config.get('scheduler', {}).get('max_attempts', 3))
+        self.workers = [GenerationWorker(index, self.queue, config) for index in range(workers)]
+        self.httpd = ThreadingHTTPServer((host, port), JobRequestHandler)
+        self.httpd.queue = self.queue
+        self.httpd.logger = self.logger
+        self.httpd.worker_count = workers
+
+    def serve_forever(self):
+        for worker in self.workers:
+            worker.start()
+        host, port = self.httpd.server_address[:2]
+        print(f"🛰️ Job service listening on http://{host}:{port} with {len(self.workers)} worker(s)")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.stop_event.set()
+        self.httpd.server_close()
+
+
+def main():
+    from utils.config import DEFAULT_SETTINGS_PATH, configure, parse_cli_overrides
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument('--config', default=DEFAULT_SETTINGS_PATH, help='settings file')
+    pre_parser.add_argument('--set', metavar='KEY=VALUE', action='append', default=[],
+                            help='override a setting, e.g. --set service.workers=2 (repeatable)')
+    known, _ = pre_parser.parse_known_args()
+    config = configure(known.config, parse_cli_overrides(known.set))
+    service_config = config['service']
+    parser = argparse.ArgumentParser(description='Local job service for AI website generation',
+                                     parents=[pre_parser])
+    parser.add_argument('--host', default=service_config.get('host', DEFAULT_HOST))
+    parser.add_argument('--port', type=int, default=service_config.get('port', DEFAULT_PORT))
+    parser.add_argument('--workers', type=int, default=service_config.get('workers', 1))
+    parser.add_argument('--db', default=service_config.get('db_path', DEFAULT_DB_PATH))
+    args = parser.parse_args()
+    if not 0 < args.workers <= MAX_WORKERS:
+        parser.error(f"--workers must be between 1 and {MAX_WORKERS}: workers share one browser profile")
+
+    service = JobService(config, args.db, args.host, args.port, args.workers)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Job service stopped")
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,35 +6,25 @@ Standalone version with embedded configuration
 import os
 import sys
 import time
+import uuid
 from datetime import datetime
-import logging
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
+# Everything heavier (logging pipeline, metrics, Selenium, the builder) is
+# imported where it is first used, so --help, --dry-run and --build-only
+# start without loading the browser stack.
+from utils.config import get_config
 
-DEFAULT_CONFIG = {
-    'browser': {'debug_port': 9222},
-    'urls': {
-        'flexos': 'https://www.flexos.work/design/prompt',
-        'perplexity': 'https://www.perplexity.ai'
-    },
-    'timeouts': {
-        'page_load': 20,
-        'element_wait': 15,
-        'response_wait': 60
-    },
-    'project': {
-        'output_directory': '~/Desktop',
-        'project_prefix': 'AI_Generated_'
-    }
-}
 
 class AIWebsiteGenerator:
     def __init__(self):
-        self.config = DEFAULT_CONFIG
+        # Live view of defaults + config/settings.json + AIWG_* environment + --set;
+        # settings.json edits are picked up while running
+        self.config = get_config()
         self.logger = self._setup_logging()
         self.brave_controller = None
         self.prompt_enhancer = None
@@ -42,13 +32,19 @@ class AIWebsiteGenerator:
         self.project_creator = None
         self.start_time = None
         self.projects_created = 0
+        self.last_project_path = None
+        self.stage_timings = {}
+        self.should_cancel = None
 
     def _setup_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
+        import logging
+        from utils.logger import setup_logger
+        settings = self.config.get('logging', {})
+        return setup_logger(
+            log_dir=settings.get('directory', 'logs'),
+            level=getattr(logging, settings.get('level', 'INFO')),
+            console_level=getattr(logging, settings.get('console_level', 'WARNING'))
         )
-        return logging.getLogger(__name__)
 
     def print_banner(self):
         banner = """
@@ -127,7 +123,10 @@ class AIWebsiteGenerator:
             from tools.phase2_complete_project_builder import CompleteProjectBuilder
             self.prompt_enhancer = PromptEnhancer(self.brave_controller, self.config, self.logger)
             self.code_generator = CodeGenerator(self.brave_controller, self.config, self.logger)
-            self.project_creator = CompleteProjectBuilder()
+            self.project_creator = CompleteProjectBuilder(
+                component_links=self.config['project']['component_links'],
+                snapshots=self.config['project']['snapshots']
+            )
             return True
         except ImportError as e:
             print(f"❌ Missing component: {e}")
@@ -142,18 +141,38 @@ class AIWebsiteGenerator:
 
         return f"...[same as before]..."
 
-    def generate_website(self, user_prompt, enhance_prompt=True):
+    def _cancelled(self, stage):
+        """True (and reported) if the caller asked to stop before this stage"""
+        if self.should_cancel and self.should_cancel():
+            print(f"🛑 Cancelled before {stage}")
+            return True
+        return False
+
+    def generate_website(self, user_prompt, enhance_prompt=True, job_id=None):
+        from utils.logger import set_log_context
+        from utils.metrics import JOBS, STAGE_SECONDS
+        status = 'failed'
         try:
             print()
             print("=" * 60)
             print("🚀 Starting generation workflow...")
             print(f"⏰ Started at: {datetime.now().strftime('%H:%M:%S')}")
             self.start_time = time.time()
+            self.stage_timings = {}
+            self.last_project_path = None
+            job_id = job_id or uuid.uuid4().hex[:12]
+            set_log_context(job_id=job_id, stage='enhance')
+            self.logger.info(f"Generation started (enhance={bool(enhance_prompt)})")
 
+            stage_start = time.time()
             if enhance_prompt and self.prompt_enhancer:
                 print("📈 Step 1: Enhancing your prompt with AI...")
                 try:
-                    enhanced_prompt = self.prompt_enhancer.enhance_prompt(user_prompt)
+                    # Load Perplexity in the background while FlexOS works on the prompt
+                    self.code_generator.warm_up()
+                    enhanced_prompt = self.prompt_enhancer.enhance_prompt(
+                        user_prompt, while_waiting=self.code_generator.prepare_input
+                    )
                     final_prompt = enhanced_prompt
                 except Exception as e:
                     print(f"⚠️ Enhancement error: {e}")
@@ -163,20 +182,38 @@ class AIWebsiteGenerator:
                 print("📈 Step 1: Using original prompt directly")
                 final_prompt = user_prompt
                 print("✅ Original prompt ready!")
+            self.stage_timings['enhance'] = round(time.time() - stage_start, 3)
 
+            if self._cancelled('generation'):
+                return False
+            set_log_context(stage='generate')
             print("🤖 Step 2: Getting response from Perplexity Pro...")
             try:
-                response = self.code_generator.generate_code(final_prompt)
+                stage_start = time.time()
+                response = self.code_generator.generate_code(final_prompt, job_id=job_id)
+                self.stage_timings['generate'] = round(time.time() - stage_start, 3)
                 if not response:
                     print("❌ Failed to collect response")
                     return False
 
+                if self._cancelled('project build'):
+                    return False
+                set_log_context(stage='build')
                 print("🏗️ Step 3: Creating project folders/files from LLM response (no intermediate file)...")
-                project_path = self.project_creator.build_project_from_llm_response(response)
+                stage_start = time.time()
+                project_path = self.project_creator.build_project_from_llm_response(
+                    response,
+                    source_id=self.code_generator.last_capture_id,
+                    incremental=self.config['project'].get('incremental_builds', False)
+                )
+                self.stage_timings['build'] = round(time.time() - stage_start, 3)
                 if not project_path:
                     print("❌ Project creation from LLM response failed.")
                     return False
                 self._show_success_message(project_path)
+                self.last_project_path = project_path
+                self.logger.info(f"Project created at {project_path} {self.stage_timings}")
+                status = 'done'
                 self.projects_created += 1
                 return True
             except Exception as e:
@@ -187,6 +224,51 @@ class AIWebsiteGenerator:
                 self.logger.error(f"Website generation failed: {e}")
             print(f"❌ Generation error: {e}")
             return False
+        finally:
+            if self.start_time:
+                self.stage_timings['total'] = round(time.time() - self.start_time, 3)
+                STAGE_SECONDS.observe(self.stage_timings['total'], stage='total')
+            if self.should_cancel and self.should_cancel():
+                status = 'cancelled'
+            JOBS.inc(status=status)
+
+    def generate_batch(self, prompts, enhance_prompt=False, priority=5):
+        """
+        Run several prompts through the scheduler. All jobs share this
+        browser, so one worker runs at a time; accounts with no quota left
+        are skipped and failed jobs retry with backoff.
+        """
+        from core.scheduler import JobScheduler, QuotaExceeded
+        from utils.metrics import REGISTRY
+        settings = self.config.get('scheduler', {})
+        scheduler = JobScheduler(
+            settings.get('accounts', [{'provider': 'perplexity', 'name': 'default'}]),
+            max_attempts=settings.get('max_attempts', 3),
+            backoff_base=settings.get('backoff_base', 2.0),
+            backoff_cap=settings.get('backoff_cap', 120.0),
+            quota_reset_seconds=settings.get('quota_reset_hours', 24) * 3600,
+            logger=self.logger
+        )
+        for index, prompt in enumerate(prompts):
+            scheduler.submit({'prompt': prompt, 'enhance': enhance_prompt}, priority=priority,
+                             job_id=f"batch{index + 1:03d}")
+
+        def worker(job, account):
+            print(f"📦 Job {job['id']} (attempt {job['attempts']}) on {account['key']}")
+            if not self.generate_website(job['payload']['prompt'], job['payload']['enhance']):
+                if self.code_generator.last_error == 'quota':
+                    raise QuotaExceeded(remaining=0)
+                raise RuntimeError('Generation failed')
+            # Only a count read after the answer arrived; the login-time one predates this job's search
+            return str(self.last_project_path), self.code_generator.quota_after_answer
+
+        jobs = scheduler.run(worker, workers=1)
+        print(f"📦 Batch finished: {scheduler.stats()['jobs']}")
+        prom_path, _ = REGISTRY.dump(self.config.get('metrics', {}).get('dump_dir', 'logs'))
+        print(f"📈 Metrics written to {prom_path}")
+        for job in jobs:
+            print(f"   • {job['id']}: {job['status']} {job['result'] or job['error'] or ''}")
+        return jobs
 
     def _show_success_message(self, project_path):
         print()
@@ -253,14 +335,92 @@ class AIWebsiteGenerator:
             self.cleanup()
             print("👋 Thanks for using AI Website Generator!")
 
+def run_batch(prompt_file):
+    """Generate one project per non-empty line of prompt_file"""
+    from utils.metrics import start_metrics_server
+    with open(prompt_file, 'r', encoding='utf-8') as f:
+        prompts = [line.strip() for line in f if line.strip()]
+    generator = AIWebsiteGenerator()
+    metrics_port = generator.config.get('metrics', {}).get('port')
+    if metrics_port:
+        start_metrics_server(metrics_port)
+        print(f"📈 Metrics at http://127.0.0.1:{metrics_port}/metrics")
+    try:
+        if generator.initialize_components():
+            generator.generate_batch(prompts)
+    finally:
+        generator.cleanup()
+
+def build_only(response_file, incremental=False):
+    """Build a project from a saved LLM response; no browser is started"""
+    from tools.phase2_complete_project_builder import CompleteProjectBuilder
+    with open(response_file, 'r', encoding='utf-8') as f:
+        response = f.read()
+    project_path = CompleteProjectBuilder().build_project_from_llm_response(response, incremental=incremental)
+    if not project_path:
+        print("❌ Project creation from LLM response failed.")
+        return False
+    print(f"✅ Project created at {project_path}")
+    return True
+
+def dry_run():
+    """Print the resolved configuration and what a run would do, without importing Selenium"""
+    import json
+    manager = get_config()
+    config = manager.get()
+    generation = config.get('generation', {})
+    print("🧪 Dry run - nothing will be launched")
+    print(f"   • Browser debug port: {config['browser']['debug_port']}")
+    print(f"   • Enhancement: {config['urls']['flexos']}")
+    print(f"   • Generation: {config['urls']['perplexity']}")
+    if generation.get('race_providers'):
+        print(f"   • Racing providers: {', '.join(generation['race_providers'])}")
+    if generation.get('shards', 0) > 1:
+        print(f"   • Shards: {generation['shards']}")
+    print(f"   • Output: {config['project']['output_directory']}")
+    print(f"   • Settings file: {manager.path}")
+    print(json.dumps(config.as_dict(), indent=2, default=str))
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='AI Website Generator')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--batch', metavar='FILE', help='generate one project per line of FILE')
+    mode.add_argument('--build-only', metavar='RESPONSE_FILE',
+                      help='build a project from a saved LLM response without starting the browser')
+    mode.add_argument('--dry-run', action='store_true', help='print the resolved configuration and exit')
+    parser.add_argument('--incremental', action='store_true', help='with --build-only, reuse unchanged files')
+    parser.add_argument('--config', metavar='PATH', help='settings file (default: config/settings.json)')
+    parser.add_argument('--set', metavar='KEY=VALUE', action='append', default=[],
+                        help='override a setting, e.g. --set timeouts.page_load=30 (repeatable)')
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
     try:
+        from utils.config import DEFAULT_SETTINGS_PATH, configure, parse_cli_overrides
+        configure(args.config or DEFAULT_SETTINGS_PATH, parse_cli_overrides(args.set))
+        if args.dry_run:
+            dry_run()
+            return
+        if args.build_only:
+            if not build_only(args.build_only, incremental=args.incremental):
+                sys.exit(1)
+            return
+        if args.batch:
+            run_batch(args.batch)
+            return
         generator = AIWebsiteGenerator()
         generator.run()
     except Exception as e:
         print(f"💥 Fatal error: {e}")
         print("❌ Please check your setup and try again")
         sys.exit(1)
+    finally:
+        # Flush queued log records before exiting, on error exits too (only if logging was set up)
+        logger_module = sys.modules.get('utils.logger')
+        if logger_module is not None:
+            logger_module.shutdown_logging()
 
 if __name__ == "__main__":
     main()
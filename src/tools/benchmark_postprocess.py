@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Post-processing benchmark
+Compares the old per-component cleanup with the batch pass in tools/postprocess.py
+and times the component validation gate that runs before files are written
+
+    python src/tools/benchmark_postprocess.py [--components 5000] [--workers 4]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from tools.postprocess import clean_components, PARALLEL_MIN_CHARS
+from tools.component_checks import validate_component
+from tools.phase2_complete_project_builder import parse_code_components
+
+FENCES = ['```jsx\n', '```javascript\n', 'jsx\n', '', '```\n']
+IMPORTS = [
+    "import React from 'react';",
+    "import { useState, useEffect } from 'react';",
+    "import { motion } from 'framer-motion';",
+    "import { Menu, X, ChevronRight } from 'lucide-react';",
+    "import './styles.css';"
+]
+
+
+def legacy_clean(code):
+    """The cleanup parse_code_components used to run for each block"""
+    code = '\n'.join(line.rstrip() for line in code.split('\n')).strip()
+    for lang in ['jsx', 'javascript', 'js', 'typescript', 'ts', 'tsx', 'bash', 'json']:
+        if code.startswith(f'{lang}\n'):
+            code = code[len(lang)+1:]
+            break
+    if code.startswith('```'):
+        code = '\n'.join(code.split('\n')[1:])
+    if code.endswith('```'):
+        code = '\n'.join(code.split('\n')[:-1])
+    return code.strip()
+
+
+def synthetic_component(index, rng, body_lines):
+    name = f"Component{index}"
+    imports = rng.sample(IMPORTS, 3) + [rng.choice(IMPORTS)]
+    body = '\n'.join(
+        f"      <div className=\"p-{i % 8} text-gray-{(i % 9 + 1) * 100}\">Item {i} of {name}</div>   "
+        for i in range(body_lines)
+    )
+    code = (
+        '\n'.join(imports) + f"\n\nexport default function {name}() {{\n  return (\n    <section>\n"
+        + body + "\n    </section>\n  );\n}\n"
+    )
+    fence = rng.choice(FENCES)
+    closing = '```\n' if fence.startswith('```') else ''
+    if rng.random() < 0.3:
+        code = code.replace('\n', '\r\n')
+    return f"// Component: {name}\n// File: src/components/{name}/{name}.jsx\n{fence}{code}{closing}\n"
+
+
+def timed(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark component post-processing')
+    parser.add_argument('--components', type=int, default=5000)
+    parser.add_argument('--body-lines', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    answer = ''.join(synthetic_component(i, rng, args.body_lines) for i in range(args.components))
+    blocks = answer.split('// Component: ')[1:]
+    raw_codes = [block.split('\n', 2)[2] for block in blocks]
+    print(f"📦 {args.components:,} components, {len(answer) / 1024 / 1024:.1f} MiB of answer text")
+
+    legacy_ms, legacy = timed(lambda: [legacy_clean(code) for code in raw_codes], args.repeat)
+    batch_ms, batch = timed(lambda: clean_components(raw_codes, workers=1), args.repeat)
+    parallel_ms, parallel = timed(
+        lambda: clean_components(raw_codes, workers=args.workers, min_parallel_chars=0), args.repeat)
+    parse_ms, components = timed(lambda: parse_code_components(answer), args.repeat)
+    validate_ms, checked = timed(
+        lambda: [validate_component(c['code'], c['file_path']) for c in components], args.repeat)
+
+    print(f"{'stage':<38} {'median ms':>10} {'per component µs':>17}")
+    for label, ms in (('legacy per-component cleanup', legacy_ms),
+                      ('batch clean (1 process)', batch_ms),
+                      (f'batch clean ({args.workers} processes)', parallel_ms),
+                      ('parse_code_components (split + clean)', parse_ms),
+                      ('validate_component (write gate)', validate_ms)):
+        print(f"{label:<38} {ms:>10.1f} {ms * 1000 / args.components:>17.1f}")
+
+    removed = sum(len(a.split('\n')) - len(b.split('\n')) for a, b in zip(legacy, batch))
+    print(f"🧹 Repeated imports removed: {removed:,} lines; parallel output identical: {parallel == batch}")
+    print(f"🧩 Components parsed: {len(components):,}; flagged by the write gate: "
+          f"{sum(1 for result in checked if result['problems']):,}")
+    print(f"⚙️ Process pool is used automatically above {PARALLEL_MIN_CHARS / 1e6:.0f}M characters")
+
+
+if __name__ == "__main__":
+    main()
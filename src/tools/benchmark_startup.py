@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Times each entry point in a fresh interpreter and records which heavy modules it loaded
+
+    python src/tools/benchmark_startup.py [--runs 5] [--output logs/startup_benchmark.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(SRC_DIR)
+DEFAULT_OUTPUT = os.path.join(REPO_DIR, 'logs', 'startup_benchmark.json')
+
+# Modules that only the browser path should pay for
+HEAVY_MODULES = ('selenium', 'requests', 'http.server', 'sqlite3', 'logging')
+
+# Printed by the probe after the entry point finishes importing/running
+PROBE = (
+    "import sys, json; "
+    "print('@@MODULES@@' + json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+)
+
+ENTRY_POINTS = {
+    'main --help': ['-c', "import sys; sys.argv = ['main.py', '--help']\n"
+                          "import runpy\n"
+                          "try:\n"
+                          "    runpy.run_path('src/main.py', run_name='__main__')\n"
+                          "except SystemExit:\n"
+                          "    pass\n"],
+    'main --dry-run': ['-c', "import sys; sys.argv = ['main.py', '--dry-run']\n"
+                             "import runpy\n"
+                             "runpy.run_path('src/main.py', run_name='__main__')\n"],
+    'import main': ['-c', "import sys; sys.path.insert(0, 'src')\nimport main\n"],
+    'import builder': ['-c', "import sys; sys.path.insert(0, 'src')\n"
+                             "import tools.phase2_complete_project_builder\n"],
+    'import use_enhanced_method': ['-c', "import sys; sys.path.insert(0, '.')\nimport use_enhanced_method\n"],
+    'job_service --help': ['-c', "import sys; sys.argv = ['job_service.py', '--help']\n"
+                                 "import runpy\n"
+                                 "try:\n"
+                                 "    runpy.run_path('src/job_service.py', run_name='__main__')\n"
+                                 "except SystemExit:\n"
+                                 "    pass\n"],
+}
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def run_once(args):
+    """Wall time in ms and the heavy modules present at exit, for one fresh interpreter"""
+    code = args[1] + PROBE.format(heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, args[0], code], cwd=REPO_DIR,
+                            capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    loaded = []
+    for line in result.stdout.splitlines():
+        if line.startswith('@@MODULES@@'):
+            loaded = json.loads(line[len('@@MODULES@@'):])
+    return elapsed, loaded, result.returncode
+
+
+def import_profile(args, top=8):
+    """Total import time and the slowest top-level imports, from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=REPO_DIR,
+                            capture_output=True, text=True)
+    total = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent <= 1:
+            total += cumulative
+            modules.append((cumulative, name))
+    modules.sort(reverse=True)
+    return round(total / 1000, 1), [{'module': name, 'ms': round(us / 1000, 1)} for us, name in modules[:top]]
+
+
+def benchmark(runs=5):
+    results = {}
+    for name, args in ENTRY_POINTS.items():
+        timings = []
+        loaded = []
+        returncode = 0
+        for _ in range(runs):
+            elapsed, loaded, returncode = run_once(args)
+            timings.append(elapsed)
+        import_ms, slowest = import_profile(args)
+        results[name] = {
+            'median_ms': round(statistics.median(timings), 1),
+            'min_ms': round(min(timings), 1),
+            'import_ms': import_ms,
+            'slowest_imports': slowest,
+            'heavy_modules': loaded,
+            'ok': returncode == 0
+        }
+    return results
+
+
+def load_previous(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('results', {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure startup time of each entry point')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    previous = load_previous(args.output)
+    results = benchmark(args.runs)
+
+    print(f"{'entry point':<28} {'median ms':>10} {'import ms':>10} {'delta':>8}  heavy modules")
+    for name, entry in results.items():
+        before = previous.get(name, {}).get('median_ms')
+        delta = f"{entry['median_ms'] - before:+.1f}" if before is not None else '-'
+        heavy = ', '.join(entry['heavy_modules']) or '-'
+        status = '' if entry['ok'] else '  (exit != 0)'
+        print(f"{name:<28} {entry['median_ms']:>10.1f} {entry['import_ms']:>10.1f} {delta:>8}  {heavy}{status}")
+
+    browser_free = [name for name in ('main --help', 'main --dry-run', 'import builder')
+                    if 'selenium' in results[name]['heavy_modules']]
+    if browser_free:
+        print(f"⚠️ Selenium imported by: {', '.join(browser_free)}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0],
+                   'runs': args.runs, 'results': results}, f, indent=2)
+    print(f"📊 Saved to {args.output}")
+    return 1 if browser_free else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""
+Component checks
+Cheap structural checks and repairs for generated components, and continuation stitching
+"""
+
+import re
+
+PAIRS = {'(': ')', '[': ']', '{': '}'}
+CLOSERS = {')': '(', ']': '[', '}': '{'}
+EXPORT_PATTERN = re.compile(r'\bexport\s+(?:default\b|const\b|function\b|class\b|\{)|module\.exports\b')
+# Unrolled attribute loop (plain run, then one quoted/braced/slash item per turn): linear, and it
+# starts with a literal '<' so the regex engine can skip straight between tags
+JSX_TAG = re.compile(
+    r'<(?:(?<![\w)\]]<)|(?=/))(/?)([A-Za-z][\w.]*)'
+    r'([^<>"\'{}/]*(?:(?:/(?!>)|"[^"]*"|\'[^\']*\'|\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})[^<>"\'{}/]*)*)(/?)>'
+)
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+CODE_FENCE = re.compile(r'^```\w*\s*$', re.MULTILINE)
+SCRIPT_SUFFIXES = ('.jsx', '.tsx', '.js', '.ts')
+# A quote only starts a string after one of these; elsewhere it is JSX text such as "Don't"
+STRING_CONTEXT = set('=(,:[{?!&|;+')
+# A '/' only starts a regex literal after one of these; elsewhere it is division or a closing tag
+REGEX_CONTEXT = set('=(,[{?!&|;')
+MAX_OVERLAP_LINES = 40
+# Quotes, and '/' for comments and regex literals
+LITERAL_STOPS = ('"', "'", '`', '/')
+# className="..." and friends: by far the most common literal, blanked in a single C-level pass
+ATTRIBUTE_STRING = re.compile(r'="[^"\\\n]*"')
+DOUBLE_END = re.compile(r'(?:[^"\\\n]|\\.)*(["\n])', re.DOTALL)
+SINGLE_END = re.compile(r"(?:[^'\\\n]|\\.)*(['\n])", re.DOTALL)
+# Template text up to the closing backtick or the next '${'
+TEMPLATE_TEXT = re.compile(r'(?:[^`\\$]|\\.|\$(?!\{))*', re.DOTALL)
+# Code inside '${...}' up to the next brace, literal or comment
+TEMPLATE_CODE = re.compile(r'[^{}`"\'/]*')
+REGEX_LITERAL = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*')
+NON_BRACKET = re.compile(r'[^()\[\]{}]+')
+# A sentence, not code: unindented, starts with a word or markdown marker
+PROSE_LINE = re.compile(r'(?:[*#>-]+\s*)?[A-Z][a-z]+(?:\s+\S+){2,}')
+CODE_CHARS = re.compile(r'[;{}()=<>]')
+# Last characters of a line that completes a statement, block or JSX element
+CODE_LINE_ENDS = (';', '}', ')', ']', ',', '>')
+
+
+def _starts_string(code, index):
+    recent = code[max(0, index - 20):index].rstrip()
+    return not recent or recent[-1] in STRING_CONTEXT or recent.endswith(('return', 'from', 'import'))
+
+
+def _regex_end(code, index):
+    """End of the regex literal starting at the '/' at index, or -1 when that '/' is division or a tag"""
+    recent = code[max(0, index - 20):index].rstrip()
+    if recent and recent[-1] not in REGEX_CONTEXT and not recent.endswith('return'):
+        return -1
+    match = REGEX_LITERAL.match(code, index)
+    return match.end() if match else -1
+
+
+def _comment_end(code, index):
+    """End of the comment starting at the '/' at index (the newline stays), or -1 when it is not one"""
+    if code[index + 1:index + 2] == '*':
+        end = code.find('*/', index + 2)
+        return len(code) if end == -1 else end + 2
+    if code[index + 1:index + 2] == '/' and code[index - 1:index] != ':':
+        end = code.find('\n', index)
+        return len(code) if end == -1 else end
+    return -1
+
+
+def _template_end(code, index):
+    """
+    End of the template literal whose text starts at index (just past the
+    backtick), or -1 if it never closes. Code inside ${...} is followed
+    brace by brace, so nested templates, strings and braces there do not end
+    the template early.
+    """
+    n = len(code)
+    while True:
+        index = TEMPLATE_TEXT.match(code, index).end()
+        if index >= n or code[index] != '$' and code[index] != '`':
+            return -1
+        if code[index] == '`':
+            return index + 1
+        index += 2
+        depth = 0
+        while depth >= 0:
+            index = TEMPLATE_CODE.match(code, index).end()
+            if index >= n:
+                return -1
+            ch = code[index]
+            if ch == '{':
+                depth += 1
+                index += 1
+            elif ch == '}':
+                depth -= 1
+                index += 1
+            elif ch == '`':
+                index = _template_end(code, index + 1)
+            elif ch == '/':
+                end = _comment_end(code, index)
+                if end == -1:
+                    end = _regex_end(code, index)
+                index = index + 1 if end == -1 else end
+            else:
+                end = (DOUBLE_END if ch == '"' else SINGLE_END).match(code, index + 1)
+                index = -1 if end is None or code[end.end() - 1] == '\n' else end.end()
+            if index == -1:
+                return -1
+
+
+def _strip_literals(code):
+    """
+    Blank out strings, template literals, regex literals and comments so
+    their brackets are not counted. A minimal tokenizer: plain JSX attribute
+    strings go in one regex pass, then it jumps between the remaining quotes
+    and slashes with str.find instead of visiting every character.
+    """
+    if '="' in code:
+        code = ATTRIBUTE_STRING.sub('=""', code)
+    out = []
+    i = 0
+    n = len(code)
+    next_stop = {token: code.find(token) for token in LITERAL_STOPS}
+    while i < n:
+        start = -1
+        for token, position in next_stop.items():
+            if -1 < position < i:
+                position = next_stop[token] = code.find(token, i)
+            if position != -1 and (start == -1 or position < start):
+                start = position
+        if start == -1:
+            out.append(code[i:])
+            break
+        out.append(code[i:start])
+        ch = code[start]
+        if ch == '/':
+            # Closing and self-closing tags are by far the most common '/' and need no lookback
+            end = -1
+            if code[start - 1:start] != '<' and code[start + 1:start + 2] != '>':
+                end = _comment_end(code, start)
+                if end == -1:
+                    end = _regex_end(code, start)
+                    if end != -1:
+                        out.append('""')
+            if end == -1:
+                # Division, a tag or the '://' of a URL
+                out.append(ch)
+                i = start + 1
+            else:
+                i = end
+            continue
+        if ch == '`':
+            end = _template_end(code, start + 1)
+            if end == -1:
+                # Literal never closed - that is a truncation in itself
+                out.append(ch)
+                return ''.join(out), True
+            out.append('""')
+            i = end
+            continue
+        if code[start - 1:start] not in STRING_CONTEXT and not _starts_string(code, start):
+            out.append(ch)
+            i = start + 1
+            continue
+        # Fast path for the common plain string (JSX attributes): no escapes, same line
+        close = code.find(ch, start + 1)
+        if close != -1:
+            body = code[start + 1:close]
+            if '\\' not in body and '\n' not in body:
+                out.append('""')
+                i = close + 1
+                continue
+        end = (DOUBLE_END if ch == '"' else SINGLE_END).match(code, start + 1)
+        if end is None:
+            out.append(ch)
+            return ''.join(out), True
+        if code[end.end() - 1] == '\n':
+            # Plain strings cannot span lines: this quote was text, not a string
+            out.append(ch)
+            i = start + 1
+            continue
+        out.append('""')
+        i = end.end()
+    return ''.join(out), False
+
+
+def _reduce_pairs(brackets):
+    """Cancel adjacent matched pairs until none are left; what remains is the unbalanced part"""
+    while True:
+        reduced = brackets.replace('()', '').replace('[]', '').replace('{}', '')
+        if reduced == brackets:
+            return reduced
+        brackets = reduced
+
+
+def scan(code):
+    """Literal-free code plus bracket state: (stripped, open_literal, unclosed_stack, unexpected_closer)"""
+    stripped, open_literal = _strip_literals(code)
+    brackets = NON_BRACKET.sub('', stripped)
+    remaining = _reduce_pairs(brackets)
+    if not set(remaining) & CLOSERS.keys():
+        # Only openers left: nothing mismatched, and they are exactly the unclosed stack
+        return stripped, open_literal, list(remaining), None
+    stack = []
+    for ch in brackets:
+        if ch in PAIRS:
+            stack.append(ch)
+        elif not stack or stack[-1] != CLOSERS[ch]:
+            return stripped, open_literal, stack, ch
+        else:
+            stack.pop()
+    return stripped, open_literal, stack, None
+
+
+def _bracket_messages(open_literal, stack, unexpected):
+    problems = ['unterminated string or template literal'] if open_literal else []
+    if unexpected:
+        problems.append(f"unexpected '{unexpected}'")
+    elif stack:
+        problems.append(f"{len(stack)} unclosed bracket(s): {''.join(stack)}")
+    return problems
+
+
+def _unclosed_tags(stripped):
+    stack = []
+    for match in JSX_TAG.finditer(stripped):
+        closing, name, _attrs, self_closing = match.groups()
+        if self_closing or name.lower() in VOID_TAGS:
+            continue
+        if closing:
+            if name in stack:
+                while stack and stack.pop() != name:
+                    pass
+        else:
+            stack.append(name)
+    return stack
+
+
+def bracket_problems(code):
+    """Unclosed or mismatched (), [] and {} outside strings and comments"""
+    _stripped, open_literal, stack, unexpected = scan(code)
+    return _bracket_messages(open_literal, stack, unexpected)
+
+
+def jsx_problems(code):
+    """JSX elements opened but never closed (self-closing and void tags excluded)"""
+    stack = _unclosed_tags(_strip_literals(code)[0])
+    return [f"unclosed JSX element(s): {', '.join('<' + name + '>' for name in stack)}"] if stack else []
+
+
+def _is_script(file_path):
+    return not file_path or file_path.endswith(SCRIPT_SUFFIXES)
+
+
+def _wants_export(file_path):
+    return not file_path.endswith(('main.jsx', 'main.tsx', 'index.js'))
+
+
+def check_component(code, file_path=''):
+    """List of structural problems in a component; empty means it looks complete"""
+    if not _is_script(file_path):
+        return []
+    stripped, open_literal, stack, unexpected = scan(code)
+    problems = _bracket_messages(open_literal, stack, unexpected)
+    if file_path.endswith(('.jsx', '.tsx')) or '<' in code and 'return' in code:
+        tags = _unclosed_tags(stripped)
+        if tags:
+            problems.append(f"unclosed JSX element(s): {', '.join('<' + name + '>' for name in tags)}")
+    if not EXPORT_PATTERN.search(code) and _wants_export(file_path):
+        problems.append('no export')
+    return problems
+
+
+def _trim_trailing_prose(code):
+    """
+    Drop explanation lines the LLM appended after the last line of code;
+    returns (code, lines_removed). Only unindented sentences set off from
+    the last line of code by a blank line count, so JSX text is never touched.
+    """
+    lines = code.rstrip().split('\n')
+    end = len(lines)
+    while end > 1 and (not lines[end - 1].strip()
+                       or PROSE_LINE.match(lines[end - 1]) and not CODE_CHARS.search(lines[end - 1])):
+        end -= 1
+    if end == len(lines) or lines[end].strip() or not lines[end - 1].rstrip().endswith(CODE_LINE_ENDS):
+        return code, 0
+    return '\n'.join(lines[:end]), sum(1 for line in lines[end:] if line.strip())
+
+
+def repair_component(code, file_path=''):
+    """
+    Fix breakage that has one obvious repair; returns (code, repairs). Stray
+    code fences and trailing prose are removed, and a component whose name
+    matches its file gets the missing export default. Brackets are never
+    closed: an unbalanced stack may just as well be a scanner miss on valid
+    code, so it is left for the caller to flag along with anything else
+    ambiguous (unclosed JSX, open strings).
+    """
+    repairs = []
+    if not _is_script(file_path):
+        return code, repairs
+
+    if '```' in code:
+        fenced = CODE_FENCE.sub('', code)
+        if fenced != code:
+            code = fenced.strip('\n')
+            repairs.append('removed stray code fence')
+
+    code, removed = _trim_trailing_prose(code)
+    if removed:
+        repairs.append(f"removed {removed} trailing prose line(s)")
+
+    if _wants_export(file_path) and not EXPORT_PATTERN.search(code):
+        name = file_path.rsplit('/', 1)[-1].split('.', 1)[0]
+        if name and re.search(r'\b(?:function|const|class)\s+' + re.escape(name) + r'\b', code):
+            code = code.rstrip() + f"\n\nexport default {name};\n"
+            repairs.append(f"added export default {name}")
+    return code, repairs
+
+
+def validate_component(code, file_path=''):
+    """
+    The write gate: repair what can be repaired, then report what is still
+    wrong. Returns {'code', 'repairs', 'problems'}.
+    """
+    problems = check_component(code, file_path)
+    if not problems and '```' not in code:
+        return {'code': code, 'repairs': [], 'problems': []}
+    repaired, repairs = repair_component(code, file_path)
+    return {'code': repaired, 'repairs': repairs,
+            'problems': check_component(repaired, file_path) if repairs else problems}
+
+
+def is_truncated(code, file_path=''):
+    """Truncation shows up as something left open; a missing export alone is not truncation"""
+    return any(problem != 'no export' for problem in check_component(code, file_path))
+
+
+def continuation_code(answer, file_path):
+    """The code part of a continuation answer, without fences and without a repeated header"""
+    marker = answer.find(f'// File: {file_path}')
+    if marker != -1:
+        answer = answer[answer.find('\n', marker) + 1:] if '\n' in answer[marker:] else ''
+    next_component = answer.find('// Component:')
+    if next_component > 0:
+        answer = answer[:next_component]
+    return CODE_FENCE.sub('', answer).strip('\n')
+
+
+def stitch(code, continuation):
+    """
+    Append a continuation to truncated code. A restart of the whole component
+    replaces it; otherwise the longest run of lines that ends the original and
+    starts the continuation is only kept once.
+    """
+    if not continuation.strip():
+        return code
+    head = code.strip()[:200]
+    if head and continuation.strip().startswith(head):
+        return continuation.strip()
+
+    code_lines = code.rstrip().split('\n')
+    cont_lines = continuation.split('\n')
+    while cont_lines and not cont_lines[0].strip():
+        cont_lines.pop(0)
+
+    for size in range(min(MAX_OVERLAP_LINES, len(code_lines), len(cont_lines)), 0, -1):
+        tail = [line.strip() for line in code_lines[-size:]]
+        lead = [line.strip() for line in cont_lines[:size]]
+        if tail == lead and any(tail):
+            return '\n'.join(code_lines + cont_lines[size:])
+
+    # The original usually stops mid-line; a continuation that repeats that partial line replaces it
+    last = code_lines[-1].strip()
+    if last and cont_lines and cont_lines[0].strip().startswith(last):
+        return '\n'.join(code_lines[:-1] + cont_lines)
+    return '\n'.join(code_lines + cont_lines)
@@ -0,0 +1,174 @@
+"""
+Import graph
+Module-level import analysis across extracted components: roots, reachability,
+missing modules, a synthesized App.jsx and the npm packages actually imported
+"""
+
+import posixpath
+import re
+
+# import x from '...', import '...', export { x } from '...', import('...'), require('...')
+MODULE_SPECIFIER = re.compile(
+    r'''(?:\bimport\s*(?:[\w$*{}\s,]+?\s*\bfrom\s*)?|\bexport\s*(?:\*(?:\s*as\s+[\w$]+)?|\{[^{}]*\})\s*from\s*'''
+    r'''|\bimport\s*\(\s*|\brequire\s*\(\s*)['"]([^'"\n]+)['"]'''
+)
+DEFAULT_EXPORT = re.compile(r'\bexport\s+default\s+(?:(?:async\s+)?function\s*\*?\s*|class\s+)?([A-Za-z_$][\w$]*)?')
+SCRIPT_SUFFIXES = ('.jsx', '.tsx', '.js', '.ts')
+# Order Vite tries for an extensionless import
+RESOLVE_SUFFIXES = ('.jsx', '.tsx', '.js', '.ts', '.mjs', '.json')
+APP_PATHS = ('src/App.jsx', 'src/App.tsx', 'src/App.js', 'src/App.ts')
+ENTRY_PATH = 'src/main.jsx'
+# Packages the generated src/main.jsx itself imports
+ENTRY_PACKAGES = ('react', 'react-dom')
+NODE_BUILTINS = frozenset((
+    'assert', 'buffer', 'child_process', 'cluster', 'crypto', 'dns', 'events', 'fs', 'http', 'http2',
+    'https', 'module', 'net', 'os', 'path', 'perf_hooks', 'process', 'querystring', 'readline',
+    'stream', 'string_decoder', 'timers', 'tls', 'url', 'util', 'v8', 'vm', 'worker_threads', 'zlib'
+))
+
+
+def module_specifiers(code):
+    """Every module a file imports, re-exports from or requires, in source order"""
+    if 'import' not in code and 'require' not in code and 'from' not in code:
+        return []
+    return [match.group(1) for match in MODULE_SPECIFIER.finditer(code)]
+
+
+def is_relative(specifier):
+    """'./x', '../x' and root-relative '/src/x' point into the project; anything else is a package"""
+    return specifier.startswith(('./', '../', '/')) or specifier in ('.', '..')
+
+
+def package_name(specifier):
+    """'@scope/pkg/sub' -> '@scope/pkg', 'pkg/sub' -> 'pkg'; None for relative or virtual modules"""
+    if is_relative(specifier) or ':' in specifier or specifier.startswith(('#', '~', '@/')):
+        return None
+    parts = specifier.split('/')
+    if specifier.startswith('@'):
+        return '/'.join(parts[:2]) if len(parts) > 1 else None
+    return parts[0] or None
+
+
+def imported_packages(codes):
+    """
+    npm packages imported anywhere in codes, in first-seen order. One scan
+    of the compiled pattern over all sources joined together; relative
+    paths, virtual modules and Node built-ins are left out.
+    """
+    packages = {}
+    for match in MODULE_SPECIFIER.finditer('\n'.join(codes)):
+        name = package_name(match.group(1))
+        if name and name not in NODE_BUILTINS:
+            packages.setdefault(name, None)
+    return list(packages)
+
+
+def resolve(specifier, importer, files):
+    """Project path a relative import points at (Vite's extension and index lookup), or None"""
+    if specifier.startswith('/'):
+        base = specifier.lstrip('/')
+    else:
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), specifier))
+    base = base.split('?', 1)[0]
+    if base in files:
+        return base
+    for suffix in RESOLVE_SUFFIXES:
+        if base + suffix in files:
+            return base + suffix
+    for suffix in RESOLVE_SUFFIXES:
+        if f"{base}/index{suffix}" in files:
+            return f"{base}/index{suffix}"
+    return None
+
+
+class ImportGraph:
+    """
+    Edges between project files from their import statements. sources maps
+    path -> code for every file whose imports matter; known_files are other
+    paths that exist in the project (generated configs, css) and may be
+    imported but are not scanned.
+    """
+
+    def __init__(self, sources, known_files=()):
+        self.sources = dict(sources)
+        self.files = set(self.sources) | set(known_files)
+        self.edges = {}
+        self.missing = []
+        for path, code in self.sources.items():
+            targets = []
+            for specifier in module_specifiers(code):
+                if is_relative(specifier):
+                    target = resolve(specifier, path, self.files)
+                    if target is None:
+                        self.missing.append({'file_path': path, 'module': specifier})
+                    elif target not in targets:
+                        targets.append(target)
+            self.edges[path] = targets
+
+    def roots(self):
+        """Scanned files no other scanned file imports, in insertion order"""
+        imported = {target for targets in self.edges.values() for target in targets}
+        return [path for path in self.sources if path not in imported]
+
+    def reachable(self, entries):
+        """Every file reachable from the entry paths (entries included)"""
+        seen = set()
+        pending = [path for path in entries if path in self.files]
+        while pending:
+            path = pending.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            pending.extend(self.edges.get(path, ()))
+        return seen
+
+
+def _identifier(file_path, taken):
+    stem = posixpath.basename(file_path).split('.', 1)[0]
+    name = ''.join(part[:1].upper() + part[1:] for part in re.split(r'[^A-Za-z0-9]+', stem) if part) or 'Section'
+    if name[0].isdigit():
+        name = 'Section' + name
+    candidate = name
+    counter = 2
+    while candidate in taken:
+        candidate = f"{name}{counter}"
+        counter += 1
+    taken.add(candidate)
+    return candidate
+
+
+def is_renderable(file_path, code):
+    """A component App can render: default export from a JSX file (or a .js file containing JSX)"""
+    if not file_path.endswith(SCRIPT_SUFFIXES) or not DEFAULT_EXPORT.search(code):
+        return False
+    return file_path.endswith(('.jsx', '.tsx')) or '</' in code or '/>' in code
+
+
+def synthesize_app(components, app_path='src/App.jsx'):
+    """
+    App.jsx source that renders the given components top to bottom, in
+    the order given. components is a list of (file_path, code).
+    """
+    app_dir = posixpath.dirname(app_path)
+    taken = {'App', 'React'}
+    imports = []
+    elements = []
+    for file_path, _code in components:
+        name = _identifier(file_path, taken)
+        relative = posixpath.relpath(file_path, app_dir).rsplit('.', 1)[0]
+        if not relative.startswith('.'):
+            relative = './' + relative
+        imports.append(f"import {name} from '{relative}';")
+        elements.append(f"      <{name} />")
+
+    body = '\n'.join(elements) if elements else '      <h1>LLM Generated Project</h1>'
+    return ("import React from 'react';\n"
+            + ''.join(line + '\n' for line in imports)
+            + "\nfunction App() {\n"
+            + "  return (\n"
+            + "    <div className=\"min-h-screen\">\n"
+            + body + "\n"
+            + "    </div>\n"
+            + "  );\n"
+            + "}\n\n"
+            + "export default App;\n")
@@ -1,22 +1,206 @@
 import os
 import re
+import sys
 import json
+import time
+import shutil
+import hashlib
 from pathlib import Path
 from datetime import datetime
 
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+from utils.response_archive import ResponseArchive
+from utils.artifact_store import ArtifactStore
+from utils.component_index import ComponentIndex, content_hash, make_deletable, unlink_file
+from tools.component_checks import validate_component
+from tools.postprocess import clean_components
+from tools.import_graph import (ImportGraph, APP_PATHS, ENTRY_PATH, ENTRY_PACKAGES, SCRIPT_SUFFIXES,
+                                imported_packages, is_renderable, synthesize_app)
+from utils.metrics import STAGE_SECONDS, CACHE_REQUESTS
+
+
+# Versions used when a package is needed but the response did not declare it
+DEFAULT_VERSIONS = {'react': '^18.2.0', 'react-dom': '^18.2.0'}
+
+
+def _package_spec(token):
+    """'pkg@1.2.3' -> ('pkg', '1.2.3'), 'pkg' -> ('pkg', 'latest'); None for flags such as -D"""
+    if not token or token.startswith('-'):
+        return None
+    name, at, version = token.rpartition('@')
+    if not at or not name:
+        return token, 'latest'
+    return name, version or 'latest'
+
+
+def _remove_readonly(func, path, exc_info):
+    """rmtree error handler: retry read-only files Windows refused to delete"""
+    if not os.path.exists(path) or not make_deletable(path):
+        raise exc_info[1]
+    func(path)
+
+
+# Searched by its literal text (fast) and checked for a line start afterwards;
+# a ^[ \t]* anchor would make the engine try every line of the answer
+COMPONENT_LINE = re.compile(r'// Component:[ \t]*(.*?)[ \t]*$', re.MULTILINE)
+FILE_LINE = re.compile(r'\n[ \t]*// File:[ \t]*(.*?)[ \t]*(?:\n|\Z)')
+
+
+def parse_code_components(content, min_length=50, rejected=None):
+    """
+    Split an LLM response into components marked with // Component: and // File: headers.
+    Blocks of min_length characters or fewer are skipped; pass a list as
+    rejected to get them back with the reason instead of losing them silently.
+    Cleanup (fences, language tags, whitespace, repeated imports) runs as one
+    batch over all blocks, see tools/postprocess.py.
+    """
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    headers = [match for match in COMPONENT_LINE.finditer(content)
+               if not content[content.rfind('\n', 0, match.start()) + 1:match.start()].strip()]
+    
+    blocks = []
+    for index, header in enumerate(headers):
+        # A // Component: line ends the previous block even when it has no // File: line
+        end = (content.rfind('\n', 0, headers[index + 1].start()) + 1) if index + 1 < len(headers) else len(content)
+        file_match = FILE_LINE.match(content, header.end())
+        if not file_match or file_match.end() > end + 1:
+            continue
+        blocks.append((header.group(1), file_match.group(1), content[file_match.end():end]))
+    
+    cleaned = clean_components([code for _, _, code in blocks])
+    
+    components = []
+    for (component_name, file_path, _), code in zip(blocks, cleaned):
+        # Only include substantial code
+        if len(code) > min_length:
+            components.append({
+                'name': component_name,
+                'file_path': file_path,
+                'code': code
+            })
+        elif rejected is not None:
+            rejected.append({'name': component_name, 'file_path': file_path,
+                             'reason': f'only {len(code)} characters of code'})
+    
+    return components
+
+
 class CompleteProjectBuilder:
-    def __init__(self):
+    def __init__(self, archive=None, artifact_store=None, component_index=None, component_links='copy',
+                 snapshots=False):
+        self.archive = archive
+        self.artifact_store = artifact_store
+        self.snapshots = snapshots
+        self.component_index = component_index
+        self.component_links = component_links
+        self.last_snapshot = None
+        self.source_response_id = None
+        self._reset_project_data()
+    
+    def _reset_project_data(self):
+        """Start a fresh build: parsed data, manifest entries and timings"""
         self.project_data = {
             'dependencies': {},
             'dev_dependencies': {},
             'api_keys': [],
             'components': [],
+            'component_issues': [],
+            'import_graph': {},
+            'dependency_report': {},
             'has_backend': False,
             'has_frontend': True,
             'framework': 'react',
             'build_tool': 'vite',
             'css_framework': 'tailwindcss'
         }
+        self.manifest_files = {}
+        self.build_timings = {}
+        self.previous_files = {}
+        self.build_changes = {'added': [], 'changed': [], 'unchanged': [], 'removed': []}
+    
+    def load_manifest(self, project_dir):
+        """Read a project's previous project_summary.json, or None"""
+        manifest_path = Path(project_dir) / 'project_summary.json'
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    def _is_unchanged(self, project_dir, relative_path, digest, key='hash'):
+        """True if the file on disk is still exactly what the previous build wrote (digest compared to entry[key])"""
+        previous = self.previous_files.get(relative_path)
+        if not previous or previous.get(key) != digest:
+            return False
+        try:
+            file_stat = (project_dir / relative_path).stat()
+        except FileNotFoundError:
+            return False
+        # Size + mtime guard against files edited or replaced since the last build
+        return file_stat.st_size == previous.get('bytes') and file_stat.st_mtime_ns == previous.get('mtime_ns')
+    
+    def _keep_file(self, relative_path):
+        """Carry an unchanged file's manifest entry over without touching the disk"""
+        entry = dict(self.previous_files[relative_path])
+        entry['write_ms'] = 0.0
+        self.manifest_files[relative_path] = entry
+        CACHE_REQUESTS.inc(cache='incremental', result='hit')
+        self.build_changes['unchanged'].append(relative_path)
+        return entry
+    
+    def _record_file(self, project_dir, relative_path, digest, size, write_seconds, **extra):
+        """Record a written file in the build manifest; digest is the sha256 of the bytes on disk"""
+        self.manifest_files[relative_path] = dict({
+            'hash': digest,
+            'bytes': size,
+            'write_ms': round(write_seconds * 1000, 3),
+            'mtime_ns': (project_dir / relative_path).stat().st_mtime_ns
+        }, **extra)
+        change = 'changed' if relative_path in self.previous_files else 'added'
+        if self.previous_files:
+            CACHE_REQUESTS.inc(cache='incremental', result='miss')
+        self.build_changes[change].append(relative_path)
+    
+    def _write_project_file(self, project_dir, relative_path, content):
+        """Write a generated file (skipping it if unchanged) and record it in the build manifest"""
+        file_path = project_dir / relative_path
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if self._is_unchanged(project_dir, relative_path, digest):
+            self._keep_file(relative_path)
+            return file_path
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        if file_path.exists():
+            unlink_file(file_path)  # never write through a hard link into the component pool
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        self._record_file(project_dir, relative_path, digest, len(data), time.perf_counter() - start)
+        return file_path
+    
+    def remove_orphaned_files(self, project_dir):
+        """Delete files the previous build wrote that this build no longer produces"""
+        for relative_path in sorted(set(self.previous_files) - set(self.manifest_files)):
+            file_path = project_dir / relative_path
+            try:
+                unlink_file(file_path)
+            except FileNotFoundError:
+                pass
+            if self.component_index is not None:
+                self.component_index.forget_file(project_dir, relative_path)
+            self.build_changes['removed'].append(relative_path)
+            print(f"🗑️  Removed: {relative_path}")
+            
+            # Prune directories left empty, but never the project root
+            parent = file_path.parent
+            while parent != project_dir and parent.exists() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
         
     def find_latest_perplexity_file(self):
         """Find the most recent Perplexity response file"""
@@ -32,6 +216,23 @@ class CompleteProjectBuilder:
         latest_file = max(response_files, key=lambda f: f.stat().st_mtime)
         print(f"📁 Using LLM output: {latest_file}")
         return latest_file
+
+    def load_latest_response(self):
+        """Load the newest captured response, preferring the indexed archive over loose files"""
+        if self.archive is None:
+            self.archive = ResponseArchive()
+        
+        record = self.archive.latest()
+        if record:
+            print(f"📁 Using archived LLM output: capture {record['id']}")
+            self.source_response_id = record['id']
+            return self.archive.read(record)
+        
+        # Fall back to captures written before the archive existed
+        latest_file = self.find_latest_perplexity_file()
+        self.source_response_id = latest_file.name
+        with open(latest_file, 'r', encoding='utf-8') as f:
+            return f.read()
     
     def parse_dependencies_section(self, content):
         """Parse dependencies and API keys from the top of the file"""
@@ -52,15 +253,15 @@ class CompleteProjectBuilder:
                 match = re.search(pattern, line, re.IGNORECASE)
                 if match:
                     packages = match.group(1).strip()
-                    # Split packages and clean them
-                    pkg_list = [pkg.strip() for pkg in packages.split() if pkg.strip()]
+                    # Split packages and clean them (flags dropped, pkg@version split)
+                    pkg_list = [spec for spec in map(_package_spec, packages.split()) if spec]
                     
                     if '-D' in line or 'dev' in line.lower():
-                        for pkg in pkg_list:
-                            self.project_data['dev_dependencies'][pkg] = 'latest'
+                        for pkg, version in pkg_list:
+                            self.project_data['dev_dependencies'][pkg] = version
                     else:
-                        for pkg in pkg_list:
-                            self.project_data['dependencies'][pkg] = 'latest'
+                        for pkg, version in pkg_list:
+                            self.project_data['dependencies'][pkg] = version
         
         # Parse API keys section
         api_section = False
@@ -95,60 +296,55 @@ class CompleteProjectBuilder:
     
     def extract_code_components(self, content):
         """Extract all code components from the content"""
-        lines = content.split('\n')
         components = []
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if line.startswith('// Component:'):
-                component_name = line.replace('// Component:', '').strip()
-                
-                # Next line should be // File:
-                if i + 1 < len(lines) and lines[i + 1].strip().startswith('// File:'):
-                    file_path = lines[i + 1].strip().replace('// File:', '').strip()
-                    
-                    # Collect code until next // Component: or end
-                    code_lines = []
-                    j = i + 2
-                    while j < len(lines):
-                        if lines[j].strip().startswith('// Component:'):
-                            break
-                        code_lines.append(lines[j].rstrip())
-                        j += 1
-                    
-                    # Join and clean code
-                    code = '\n'.join(code_lines).strip()
-                    
-                    # Remove language markers
-                    for lang in ['jsx', 'javascript', 'js', 'typescript', 'ts', 'tsx', 'bash', 'json']:
-                        if code.startswith(f'{lang}\n'):
-                            code = code[len(lang)+1:]
-                            break
-                    
-                    # Remove markdown code fences
-                    if code.startswith('```'):
-                        code = '\n'.join(code.split('\n')[1:])
-                    if code.endswith('```'):
-                        code = '\n'.join(code.split('\n')[:-1])
-                    
-                    code = code.strip()
-                    
-                    # Only include substantial code
-                    if len(code) > 50:
-                        components.append({
-                            'name': component_name,
-                            'file_path': file_path,
-                            'code': code
-                        })
-                    
-                    i = j - 1
-            i += 1
+        by_path = {}
+        rejected = []
+        for component in parse_code_components(content, rejected=rejected):
+            # A file can come back twice (e.g. merged shards); keep the most complete version
+            existing = by_path.get(component['file_path'])
+            if existing is None:
+                by_path[component['file_path']] = component
+                components.append(component)
+            elif len(component['code']) > len(existing['code']):
+                components[components.index(existing)] = component
+                by_path[component['file_path']] = component
+        
+        issues = []
+        for item in rejected:
+            print(f"⚠️ Skipped {item['file_path']}: {item['reason']}")
+            issues.append(dict(item, skipped=True))
         
         self.project_data['components'] = components
+        self.project_data['component_issues'] = issues
         print(f"✅ Extracted: {len(components)} code components")
         return components
     
+    def infer_dependencies(self):
+        """
+        Merge the declared dependencies with the packages the components actually
+        import: missing ones are added, declared runtime packages nothing imports
+        are left out of package.json and reported. Dev dependencies (build
+        tooling) are never imported by components and are kept as declared.
+        """
+        declared = self.project_data['dependencies']
+        dev_declared = self.project_data['dev_dependencies']
+        imported = imported_packages([component['code'] for component in self.project_data['components']])
+        needed = list(dict.fromkeys(ENTRY_PACKAGES + tuple(imported)))
+        
+        added = [name for name in needed if name not in declared and name not in dev_declared]
+        unused = [name for name in declared if name not in needed]
+        for name in added:
+            declared[name] = DEFAULT_VERSIONS.get(name, 'latest')
+        for name in unused:
+            del declared[name]
+        
+        if added:
+            print(f"📦 Inferred from imports: {', '.join(added)}")
+        if unused:
+            print(f"🧹 Declared but never imported (left out): {', '.join(unused)}")
+        self.project_data['dependency_report'] = {'imported': needed, 'added': added, 'unused': unused}
+        return self.project_data['dependency_report']
+    
     def generate_package_json(self, project_dir):
         """Generate package.json with all detected dependencies"""
         # Ensure we have minimum required dependencies
@@ -192,9 +388,9 @@ class CompleteProjectBuilder:
             package_json["scripts"]["server"] = "node server.js"
             package_json["scripts"]["start"] = "npm run server"
         
-        package_json_path = project_dir / 'package.json'
-        with open(package_json_path, 'w', encoding='utf-8') as f:
-            json.dump(package_json, f, indent=2)
+        package_json_path = self._write_project_file(
+            project_dir, 'package.json', json.dumps(package_json, indent=2)
+        )
         
         print("✅ Generated: package.json")
         return package_json_path
@@ -213,9 +409,7 @@ export default defineConfig({
   }
 })
 '''
-        vite_config_path = project_dir / 'vite.config.js'
-        with open(vite_config_path, 'w', encoding='utf-8') as f:
-            f.write(vite_config)
+        vite_config_path = self._write_project_file(project_dir, 'vite.config.js', vite_config)
         
         print("✅ Generated: vite.config.js")
         return vite_config_path
@@ -237,9 +431,7 @@ export default {
   plugins: [],
 }
 '''
-        tailwind_config_path = project_dir / 'tailwind.config.js'
-        with open(tailwind_config_path, 'w', encoding='utf-8') as f:
-            f.write(tailwind_config)
+        tailwind_config_path = self._write_project_file(project_dir, 'tailwind.config.js', tailwind_config)
         
         print("✅ Generated: tailwind.config.js")
         return tailwind_config_path
@@ -256,9 +448,7 @@ export default {
   },
 }
 '''
-        postcss_config_path = project_dir / 'postcss.config.js'
-        with open(postcss_config_path, 'w', encoding='utf-8') as f:
-            f.write(postcss_config)
+        postcss_config_path = self._write_project_file(project_dir, 'postcss.config.js', postcss_config)
         
         print("✅ Generated: postcss.config.js")
         return postcss_config_path
@@ -279,21 +469,16 @@ export default {
   </body>
 </html>
 '''
-        index_html_path = project_dir / 'index.html'
-        with open(index_html_path, 'w', encoding='utf-8') as f:
-            f.write(index_html)
+        index_html_path = self._write_project_file(project_dir, 'index.html', index_html)
         
         print("✅ Generated: index.html")
         return index_html_path
     
     def generate_main_jsx(self, project_dir):
         """Generate src/main.jsx"""
-        src_dir = project_dir / 'src'
-        src_dir.mkdir(exist_ok=True)
-        
         main_jsx = '''import React from 'react'
 import ReactDOM from 'react-dom/client'
-import App from './App.jsx'
+import App from './App'
 import './index.css'
 
 ReactDOM.createRoot(document.getElementById('root')).render(
@@ -302,18 +487,13 @@ ReactDOM.createRoot(document.getElementById('root')).render(
   </React.StrictMode>,
 )
 '''
-        main_jsx_path = src_dir / 'main.jsx'
-        with open(main_jsx_path, 'w', encoding='utf-8') as f:
-            f.write(main_jsx)
+        main_jsx_path = self._write_project_file(project_dir, 'src/main.jsx', main_jsx)
         
         print("✅ Generated: src/main.jsx")
         return main_jsx_path
     
     def generate_index_css(self, project_dir):
         """Generate src/index.css"""
-        src_dir = project_dir / 'src'
-        src_dir.mkdir(exist_ok=True)
-        
         if self.project_data['css_framework'] == 'tailwindcss':
             index_css = '''@tailwind base;
 @tailwind components;
@@ -359,9 +539,7 @@ code {
 }
 '''
         
-        index_css_path = src_dir / 'index.css'
-        with open(index_css_path, 'w', encoding='utf-8') as f:
-            f.write(index_css)
+        index_css_path = self._write_project_file(project_dir, 'src/index.css', index_css)
         
         print("✅ Generated: src/index.css")
         return index_css_path
@@ -377,29 +555,127 @@ code {
         for key in self.project_data['api_keys']:
             env_content += f"{key}=your_{key.lower()}_here\n"
         
-        env_path = project_dir / '.env.example'
-        with open(env_path, 'w', encoding='utf-8') as f:
-            f.write(env_content)
+        env_path = self._write_project_file(project_dir, '.env.example', env_content)
         
         print(f"✅ Generated: .env.example with {len(self.project_data['api_keys'])} API keys")
         return env_path
     
+    def _validate_component(self, component):
+        """Repair obvious breakage in a component before it is written and record what is still wrong"""
+        result = validate_component(component['code'], component['file_path'])
+        if result['repairs']:
+            component['code'] = result['code']
+            print(f"🔧 Repaired {component['file_path']}: {'; '.join(result['repairs'])}")
+        if result['problems']:
+            print(f"⚠️ {component['file_path']} looks incomplete: {'; '.join(result['problems'])}")
+        if result['repairs'] or result['problems']:
+            self.project_data['component_issues'].append({
+                'name': component['name'], 'file_path': component['file_path'],
+                'reason': '; '.join(result['problems'] or result['repairs']),
+                'repairs': result['repairs'], 'repaired': not result['problems'], 'skipped': False
+            })
+    
+    def resolve_imports(self):
+        """
+        Build the import graph across components: synthesize src/App.jsx from the
+        root components when the response has none, drop script files under src/
+        that the entry point can no longer reach, and report relative imports that
+        resolve to nothing
+        """
+        components = self.project_data['components']
+        sources = {component['file_path'].lstrip('/'): component['code'] for component in components}
+        known_files = set(self.manifest_files) | {ENTRY_PATH}
+        graph = ImportGraph(sources, known_files)
+        
+        app_path = next((path for path in APP_PATHS if path in sources), None)
+        roots = [path for path in graph.roots() if path.startswith('src/') and is_renderable(path, sources[path])]
+        synthesized = app_path is None
+        if synthesized:
+            app_path = APP_PATHS[0]
+            sources[app_path] = synthesize_app([(path, sources[path]) for path in roots])
+            components.append({'name': 'App', 'file_path': app_path, 'code': sources[app_path]})
+            graph = ImportGraph(sources, known_files)
+            print(f"🧩 Synthesized: {app_path} rendering {len(roots)} component(s)")
+        
+        reachable = graph.reachable([ENTRY_PATH, app_path])
+        pruned = [component for component in components
+                  if component['file_path'].lstrip('/') not in reachable
+                  and component['file_path'].lstrip('/').startswith('src/')
+                  and component['file_path'].endswith(SCRIPT_SUFFIXES)]
+        for component in pruned:
+            components.remove(component)
+            print(f"✂️  Pruned unreachable: {component['file_path']}")
+        
+        pruned_paths = {component['file_path'].lstrip('/') for component in pruned}
+        names = {component['file_path'].lstrip('/'): component['name'] for component in components}
+        missing = [item for item in graph.missing if item['file_path'] not in pruned_paths]
+        for item in missing:
+            print(f"⚠️ {item['file_path']} imports missing module '{item['module']}'")
+            self.project_data['component_issues'].append({
+                'name': names[item['file_path']], 'file_path': item['file_path'],
+                'reason': f"missing module '{item['module']}'", 'skipped': False
+            })
+        
+        self.project_data['import_graph'] = {
+            'app': app_path,
+            'app_synthesized': synthesized,
+            'roots': roots,
+            'pruned': sorted(pruned_paths),
+            'missing': missing
+        }
+        return self.project_data['import_graph']
+    
     def create_component_files(self, project_dir):
         """Create all component files in their proper directories"""
         created_files = []
+        if self.component_index is None:
+            self.component_index = ComponentIndex(link_mode=self.component_links)
+        if not self.previous_files:
+            self.component_index.forget_project(project_dir)
         
+        validate_start = time.perf_counter()
         for component in self.project_data['components']:
-            file_path = project_dir / component['file_path'].lstrip('/')
+            self._validate_component(component)
+        self.build_timings['validate_ms'] = round((time.perf_counter() - validate_start) * 1000, 3)
+        graph_start = time.perf_counter()
+        self.resolve_imports()
+        self.build_timings['import_graph_ms'] = round((time.perf_counter() - graph_start) * 1000, 3)
+        
+        for component in self.project_data['components']:
+            relative_path = component['file_path'].lstrip('/')
+            file_path = project_dir / relative_path
             
-            # Create parent directories
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+            # Components are matched by normalized content (what the pool is keyed by);
+            # size + mtime still guard the exact bytes on disk
+            normalized_hash = content_hash(component['code'])
+            if self._is_unchanged(project_dir, relative_path, normalized_hash, key='content_hash'):
+                entry = self._keep_file(relative_path)
+                component.update({'hash': entry['hash'], 'size': entry['bytes'], 'write_ms': 0.0})
+                created_files.append(file_path)
+                print(f"⏭️  Unchanged: {component['file_path']}")
+                continue
             
-            # Write the component code
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(component['code'])
+            # Store each unique component once and link it into the project
+            write_start = time.perf_counter()
+            record, reused = self.component_index.link_component(
+                project_dir, component['name'], component['file_path'], file_path, component['code']
+            )
+            write_seconds = time.perf_counter() - write_start
+            # The pool may hold a whitespace variant of this code: hash what actually landed on disk
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            component['hash'] = hashlib.sha256(data).hexdigest()
+            component['size'] = len(data)
+            component['write_ms'] = round(write_seconds * 1000, 3)
+            self._record_file(project_dir, relative_path, component['hash'], len(data), write_seconds,
+                              content_hash=record['hash'])
             
             created_files.append(file_path)
-            print(f"✅ Created: {component['file_path']}")
+            CACHE_REQUESTS.inc(cache='component_index', result='hit' if reused else 'miss')
+            if reused:
+                print(f"♻️  Linked: {component['file_path']} (shared component {record['hash'][:12]})")
+            else:
+                print(f"✅ Created: {component['file_path']}")
         
         return created_files
     
@@ -454,50 +730,121 @@ Visit [http://localhost:3000](http://localhost:3000)
         for component in self.project_data['components']:
             readme_content += f"- `{component['file_path']}` - {component['name']}\n"
 
-        readme_path = project_dir / 'README.md'
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+        readme_path = self._write_project_file(project_dir, 'README.md', readme_content)
         
         print("✅ Generated: README.md")
         return readme_path
     
-    def build_complete_project(self):
-        """Main method to build the complete project"""
+    def snapshot_project(self, project_dir, content=None):
+        """Store a compressed, deduplicated snapshot of the built project and its source response"""
         try:
-            print("🚀 Starting Complete Project Builder...")
-            print("="*60)
-            
-            # Step 1: Find latest Perplexity file
-            latest_file = self.find_latest_perplexity_file()
+            if self.artifact_store is None:
+                self.artifact_store = ArtifactStore()
             
-            # Step 2: Read content
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            name = f"{project_dir.name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+            extra_files = {'.llm/response.txt': content} if content else None
+            self.last_snapshot = self.artifact_store.store_tree(name, project_dir, extra_files=extra_files)
+            print(f"✅ Archived snapshot: {name} ({self.last_snapshot['file_count']} files)")
+            return self.last_snapshot
+        except Exception as e:
+            print(f"⚠️ Snapshot failed: {e}")
+            return None
+    
+    def generate_manifest(self, project_dir):
+        """Write project_summary.json: per-file hashes, sizes and write timings, build timings and dependencies"""
+        components = {}
+        for component in self.project_data['components']:
+            components[component['name']] = {
+                'path': component['file_path'],
+                'size': component.get('size', len(component['code'].encode('utf-8'))),
+                'hash': component.get('hash'),
+                'write_ms': component.get('write_ms')
+            }
+        
+        manifest = {
+            'manifest_version': 2,
+            'project_name': project_dir.name,
+            'created_at': datetime.now().isoformat(),
+            'source_response_id': self.source_response_id,
+            'total_components': len(components),
+            'created_files': sorted(self.manifest_files),
+            'components': components,
+            'files': dict(sorted(self.manifest_files.items())),
+            'dependencies': dict(sorted(self.project_data['dependencies'].items())),
+            'dev_dependencies': dict(sorted(self.project_data['dev_dependencies'].items())),
+            'timings': self.build_timings,
+            'build_mode': 'incremental' if self.previous_files else 'full',
+            'changes': {change: sorted(paths) for change, paths in self.build_changes.items()},
+            'component_issues': self.project_data['component_issues'],
+            'import_graph': self.project_data['import_graph'],
+            'dependency_report': self.project_data['dependency_report']
+        }
+        
+        manifest_path = project_dir / 'project_summary.json'
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        print("✅ Generated: project_summary.json")
+        return manifest_path
+    
+    def build_complete_project(self, project_dir=None, incremental=False):
+        """Main method to build the complete project from the latest captured response"""
+        print("🚀 Starting Complete Project Builder...")
+        print("="*60)
+        
+        # Step 1-2: Load the latest captured response
+        try:
+            content = self.load_latest_response()
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            raise
+        
+        return self.build_project_from_llm_response(
+            content, project_dir, self.source_response_id, incremental=incremental
+        )
+    
+    def build_project_from_llm_response(self, content, project_dir=None, source_id=None, incremental=False):
+        """
+        Build a complete project directly from LLM response text; returns the project path.
+        With incremental=True an existing build is updated in place: only added or changed
+        files are written, orphaned ones removed, and node_modules / build caches left alone.
+        """
+        try:
+            build_start = time.perf_counter()
+            self._reset_project_data()
+            self.source_response_id = source_id
             
             # Step 3: Parse dependencies and API keys
             print("\n📋 Parsing dependencies and configuration...")
+            parse_start = time.perf_counter()
             self.parse_dependencies_section(content)
             
             # Step 4: Extract code components
             print("\n🔧 Extracting code components...")
             self.extract_code_components(content)
+            # One number for the whole parse: the components are split and cleaned as a batch
+            self.build_timings['parse_ms_total'] = round((time.perf_counter() - parse_start) * 1000, 3)
+            STAGE_SECONDS.observe(self.build_timings['parse_ms_total'] / 1000, stage='parse')
             
             if not self.project_data['components']:
                 raise RuntimeError("No code components found! Check your text file format.")
             
             # Step 5: Create project directory
-            project_dir = Path.home() / 'Desktop' / 'LLM_Generated_Project'
-            if project_dir.exists():
+            project_dir = Path(project_dir) if project_dir else Path.home() / 'Desktop' / 'LLM_Generated_Project'
+            previous_manifest = self.load_manifest(project_dir) if incremental else None
+            if previous_manifest and previous_manifest.get('files'):
+                self.previous_files = previous_manifest['files']
+                print(f"\n🔁 Incremental rebuild of {project_dir} ({len(self.previous_files)} tracked files)")
+            elif project_dir.exists():
                 print(f"\n🗑️  Removing existing project directory...")
-                import shutil
-                shutil.rmtree(project_dir)
+                shutil.rmtree(project_dir, onerror=_remove_readonly)
             
             project_dir.mkdir(parents=True, exist_ok=True)
-            print(f"\n📁 Created project directory: {project_dir}")
+            print(f"\n📁 Project directory: {project_dir}")
             
             # Step 6: Generate all configuration files
+            write_start = time.perf_counter()
             print("\n⚙️  Generating configuration files...")
-            self.generate_package_json(project_dir)
             self.generate_vite_config(project_dir)
             self.generate_tailwind_config(project_dir)
             self.generate_postcss_config(project_dir)
@@ -508,10 +855,26 @@ Visit [http://localhost:3000](http://localhost:3000)
             
             # Step 7: Create all component files
             print("\n📝 Creating component files...")
-            created_files = self.create_component_files(project_dir)
+            self.create_component_files(project_dir)
+            
+            # package.json last: its dependencies come from the components actually written
+            self.infer_dependencies()
+            self.generate_package_json(project_dir)
             
             # Step 8: Generate README
             self.generate_readme(project_dir)
+            if self.previous_files:
+                self.remove_orphaned_files(project_dir)
+            self.build_timings['write_ms'] = round((time.perf_counter() - write_start) * 1000, 3)
+            STAGE_SECONDS.observe(self.build_timings['write_ms'] / 1000, stage='write')
+            
+            # Step 9: Emit the build manifest
+            self.build_timings['total_ms'] = round((time.perf_counter() - build_start) * 1000, 3)
+            self.generate_manifest(project_dir)
+            
+            # Step 10: Optionally keep a compressed, deduplicated copy of the build as a backup
+            if self.snapshots:
+                self.snapshot_project(project_dir, content)
             
             # Success summary
             print("\n" + "="*60)
@@ -521,6 +884,11 @@ Visit [http://localhost:3000](http://localhost:3000)
             print(f"📦 Dependencies: {len(self.project_data['dependencies'])} + {len(self.project_data['dev_dependencies'])} dev")
             print(f"🔧 Components: {len(self.project_data['components'])}")
             print(f"🔑 API Keys: {len(self.project_data['api_keys'])}")
+            print(f"⏱️  Build time: {self.build_timings['total_ms']:.0f} ms")
+            if self.previous_files:
+                print("🔁 Changes: " + ", ".join(
+                    f"{len(paths)} {change}" for change, paths in self.build_changes.items()
+                ))
             
             print(f"\n⚡ Next Steps:")
             print(f"1. cd {project_dir}")
@@ -532,6 +900,7 @@ Visit [http://localhost:3000](http://localhost:3000)
                 print(f"5. Copy .env.example to .env and add your API keys")
             
             print("\n🚀 Your project is ready to run!")
+            return project_dir
             
         except Exception as e:
             print(f"\n❌ Error: {e}")
@@ -540,4 +909,4 @@ Visit [http://localhost:3000](http://localhost:3000)
 # Main execution
 if __name__ == "__main__":
     builder = CompleteProjectBuilder()
-    builder.build_complete_project()
+    builder.build_complete_project(incremental='--incremental' in sys.argv[1:])
@@ -0,0 +1,123 @@
+"""
+Component post-processing
+Batch normalization of extracted component code with precompiled patterns
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+LANGUAGE_TAGS = ('jsx', 'javascript', 'js', 'typescript', 'ts', 'tsx', 'bash', 'json')
+
+# A bare language tag line and/or an opening fence (```jsx) at the very start
+LEADING_MARKERS = re.compile(
+    r'\A\s*(?:(?:' + '|'.join(LANGUAGE_TAGS) + r')[ \t]*\n)?(?:[ \t]*```[\w+-]*[ \t]*(?:\n|\Z))?'
+)
+LINE_ENDINGS = re.compile(r'\r\n?')
+# One whole import statement (multi-line named imports included), matched at a known line start
+IMPORT_STATEMENT = re.compile(r'import\b[^;\'"]*?(?:\bfrom\s*)?[\'"][^\'"\n]+[\'"][ \t]*;?[ \t]*(?:\n|\Z)')
+
+# Below this many characters in total a process pool costs more than it saves
+PARALLEL_MIN_CHARS = 2_000_000
+PARALLEL_MIN_COMPONENTS = 64
+
+
+def _import_key(statement):
+    return ' '.join(statement.replace(';', ' ').split())
+
+
+def dedupe_imports(code):
+    """Drop repeated import statements (same statement modulo whitespace and semicolons)"""
+    # Jump between lines starting with 'import' with str.find and only match there;
+    # a ^-anchored MULTILINE scan over the whole component is several times slower
+    seen = set()
+    duplicates = []
+    position = 0 if code.startswith('import') else code.find('\nimport') + 1
+    while position > 0 or (position == 0 and code.startswith('import')):
+        match = IMPORT_STATEMENT.match(code, position)
+        if match:
+            key = _import_key(match.group(0))
+            if key in seen:
+                duplicates.append(match.span())
+            else:
+                seen.add(key)
+        next_import = code.find('\nimport', position + 1)
+        if next_import == -1:
+            break
+        position = next_import + 1
+    if not duplicates:
+        return code
+
+    parts = []
+    last = 0
+    for start, end in duplicates:
+        parts.append(code[last:start])
+        last = end
+    parts.append(code[last:])
+    return ''.join(parts)
+
+
+def strip_trailing_whitespace(code):
+    # str.rstrip per line beats a [ \t]+$ regex here: JSX indentation gives the
+    # regex engine a candidate match at every space
+    if ' \n' not in code and '\t\n' not in code:
+        return code.rstrip(' \t')
+    return '\n'.join(line.rstrip() for line in code.split('\n'))
+
+
+def clean_component(code):
+    """
+    Normalize one component: LF line endings, no leading language tag or
+    code fence, no closing fence, no trailing whitespace, no repeated
+    imports, no surrounding blank lines.
+    """
+    if '\r' in code:
+        code = LINE_ENDINGS.sub('\n', code)
+    code = LEADING_MARKERS.sub('', code, count=1).rstrip()
+    # Closing fence, on its own line or glued to the last line (a string op: an
+    # unanchored \Z regex would try every position of the component)
+    if code.endswith('```'):
+        code = code[:-3]
+    code = strip_trailing_whitespace(code)
+    code = dedupe_imports(code)
+    return code.strip()
+
+
+def _clean_chunk(codes):
+    return [clean_component(code) for code in codes]
+
+
+def _chunks(items, count):
+    size = max(1, -(-len(items) // count))
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def clean_components(codes, workers=None, min_parallel_chars=PARALLEL_MIN_CHARS):
+    """
+    Clean a batch of component sources, preserving order. Large batches
+    (many components and min_parallel_chars in total) are split into one
+    chunk per worker process; everything else runs in this process.
+    """
+    codes = list(codes)
+    total = sum(len(code) for code in codes)
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(codes) < PARALLEL_MIN_COMPONENTS or total < min_parallel_chars:
+        return _clean_chunk(codes)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaned = []
+            for chunk in pool.map(_clean_chunk, _chunks(codes, workers)):
+                cleaned.extend(chunk)
+            return cleaned
+    except (OSError, RuntimeError):
+        # No process support here (sandbox, frozen app) - same result, one process
+        return _clean_chunk(codes)
+
+
+def postprocess_components(components, workers=None):
+    """Clean the 'code' of every component dict in place; returns the list"""
+    cleaned = clean_components([component['code'] for component in components], workers)
+    for component, code in zip(components, cleaned):
+        component['code'] = code
+    return components
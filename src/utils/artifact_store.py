@@ -0,0 +1,272 @@
+"""
+Artifact store
+Compressed, content-addressed storage for generated project trees
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+DEFAULT_STORE_DIR = "~/Desktop/LLM_Artifacts"
+DEFAULT_SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_EXCLUDES = ('node_modules', '.git', 'dist', 'build', '.vite')
+
+CHUNK_MAX_BYTES = 64 * 1024
+CHUNK_BOUNDARY_MASK = 0x1F
+
+
+def chunk_data(data, max_size=CHUNK_MAX_BYTES, mask=CHUNK_BOUNDARY_MASK):
+    """
+    Split bytes into content-defined chunks on line boundaries.
+    A chunk ends after a line whose crc32 hits the boundary mask, so the same
+    run of lines produces the same chunks wherever it appears (e.g. the DOM
+    extractions that repeat the answer text inside one capture). There is
+    deliberately no minimum size: one would make boundaries depend on where
+    the previous chunk started and stop repeated runs from re-aligning.
+    """
+    chunks = []
+    start = 0
+    pos = 0
+    total = len(data)
+
+    while pos < total:
+        newline = data.find(b'\n', pos)
+        end = total if newline == -1 else newline + 1
+        if end - pos > max_size:
+            end = pos + max_size
+        line = data[pos:end]
+        pos = end
+
+        size = pos - start
+        if size >= max_size or pos == total or zlib.crc32(line) & mask == 0:
+            chunks.append(data[start:pos])
+            start = pos
+
+    return chunks
+
+
+class ArtifactStore:
+    """
+    Chunks are stored once, zlib-compressed, in append-only segment files and
+    indexed by sha256. A snapshot maps relative paths to chunk lists, so a
+    project tree can be read back file by file without restoring it.
+
+    The connection is shared between threads, so reads take the same lock
+    as writes.
+    """
+
+    def __init__(self, root=None, segment_max_bytes=DEFAULT_SEGMENT_MAX_BYTES, level=6):
+        self.root = Path(os.path.expanduser(root or DEFAULT_STORE_DIR))
+        self.segments_dir = self.root / 'segments'
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.level = level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / 'store.sqlite3'), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    hash TEXT PRIMARY KEY,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    name TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    file_count INTEGER NOT NULL DEFAULT 0,
+                    total_bytes INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS files (
+                    snapshot TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    chunks TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (snapshot, path)
+                );
+                CREATE INDEX IF NOT EXISTS idx_files_hash ON files (content_hash);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+
+    def _active_segment(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'active_segment'").fetchone()
+        if row and (self.segments_dir / row['value']).exists():
+            if (self.segments_dir / row['value']).stat().st_size < self.segment_max_bytes:
+                return row['value']
+
+        count_row = self._conn.execute("SELECT value FROM meta WHERE key = 'segment_counter'").fetchone()
+        counter = int(count_row['value']) + 1 if count_row else 1
+        name = f"chunks_{counter:06d}.seg"
+        self._conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [('segment_counter', str(counter)), ('active_segment', name)]
+        )
+        return name
+
+    def _put_chunks(self, data):
+        """Store any chunks not already present; returns the ordered chunk hashes"""
+        hashes = []
+        segment = None
+        handle = None
+        try:
+            for chunk in chunk_data(data):
+                digest = hashlib.sha256(chunk).hexdigest()
+                hashes.append(digest)
+                if self._conn.execute("SELECT 1 FROM chunks WHERE hash = ?", (digest,)).fetchone():
+                    continue
+
+                if handle is None or handle.tell() >= self.segment_max_bytes:
+                    if handle:
+                        handle.close()
+                    segment = self._active_segment()
+                    handle = open(self.segments_dir / segment, 'ab')
+
+                compressed = zlib.compress(chunk, self.level)
+                offset = handle.tell()
+                handle.write(compressed)
+                self._conn.execute(
+                    "INSERT INTO chunks (hash, segment, offset, length, size) VALUES (?, ?, ?, ?, ?)",
+                    (digest, segment, offset, len(compressed), len(chunk))
+                )
+        finally:
+            if handle:
+                handle.close()
+        return hashes
+
+    def _read_chunks(self, hashes):
+        parts = []
+        for digest in hashes:
+            row = self._conn.execute(
+                "SELECT segment, offset, length FROM chunks WHERE hash = ?", (digest,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Missing chunk: {digest}")
+            with open(self.segments_dir / row['segment'], 'rb') as f:
+                f.seek(row['offset'])
+                parts.append(zlib.decompress(f.read(row['length'])))
+        return b''.join(parts)
+
+    def _begin_snapshot(self, name, kind):
+        self._conn.execute("DELETE FROM files WHERE snapshot = ?", (name,))
+        self._conn.execute(
+            "INSERT INTO snapshots (name, kind, created_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, created_at = excluded.created_at",
+            (name, kind, time.time())
+        )
+
+    def _add_file(self, snapshot, path, data):
+        hashes = self._put_chunks(data)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (snapshot, path, content_hash, chunks, size) VALUES (?, ?, ?, ?, ?)",
+            (snapshot, path, hashlib.sha256(data).hexdigest(), ','.join(hashes), len(data))
+        )
+
+    def _finish_snapshot(self, name):
+        self._conn.execute(
+            "UPDATE snapshots SET file_count = (SELECT COUNT(*) FROM files WHERE snapshot = ?), "
+            "total_bytes = (SELECT COALESCE(SUM(size), 0) FROM files WHERE snapshot = ?) WHERE name = ?",
+            (name, name, name)
+        )
+
+    def store_tree(self, name, directory, extra_files=None, exclude=DEFAULT_EXCLUDES):
+        """Snapshot a directory tree; extra_files maps relative paths to text/bytes to include"""
+        directory = Path(directory)
+        with self._lock, self._conn:
+            self._begin_snapshot(name, 'tree')
+            for dirpath, dirnames, filenames in os.walk(directory):
+                dirnames[:] = sorted(d for d in dirnames if d not in exclude)
+                for filename in sorted(filenames):
+                    full_path = Path(dirpath) / filename
+                    with open(full_path, 'rb') as f:
+                        self._add_file(name, full_path.relative_to(directory).as_posix(), f.read())
+
+            for path, content in (extra_files or {}).items():
+                data = content.encode('utf-8') if isinstance(content, str) else content
+                self._add_file(name, path, data)
+            self._finish_snapshot(name)
+        return self.get_snapshot(name)
+
+    def get_snapshot(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM snapshots WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    def list_snapshots(self, kind=None):
+        with self._lock:
+            if kind:
+                rows = self._conn.execute(
+                    "SELECT * FROM snapshots WHERE kind = ? ORDER BY created_at", (kind,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM snapshots ORDER BY created_at").fetchall()
+        return [dict(row) for row in rows]
+
+    def list_files(self, name):
+        """Per-file records (path, content_hash, size) of a snapshot"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, content_hash, size FROM files WHERE snapshot = ? ORDER BY path", (name,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def read_file(self, name, path):
+        """Read one file of a snapshot back as bytes"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunks FROM files WHERE snapshot = ? AND path = ?", (name, path)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"{path} not found in snapshot {name}")
+            return self._read_chunks(row['chunks'].split(',') if row['chunks'] else [])
+
+    def read_text(self, name, path='content.txt'):
+        return self.read_file(name, path).decode('utf-8')
+
+    def restore_tree(self, name, destination):
+        """Write a snapshot's files back out under destination"""
+        destination = Path(destination)
+        for record in self.list_files(name):
+            target = destination / record['path']
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(self.read_file(name, record['path']))
+        return destination
+
+    def snapshots_with_content(self, content_hash):
+        """Snapshots containing a file with this exact content"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT snapshot FROM files WHERE content_hash = ? ORDER BY snapshot", (content_hash,)
+            ).fetchall()
+        return [row['snapshot'] for row in rows]
+
+    def stats(self):
+        """Logical vs. stored bytes across the whole store"""
+        with self._lock:
+            logical = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+            unique, stored = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COALESCE(SUM(length), 0) FROM chunks"
+            ).fetchone()
+            snapshots = self._conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        return {
+            'logical_bytes': logical,
+            'unique_bytes': unique,
+            'stored_bytes': stored,
+            'snapshots': snapshots
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
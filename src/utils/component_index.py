@@ -0,0 +1,248 @@
+"""
+Component index
+Cross-project registry of generated components, keyed by normalized content
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_INDEX_DIR = "~/Desktop/LLM_Components"
+
+SIGNATURE_PATTERNS = [
+    re.compile(r'export\s+default\s+function\s+(\w+)\s*\(([^)]*)\)'),
+    re.compile(r'(?:export\s+)?function\s+(\w+)\s*\(([^)]*)\)'),
+    re.compile(r'(?:export\s+)?const\s+(\w+)\s*=\s*(?:React\.)?(?:memo\()?\s*\(([^)]*)\)\s*=>'),
+    re.compile(r'(?:export\s+)?const\s+(\w+)\s*=\s*(?:React\.)?(?:memo\()?\s*(\w+)\s*=>'),
+]
+TRAILING_WHITESPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+BLANK_RUNS = re.compile(r'\n{3,}')
+LINK_MODES = ('copy', 'hardlink')
+
+
+def normalize_code(code):
+    """Canonical form used for hashing: LF endings, no trailing whitespace, single final newline"""
+    code = code.replace('\r\n', '\n').replace('\r', '\n')
+    code = TRAILING_WHITESPACE.sub('', code)
+    code = BLANK_RUNS.sub('\n\n', code)
+    return code.strip('\n') + '\n'
+
+
+def content_hash(code):
+    return hashlib.sha256(normalize_code(code).encode('utf-8')).hexdigest()
+
+
+def make_deletable(path):
+    """
+    Clear the read-only bit Windows refuses to delete through - but only for a file with
+    no other hard links: the bit lives on the shared inode, so clearing it on a pooled
+    component would make the pool copy (and every project linked to it) writable.
+    On POSIX deleting needs write access to the directory, never to the file.
+    """
+    if os.name != 'nt' or os.stat(path).st_nlink != 1:
+        return False
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+    return True
+
+
+def unlink_file(path):
+    """Delete one project file without changing the permissions of other links to it"""
+    try:
+        os.unlink(path)
+    except PermissionError:
+        if not make_deletable(path):
+            raise
+        os.unlink(path)
+
+
+def component_signature(name, code):
+    """Name plus parameter list of the component's declaration, e.g. 'Header({ links })'"""
+    fallback = None
+    for pattern in SIGNATURE_PATTERNS:
+        for match in pattern.finditer(code):
+            params = ' '.join(match.group(2).split())
+            signature = f"{match.group(1)}({params})"
+            if match.group(1) == name:
+                return signature
+            fallback = fallback or signature
+    return fallback or f"{name}()"
+
+
+class ComponentIndex:
+    """
+    Each unique component is written once to a read-only pool file, keyed by
+    the hash of its normalized text but stored byte for byte as first
+    generated. Projects get a copy of the pool file by default.
+
+    link_mode='hardlink' links project files to the pool instead (falling
+    back to a copy where links are unsupported). A linked file shares the
+    pool's inode, so it must be treated as copy-on-write: writers replace
+    the file (unlink, then write) and never modify it in place. Pool files
+    are read-only so an in-place edit fails instead of silently changing
+    every project that uses the component; editors that save by rewriting
+    the file in place are the ones to watch for.
+    """
+
+    def __init__(self, root=None, link_mode='copy'):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"link_mode must be one of {LINK_MODES}, got {link_mode!r}")
+        self.root = Path(os.path.expanduser(root or DEFAULT_INDEX_DIR))
+        self.pool_dir = self.root / 'pool'
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        self.link_mode = link_mode
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / 'components.sqlite3'), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS components (
+                    hash TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    pool_path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_components_name ON components (name, signature);
+                CREATE TABLE IF NOT EXISTS usages (
+                    project TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    linked_at REAL NOT NULL,
+                    PRIMARY KEY (project, file_path)
+                );
+                CREATE INDEX IF NOT EXISTS idx_usages_hash ON usages (hash);
+            """)
+
+    def lookup(self, code):
+        """Return the component record for code if an equivalent one is already indexed"""
+        digest = content_hash(code)
+        with self._lock:
+            return self._record(digest)
+
+    def _record(self, digest):
+        """Component row by hash; the caller holds self._lock"""
+        row = self._conn.execute("SELECT * FROM components WHERE hash = ?", (digest,)).fetchone()
+        return dict(row) if row else None
+
+    def add(self, name, code, file_path=''):
+        """Store a component once; returns (record, reused)"""
+        digest = content_hash(code)
+
+        with self._lock:
+            record = self._record(digest)
+            if record:
+                return record, True
+
+            suffix = Path(file_path).suffix or '.jsx'
+            pool_path = self.pool_dir / digest[:2] / f"{digest}{suffix}"
+            pool_path.parent.mkdir(parents=True, exist_ok=True)
+            data = code.encode('utf-8')
+            with open(pool_path, 'wb') as f:
+                f.write(data)
+            os.chmod(pool_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO components (hash, name, signature, pool_path, size, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, name, component_signature(name, code), str(pool_path), len(data), time.time())
+                )
+            return self._record(digest), False
+
+    def link_component(self, project, name, file_path, destination, code):
+        """Place a component into a project from the pool; returns (record, reused)"""
+        record, reused = self.add(name, code, file_path)
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.exists() or destination.is_symlink():
+            unlink_file(destination)
+
+        linked = False
+        if self.link_mode == 'hardlink':
+            try:
+                os.link(record['pool_path'], destination)
+                linked = True
+            except OSError:
+                linked = False
+        if not linked:
+            shutil.copyfile(record['pool_path'], destination)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO usages (project, file_path, hash, linked_at) VALUES (?, ?, ?, ?)",
+                (str(project), file_path, record['hash'], time.time())
+            )
+        return record, reused
+
+    def forget_project(self, project):
+        """Drop usage records of a project (before it is rebuilt or deleted)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM usages WHERE project = ?", (str(project),))
+
+    def forget_file(self, project, file_path):
+        """Drop the usage record of one file (e.g. an orphan removed by an incremental build)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM usages WHERE project = ? AND (file_path = ? OR file_path = ?)",
+                (str(project), file_path, '/' + file_path.lstrip('/'))
+            )
+
+    def find(self, name, signature=None):
+        """Indexed components with this name (and signature), newest first"""
+        with self._lock:
+            if signature:
+                rows = self._conn.execute(
+                    "SELECT * FROM components WHERE name = ? AND signature = ? ORDER BY created_at DESC",
+                    (name, signature)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM components WHERE name = ? ORDER BY created_at DESC", (name,)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def projects_using(self, name=None, hash=None, signature=None):
+        """Projects (and file paths) that use a component, by hash or by name/signature"""
+        if hash:
+            query = "SELECT project, file_path, hash FROM usages WHERE hash = ? ORDER BY project"
+            params = [hash]
+        else:
+            query = ("SELECT u.project, u.file_path, u.hash FROM usages u "
+                     "JOIN components c ON c.hash = u.hash WHERE c.name = ?")
+            params = [name]
+            if signature:
+                query += " AND c.signature = ?"
+                params.append(signature)
+            query += " ORDER BY u.project"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            unique, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM components"
+            ).fetchone()
+            usages, linked_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(c.size), 0) FROM usages u JOIN components c ON c.hash = u.hash"
+            ).fetchone()
+        return {
+            'unique_components': unique,
+            'stored_bytes': stored,
+            'usages': usages,
+            'linked_bytes': linked_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,522 @@
+"""
+Configuration
+One place that loads, validates and merges defaults, config/settings.json, environment and CLI overrides
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, fields
+from pathlib import Path
+from types import MappingProxyType
+
+DEFAULT_SETTINGS_PATH = Path(__file__).resolve().parent.parent.parent / "config" / "settings.json"
+ENV_PREFIX = 'AIWG_'
+RELOAD_CHECK_INTERVAL = 1.0
+
+DEFAULTS = {
+    'browser': {
+        'debug_port': 9222,
+        'profile_directory': 'Default',
+        'profile_paths': {
+            'mac': '~/Library/Application Support/BraveSoftware/Brave-Browser',
+            'windows': '~/AppData/Local/BraveSoftware/Brave-Browser/User Data',
+            'linux': '~/.config/BraveSoftware/Brave-Browser'
+        },
+        'binary_paths': {
+            'mac': '/Applications/Brave Browser.app/Contents/MacOS/Brave Browser',
+            'windows': 'C:\\Program Files\\BraveSoftware\\Brave-Browser\\Application\\brave.exe',
+            'linux': '/usr/bin/brave-browser'
+        }
+    },
+    'urls': {
+        'flexos': 'https://www.flexos.work/design/prompt',
+        'perplexity': 'https://www.perplexity.ai'
+    },
+    # Seconds. capture_max / enhancement_max are hard ceilings; with adaptive timeouts the
+    # actual deadline comes from recorded durations (see 'adaptive' below)
+    'timeouts': {
+        'page_load': 20,
+        'element_wait': 15,
+        'response_wait': 60,
+        'login_cache_ttl': 900,
+        'capture_max': 600,
+        'enhancement_max': 90,
+        'stable_seconds': 36
+    },
+    # Percentile-based deadlines (p99 * margin once min_samples runs are recorded) and
+    # polling that speeds up while an answer streams and backs off while idle
+    'adaptive': {
+        'enabled': True,
+        'min_samples': 5,
+        'margin': 1.5,
+        'poll_min': 1.0,
+        'poll_max': 6.0,
+        'history_path': None
+    },
+    'project': {
+        'output_directory': '~/Desktop',
+        'project_prefix': 'AI_Generated_',
+        'incremental_builds': False,
+        # 'copy' or 'hardlink': hard-linked component files are shared with the component pool
+        'component_links': 'copy',
+        # Also keep a deduplicated backup of every build in the artifact store (extra disk)
+        'snapshots': False
+    },
+    # Two or more race_providers race those providers in parallel tabs (see core/providers.py);
+    # shards > 1 plans the components first and generates them in that many parallel tabs
+    'generation': {'race_providers': [], 'shards': 0},
+    # Batch runs: accounts jobs are routed to, retry limits and backoff (seconds)
+    'scheduler': {
+        'accounts': [{'provider': 'perplexity', 'name': 'default', 'max_concurrent': 1}],
+        'max_attempts': 3,
+        'backoff_base': 2.0,
+        'backoff_cap': 120.0,
+        'quota_reset_hours': 24
+    },
+    # JSON log file (rotated + gzipped) and console threshold
+    'logging': {'directory': 'logs', 'level': 'INFO', 'console_level': 'WARNING'},
+    # WebDriver round-trip profiler: per-caller report at cleanup, optional per-path budgets
+    'profiling': {
+        'enabled': False,
+        'budgets': {'capture_poll': 8, 'race_poll': 1, 'generation_probe': 1},
+        'budget_mode': 'warn',
+        'report_dir': 'logs'
+    },
+    # Prometheus-text endpoint (port None = off) and where batch runs dump metrics
+    'metrics': {'port': None, 'dump_dir': 'logs'},
+    # Local job service (src/job_service.py)
+    'service': {
+        'host': '127.0.0.1',
+        'port': 8765,
+        'workers': 1,
+        'db_path': '~/Desktop/LLM_Jobs/jobs.sqlite3'
+    },
+    # Free-form sections: per-provider overrides, e.g. {'chatgpt': {'url': 'file:///.../stub.html'}},
+    # and alternative storage locations (None = the module default)
+    'providers': {},
+    'selector_cache': {'path': None},
+    'archive': {'directory': None}
+}
+
+# Sections whose keys are not checked against DEFAULTS
+FREE_FORM_SECTIONS = ('providers', 'selector_cache', 'archive')
+# Keys whose default is None but that take a value of this type when set
+NULLABLE = {('metrics', 'port'): int, ('selector_cache', 'path'): str, ('archive', 'directory'): str,
+            ('adaptive', 'history_path'): str}
+# Older settings.json files used different names for the same setting
+LEGACY_KEYS = {('urls', 'prompt_enhancer'): None}
+
+
+class ConfigError(ValueError):
+    """A configuration source has an unknown key or a value of the wrong type"""
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class _Section:
+    """Dict-style read access, so config['timeouts']['page_load'] keeps working"""
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def keys(self):
+        return [f.name for f in fields(self)]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def as_dict(self):
+        return {name: _thaw(value.as_dict() if isinstance(value, _Section) else value) for name, value in self.items()}
+
+
+@dataclass(frozen=True)
+class BrowserSettings(_Section):
+    debug_port: int
+    profile_directory: str
+    profile_paths: MappingProxyType
+    binary_paths: MappingProxyType
+
+
+@dataclass(frozen=True)
+class UrlSettings(_Section):
+    flexos: str
+    perplexity: str
+
+
+@dataclass(frozen=True)
+class TimeoutSettings(_Section):
+    page_load: float
+    element_wait: float
+    response_wait: float
+    login_cache_ttl: float
+    capture_max: float
+    enhancement_max: float
+    stable_seconds: float
+
+
+@dataclass(frozen=True)
+class AdaptiveSettings(_Section):
+    enabled: bool
+    min_samples: int
+    margin: float
+    poll_min: float
+    poll_max: float
+    history_path: str
+
+
+@dataclass(frozen=True)
+class ProjectSettings(_Section):
+    output_directory: str
+    project_prefix: str
+    incremental_builds: bool
+    component_links: str
+    snapshots: bool
+
+
+@dataclass(frozen=True)
+class GenerationSettings(_Section):
+    race_providers: tuple
+    shards: int
+
+
+@dataclass(frozen=True)
+class SchedulerSettings(_Section):
+    accounts: tuple
+    max_attempts: int
+    backoff_base: float
+    backoff_cap: float
+    quota_reset_hours: float
+
+
+@dataclass(frozen=True)
+class LoggingSettings(_Section):
+    directory: str
+    level: str
+    console_level: str
+
+
+@dataclass(frozen=True)
+class ProfilingSettings(_Section):
+    enabled: bool
+    budgets: MappingProxyType
+    budget_mode: str
+    report_dir: str
+
+
+@dataclass(frozen=True)
+class MetricsSettings(_Section):
+    port: int
+    dump_dir: str
+
+
+@dataclass(frozen=True)
+class ServiceSettings(_Section):
+    host: str
+    port: int
+    workers: int
+    db_path: str
+
+
+@dataclass(frozen=True)
+class Settings(_Section):
+    browser: BrowserSettings
+    urls: UrlSettings
+    timeouts: TimeoutSettings
+    adaptive: AdaptiveSettings
+    project: ProjectSettings
+    generation: GenerationSettings
+    scheduler: SchedulerSettings
+    logging: LoggingSettings
+    profiling: ProfilingSettings
+    metrics: MetricsSettings
+    service: ServiceSettings
+    providers: MappingProxyType
+    selector_cache: MappingProxyType
+    archive: MappingProxyType
+
+
+SECTION_TYPES = {f.name: f.type for f in fields(Settings) if f.name not in FREE_FORM_SECTIONS}
+
+
+def deep_merge(base, override):
+    """New dict with override merged into base; nested dicts merge, everything else replaces"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return text
+
+
+def _nested(dotted_key, value, separator='.'):
+    parts = [part for part in dotted_key.split(separator) if part]
+    result = value
+    for part in reversed(parts):
+        result = {part: result}
+    return result
+
+
+def env_overrides(environ=None, prefix=ENV_PREFIX):
+    """AIWG_TIMEOUTS__PAGE_LOAD=30 -> {'timeouts': {'page_load': 30}}; values are parsed as JSON when possible"""
+    overrides = {}
+    for name, raw in (environ if environ is not None else os.environ).items():
+        if name.startswith(prefix) and '__' in name:
+            key = name[len(prefix):].lower()
+            overrides = deep_merge(overrides, _nested(key, _parse_value(raw), '__'))
+    return overrides
+
+
+def parse_cli_overrides(assignments):
+    """['timeouts.page_load=30', 'generation.race_providers=["perplexity","chatgpt"]'] -> nested dict"""
+    overrides = {}
+    for assignment in assignments or []:
+        key, separator, raw = assignment.partition('=')
+        if not separator or not key.strip():
+            raise ConfigError(f"Expected KEY=VALUE, got '{assignment}'")
+        overrides = deep_merge(overrides, _nested(key.strip(), _parse_value(raw.strip())))
+    return overrides
+
+
+def _drop_legacy_keys(source, origin):
+    for (section, key), replacement in LEGACY_KEYS.items():
+        values = source.get(section)
+        if isinstance(values, dict) and key in values:
+            value = values.pop(key)
+            if replacement:
+                values.setdefault(replacement, value)
+            else:
+                print(f"⚠️ Config: ignoring obsolete '{section}.{key}' from {origin}")
+    return source
+
+
+def _check_value(path, value, default):
+    if default is None:
+        expected = NULLABLE.get(path)
+        if value is None or expected is None or isinstance(value, expected):
+            return value
+    elif isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+    elif isinstance(default, (int, float)):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+    elif isinstance(value, type(default)):
+        return value
+    expected = 'a number' if isinstance(default, (int, float)) and not isinstance(default, bool) \
+        else type(default).__name__
+    raise ConfigError(f"'{'.'.join(path)}' should be {expected}, got {value!r}")
+
+
+def validate(config, origin='config'):
+    """Raise ConfigError for unknown sections/keys or mistyped values in one source"""
+    for section, values in config.items():
+        if section not in DEFAULTS:
+            raise ConfigError(f"Unknown section '{section}' in {origin}")
+        if not isinstance(values, dict):
+            raise ConfigError(f"Section '{section}' in {origin} should be an object")
+        if section in FREE_FORM_SECTIONS:
+            continue
+        for key, value in values.items():
+            if key not in DEFAULTS[section]:
+                raise ConfigError(f"Unknown setting '{section}.{key}' in {origin}")
+            _check_value((section, key), value, DEFAULTS[section][key])
+
+
+def _check_ranges(merged):
+    port = merged['browser']['debug_port']
+    if not 0 < port < 65536:
+        raise ConfigError(f"'browser.debug_port' out of range: {port}")
+    for key, value in merged['timeouts'].items():
+        if value <= 0:
+            raise ConfigError(f"'timeouts.{key}' must be positive, got {value}")
+    adaptive = merged['adaptive']
+    if adaptive['margin'] < 1 or adaptive['min_samples'] < 1:
+        raise ConfigError("'adaptive.margin' and 'adaptive.min_samples' must be at least 1")
+    if not 0 < adaptive['poll_min'] <= adaptive['poll_max']:
+        raise ConfigError("'adaptive.poll_min' must be positive and not above 'adaptive.poll_max'")
+    if merged['generation']['shards'] < 0:
+        raise ConfigError("'generation.shards' must not be negative")
+    if merged['project']['component_links'] not in ('copy', 'hardlink'):
+        raise ConfigError("'project.component_links' must be 'copy' or 'hardlink'")
+    if merged['profiling']['budget_mode'] not in ('warn', 'fail'):
+        raise ConfigError("'profiling.budget_mode' must be 'warn' or 'fail'")
+    if merged['service']['workers'] < 1:
+        raise ConfigError("'service.workers' must be at least 1")
+
+
+def build_settings(merged):
+    """Frozen Settings from a merged, validated dict"""
+    _check_ranges(merged)
+    sections = {}
+    for name, section_type in SECTION_TYPES.items():
+        sections[name] = section_type(**{key: _freeze(value) for key, value in merged[name].items()})
+    for name in FREE_FORM_SECTIONS:
+        sections[name] = _freeze(merged.get(name, {}))
+    return Settings(**sections)
+
+
+def read_settings_file(path):
+    """Parsed settings.json, or {} if it does not exist"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"{path} is not valid JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path} should contain a JSON object")
+    return data
+
+
+def load_settings(path=DEFAULT_SETTINGS_PATH, environ=None, overrides=None):
+    """Defaults < settings file < environment < explicit overrides, validated and frozen"""
+    merged = copy.deepcopy(DEFAULTS)
+    sources = [
+        (str(path), _drop_legacy_keys(read_settings_file(path), str(path)) if path else {}),
+        ('environment', env_overrides(environ)),
+        ('command line', overrides or {})
+    ]
+    for origin, source in sources:
+        validate(source, origin)
+        merged = deep_merge(merged, source)
+    return build_settings(merged)
+
+
+class ConfigManager:
+    """
+    Holds the current Settings and re-reads settings.json when its mtime
+    changes (checked at most once per check_interval, so reads stay cheap).
+    A reload that fails validation keeps the previous settings.
+
+    Components may keep a reference to the manager itself: config['timeouts']
+    always answers from the latest settings, so edited timeouts apply to the
+    next wait without a restart.
+    """
+
+    def __init__(self, path=DEFAULT_SETTINGS_PATH, overrides=None, environ=None,
+                 check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = Path(os.path.expanduser(str(path))) if path else None
+        self.overrides = overrides or {}
+        self.environ = environ
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = self._current_mtime()
+        self._checked_at = time.monotonic()
+        self._settings = load_settings(self.path, environ, self.overrides)
+        self.reloads = 0
+
+    def _current_mtime(self):
+        try:
+            return os.path.getmtime(self.path) if self.path else None
+        except OSError:
+            return None
+
+    def get(self, key=None, default=None):
+        """Current Settings, or one section of it (dict-style .get)"""
+        now = time.monotonic()
+        if self.check_interval is not None and now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._maybe_reload()
+        return self._settings if key is None else self._settings.get(key, default)
+
+    @property
+    def settings(self):
+        return self.get()
+
+    def __getitem__(self, key):
+        return self.get()[key]
+
+    def __contains__(self, key):
+        return key in self._settings
+
+    def _maybe_reload(self):
+        mtime = self._current_mtime()
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                self._settings = load_settings(self.path, self.environ, self.overrides)
+                self.reloads += 1
+                print(f"🔄 Configuration reloaded from {self.path}")
+            except ConfigError as e:
+                print(f"⚠️ Keeping previous configuration: {e}")
+
+    def reload(self):
+        """Force a re-read regardless of mtime"""
+        with self._lock:
+            self._mtime = self._current_mtime()
+            self._settings = load_settings(self.path, self.environ, self.overrides)
+            self.reloads += 1
+        return self._settings
+
+    def with_overrides(self, overrides):
+        """A separate manager on the same sources with extra overrides on top (e.g. a per-worker port)"""
+        return ConfigManager(self.path, deep_merge(self.overrides, overrides), self.environ, self.check_interval)
+
+    def as_dict(self):
+        return self.get().as_dict()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def configure(path=DEFAULT_SETTINGS_PATH, overrides=None, environ=None):
+    """(Re)create the process-wide manager, e.g. from --config/--set; returns it"""
+    global _manager
+    with _manager_lock:
+        _manager = ConfigManager(path, overrides, environ)
+    return _manager
+
+
+def get_config():
+    """The process-wide ConfigManager, created from the default sources on first use"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ConfigManager()
+    return _manager
+
+
+def get_settings():
+    """Current frozen Settings from the process-wide manager"""
+    return get_config().get()
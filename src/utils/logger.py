@@ -1,32 +1,215 @@
 """
 Logging utility
+One non-blocking logging pipeline: callers enqueue, a listener thread formats and writes
 """
 
+import atexit
+import contextvars
+import gzip
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
-def setup_logger():
-    """Setup application logger"""
-    # Create logs directory
-    log_dir = "logs"
+LOGGER_NAME = 'ai_website_generator'
+DEFAULT_LOG_DIR = "logs"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 14
+DEFAULT_ROTATE_SECONDS = 24 * 3600
+
+# Lookups that are allowed to fail; their tracebacks are noise, not diagnostics
+EXPECTED_EXCEPTIONS = {
+    'NoSuchElementException',
+    'TimeoutException',
+    'StaleElementReferenceException',
+    'ElementNotInteractableException',
+    'ElementClickInterceptedException'
+}
+# Selenium puts the chromedriver native stack into the exception message itself
+DRIVER_STACK_MARKERS = ('\nStacktrace:', '\n  (Session info:', '\nBacktrace:')
+
+job_id_var = contextvars.ContextVar('job_id', default=None)
+stage_var = contextvars.ContextVar('stage', default=None)
+
+_listener = None
+
+
+def set_log_context(job_id=None, stage=None):
+    """Tag every record logged from this thread/context with a job and/or stage"""
+    if job_id is not None:
+        job_id_var.set(job_id)
+    if stage is not None:
+        stage_var.set(stage)
+
+
+@contextmanager
+def log_context(job_id=None, stage=None):
+    """Temporarily tag records with a job and/or stage"""
+    tokens = []
+    if job_id is not None:
+        tokens.append((job_id_var, job_id_var.set(job_id)))
+    if stage is not None:
+        tokens.append((stage_var, stage_var.set(stage)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def strip_driver_stack(message):
+    for marker in DRIVER_STACK_MARKERS:
+        index = message.find(marker)
+        if index != -1:
+            message = message[:index].rstrip()
+    return message
+
+
+class ContextFilter(logging.Filter):
+    """
+    Runs in the calling thread (on the queue handler), so job/stage context
+    is captured where the record was made. Also trims chromedriver stacks
+    and drops tracebacks of expected lookup misses.
+    """
+
+    def filter(self, record):
+        record.job_id = job_id_var.get()
+        record.stage = stage_var.get()
+
+        message = record.getMessage()
+        trimmed = strip_driver_stack(message)
+        if trimmed != message:
+            record.msg, record.args = trimmed, None
+
+        if record.exc_info and record.exc_info[0] and record.exc_info[0].__name__ in EXPECTED_EXCEPTIONS:
+            record.msg = f"{record.getMessage()} ({record.exc_info[0].__name__})"
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+        if getattr(record, 'expected_miss', False) and record.levelno > logging.DEBUG:
+            record.levelno, record.levelname = logging.DEBUG, 'DEBUG'
+        return True
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without formatting them, keeping tracebacks as text for the JSON writer"""
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'job_id': getattr(record, 'job_id', None),
+            'stage': getattr(record, 'stage', None),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'thread': record.threadName
+        }
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        context = '/'.join(str(part) for part in (getattr(record, 'job_id', None), getattr(record, 'stage', None)) if part)
+        prefix = f"{self.formatTime(record)} - {record.levelname}"
+        return f"{prefix} - [{context}] {record.getMessage()}" if context else f"{prefix} - {record.getMessage()}"
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotates when the file exceeds max_bytes or is older than rotate_seconds; old files are gzipped"""
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 rotate_seconds=DEFAULT_ROTATE_SECONDS):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.rotate_seconds = rotate_seconds
+        self.opened_at = os.path.getmtime(filename) if os.path.exists(filename) else time.time()
+        self.namer = lambda name: name + '.gz'
+        self.rotator = self._compress
+
+    @staticmethod
+    def _compress(source, destination):
+        with open(source, 'rb') as src, gzip.open(destination, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if self.rotate_seconds and time.time() - self.opened_at >= self.rotate_seconds:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+
+def setup_logger(name=LOGGER_NAME, log_dir=DEFAULT_LOG_DIR, level=logging.INFO, console_level=logging.INFO,
+                 max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 rotate_seconds=DEFAULT_ROTATE_SECONDS):
+    """
+    Setup application logger. The logger only puts records on an in-memory
+    queue; a listener thread writes JSON lines to logs/generator.log (size and
+    age rotation, gzipped backups) and a short line to the console, so a
+    slow disk never stalls the capture loop. Safe to call more than once.
+    """
+    global _listener
+    logger = logging.getLogger(name)
+    if _listener is not None:
+        return logger
+
     os.makedirs(log_dir, exist_ok=True)
-    
-    # Create logger
-    logger = logging.getLogger('ai_website_generator')
-    logger.setLevel(logging.INFO)
-    
-    # Create file handler
-    log_file = os.path.join(log_dir, f"generator_{datetime.now().strftime('%Y%m%d')}.log")
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.INFO)
-    
-    # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    
-    # Add handler to logger
-    if not logger.handlers:
-        logger.addHandler(file_handler)
-    
+    file_handler = CompressingRotatingFileHandler(
+        os.path.join(log_dir, "generator.log"), max_bytes, backup_count, rotate_seconds
+    )
+    file_handler.setLevel(level)
+    file_handler.setFormatter(JsonFormatter())
+
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(ConsoleFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    logger.setLevel(min(level, console_level))
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
     return logger
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,221 @@
+"""
+Metrics
+In-process counters and latency histograms, exposed as Prometheus text
+"""
+
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+QUANTILES = (0.5, 0.95, 0.99)
+RESERVOIR_SIZE = 2048
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = [(name, value) for name, value in zip(labelnames, key)] + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = ('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for name, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return {'|'.join(key) or 'total': value for key, value in sorted(self._values.items())}
+
+
+class Histogram:
+    """
+    Cumulative buckets, sum and count per label set (the Prometheus
+    histogram), plus a bounded reservoir of recent observations so p50/p95/
+    p99 can be reported directly without a Prometheus server.
+    """
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0,
+                    'recent': deque(maxlen=RESERVOIR_SIZE)
+                }
+            series['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            series['sum'] += value
+            series['count'] += 1
+            series['recent'].append(value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantiles(self, **labels):
+        series = self._series.get(_label_key(self.labelnames, labels))
+        return self._quantiles(series) if series else {}
+
+    @staticmethod
+    def _quantiles(series):
+        values = sorted(series['recent'])
+        if not values:
+            return {}
+        # Nearest rank, as in stage_history.percentile
+        return {f"p{int(q * 100)}": round(values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))], 4)
+                for q in QUANTILES}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), series['counts']):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {round(series['sum'], 6)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                '|'.join(key) or 'total': dict(
+                    count=series['count'], sum=round(series['sum'], 4), **self._quantiles(series)
+                )
+                for key, series in sorted(self._series.items())
+            }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.started_at = time.time()
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render_prometheus(self):
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        lines.append("# HELP llm_process_uptime_seconds Seconds since the metrics registry was created")
+        lines.append("# TYPE llm_process_uptime_seconds gauge")
+        lines.append(f"llm_process_uptime_seconds {round(time.time() - self.started_at, 3)}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """Plain-dict view with quantiles, for reports and the end-of-batch dump"""
+        uptime = time.time() - self.started_at
+        finished = JOBS.value(status='done') + JOBS.value(status='failed')
+        return {
+            'uptime_seconds': round(uptime, 3),
+            'jobs_per_hour': round(finished * 3600 / uptime, 2) if uptime > 0 else 0.0,
+            'metrics': {name: self._metrics[name].snapshot() for name in sorted(self._metrics)}
+        }
+
+    def dump(self, directory, prefix='metrics'):
+        """Write <prefix>_<timestamp>.prom and .json under directory; returns the two paths"""
+        os.makedirs(os.path.expanduser(directory), exist_ok=True)
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(os.path.expanduser(directory), f"{prefix}_{stamp}")
+        with open(base + '.prom', 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return base + '.prom', base + '.json'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'llm_stage_duration_seconds', 'Duration of pipeline stages', ['stage'])
+JOBS = REGISTRY.counter(
+    'llm_jobs_total', 'Generation jobs by final status', ['status'])
+RETRIES = REGISTRY.counter(
+    'llm_generation_retries_total', 'Retries in prompt submission and capture', ['reason'])
+SELECTOR_LOOKUPS = REGISTRY.counter(
+    'llm_selector_lookups_total', 'Selector probes by site, group and result', ['site', 'group', 'result'])
+CACHE_REQUESTS = REGISTRY.counter(
+    'llm_cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result'])
+
+
+def start_metrics_server(port, host='127.0.0.1', registry=REGISTRY):
+    """Serve /metrics in a daemon thread; returns the server (call shutdown() to stop)"""
+    # http.server is only imported when an endpoint is actually wanted
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = self.server.registry.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
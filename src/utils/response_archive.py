@@ -0,0 +1,274 @@
+"""
+Response archive
+Indexed, append-only storage for captured LLM responses
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_ARCHIVE_DIR = "~/Desktop/Perplexity_Responses/archive"
+DEFAULT_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_COMPACT_AFTER_DAYS = 7
+
+CAPTURE_COLUMNS = "id, job_id, prompt_hash, size, created_at, segment, offset, length, compressed, source"
+
+
+def hash_prompt(prompt):
+    """Stable hash used to look captures up by prompt"""
+    normalized = ' '.join((prompt or '').split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class ResponseArchive:
+    """
+    Captures are appended to raw segment files and indexed in SQLite.
+    Every lookup goes through a B-tree index, so "latest", "by prompt" and
+    "by date" stay O(log n) however many captures exist. Old captures are
+    compacted into gzip segments (one gzip member per capture, so a single
+    capture can still be read back with one seek).
+
+    The connection is shared between threads (job service workers, the
+    HTTP handlers), so reads take the same lock as writes.
+    """
+
+    def __init__(self, root=None, segment_max_bytes=DEFAULT_SEGMENT_MAX_BYTES,
+                 compact_after_days=DEFAULT_COMPACT_AFTER_DAYS):
+        self.root = Path(os.path.expanduser(root or DEFAULT_ARCHIVE_DIR))
+        self.segments_dir = self.root / 'segments'
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_after_days = compact_after_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / 'index.sqlite3'), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS captures (
+                    id TEXT PRIMARY KEY,
+                    job_id TEXT,
+                    prompt_hash TEXT,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    compressed INTEGER NOT NULL DEFAULT 0,
+                    source TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_captures_created ON captures (created_at);
+                CREATE INDEX IF NOT EXISTS idx_captures_prompt ON captures (prompt_hash, created_at);
+                CREATE INDEX IF NOT EXISTS idx_captures_job ON captures (job_id);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+
+    def _get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value))
+        )
+
+    def _next_segment_name(self, kind):
+        """Allocate a new segment file name ('raw' or 'packed')"""
+        counter = int(self._get_meta('segment_counter', 0)) + 1
+        self._set_meta('segment_counter', counter)
+        suffix = 'seg' if kind == 'raw' else 'seg.gz'
+        return f"{kind}_{counter:06d}.{suffix}"
+
+    def _active_segment(self):
+        """Return the raw segment new captures are appended to"""
+        name = self._get_meta('active_segment')
+        if name:
+            path = self.segments_dir / name
+            if not path.exists() or path.stat().st_size < self.segment_max_bytes:
+                return name
+
+        name = self._next_segment_name('raw')
+        self._set_meta('active_segment', name)
+        return name
+
+    def add(self, content, job_id=None, prompt=None, source=None):
+        """Append a capture and index it; returns the capture record"""
+        data = content.encode('utf-8')
+        capture_id = uuid.uuid4().hex
+        created_at = time.time()
+
+        with self._lock:
+            with self._conn:
+                previous = self._get_meta('active_segment')
+                segment = self._active_segment()
+                with open(self.segments_dir / segment, 'ab') as f:
+                    offset = f.tell()
+                    f.write(data)
+
+                self._conn.execute(
+                    f"INSERT INTO captures ({CAPTURE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                    (capture_id, job_id, hash_prompt(prompt) if prompt else None, len(data),
+                     created_at, segment, offset, len(data), source)
+                )
+            rolled_over = previous is not None and previous != segment
+
+        # A fresh segment means the previous one is sealed - good time to compact
+        if rolled_over:
+            self.compact()
+
+        return self.get(capture_id)
+
+    def get(self, capture_id):
+        """Return the index record for a capture id"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {CAPTURE_COLUMNS} FROM captures WHERE id = ?", (capture_id,)
+            ).fetchone()
+        return self._to_record(row)
+
+    def read(self, capture):
+        """Read a capture's content back; accepts a record or a capture id"""
+        capture_id = capture if isinstance(capture, str) else capture['id']
+        # Look the location up again under the lock: compaction may have moved the capture
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {CAPTURE_COLUMNS} FROM captures WHERE id = ?", (capture_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown capture: {capture_id}")
+            return self._read_data(self._to_record(row))
+
+    def _read_data(self, record):
+        with open(self.segments_dir / record['segment'], 'rb') as f:
+            f.seek(record['offset'])
+            data = f.read(record['length'])
+
+        if record['compressed']:
+            data = gzip.decompress(data)
+        return data.decode('utf-8')
+
+    def latest(self):
+        """Most recent capture record, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {CAPTURE_COLUMNS} FROM captures ORDER BY created_at DESC LIMIT 1"
+            ).fetchone()
+        return self._to_record(row)
+
+    def by_prompt(self, prompt, limit=10):
+        """Captures for a prompt, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {CAPTURE_COLUMNS} FROM captures WHERE prompt_hash = ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (hash_prompt(prompt), limit)
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def by_job(self, job_id):
+        """Captures recorded for a job id, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {CAPTURE_COLUMNS} FROM captures WHERE job_id = ? ORDER BY created_at",
+                (job_id,)
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def by_date(self, start, end=None, limit=100):
+        """Captures created in [start, end), oldest first; accepts datetimes or timestamps"""
+        start_ts = start.timestamp() if isinstance(start, datetime) else float(start)
+        if end is None:
+            end_ts = time.time() + 1
+        else:
+            end_ts = end.timestamp() if isinstance(end, datetime) else float(end)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {CAPTURE_COLUMNS} FROM captures WHERE created_at >= ? AND created_at < ? "
+                "ORDER BY created_at LIMIT ?",
+                (start_ts, end_ts, limit)
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+    def compact(self, older_than_days=None):
+        """Move old raw captures into a gzip segment and drop emptied raw segments"""
+        if older_than_days is None:
+            older_than_days = self.compact_after_days
+        cutoff = time.time() - older_than_days * 86400
+
+        with self._lock:
+            active = self._get_meta('active_segment')
+            rows = self._conn.execute(
+                f"SELECT {CAPTURE_COLUMNS} FROM captures "
+                "WHERE compressed = 0 AND created_at < ? AND segment != ? ORDER BY created_at",
+                (cutoff, active or '')
+            ).fetchall()
+            if not rows:
+                return 0
+
+            with self._conn:
+                packed = self._next_segment_name('packed')
+                updates = []
+                with open(self.segments_dir / packed, 'wb') as out:
+                    for row in rows:
+                        record = self._to_record(row)
+                        member = gzip.compress(self._read_data(record).encode('utf-8'))
+                        updates.append((packed, out.tell(), len(member), record['id']))
+                        out.write(member)
+
+                self._conn.executemany(
+                    "UPDATE captures SET segment = ?, offset = ?, length = ?, compressed = 1 WHERE id = ?",
+                    updates
+                )
+
+            emptied = {row['segment'] for row in rows}
+            for segment in emptied:
+                still_used = self._conn.execute(
+                    "SELECT 1 FROM captures WHERE segment = ? LIMIT 1", (segment,)
+                ).fetchone()
+                if not still_used:
+                    try:
+                        (self.segments_dir / segment).unlink()
+                    except FileNotFoundError:
+                        pass
+
+        return len(rows)
+
+    def import_file(self, path, job_id=None):
+        """Index a legacy perplexity_response_*.txt file, keeping its mtime as created_at"""
+        path = Path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            record = self.add(f.read(), job_id=job_id, source=path.name)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE captures SET created_at = ? WHERE id = ?",
+                (path.stat().st_mtime, record['id'])
+            )
+        return self.get(record['id'])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_record(row):
+        if row is None:
+            return None
+        record = dict(row)
+        record['compressed'] = bool(record['compressed'])
+        return record
@@ -0,0 +1,112 @@
+"""
+Selector cache
+Learns which CSS locator works on each site so probes try the winner first
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "selector_cache.json"
+DEFAULT_REVALIDATE_EVERY = 50
+DEFAULT_MAX_AGE_DAYS = 14
+DEMOTE_AFTER_MISSES = 3
+SAVE_INTERVAL = 5.0
+
+
+class SelectorCache:
+    """
+    Per-site, per-probe-group selector statistics (hits, misses, latency,
+    last success) persisted to a small JSON file. order() puts selectors that
+    recently matched first; one that keeps missing is demoted so the full
+    list is walked again. Every revalidate_every-th lookup of a group uses
+    the default order, so a more specific selector that starts matching
+    after a layout change can take over.
+    """
+
+    def __init__(self, path=None, revalidate_every=DEFAULT_REVALIDATE_EVERY, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = Path(os.path.expanduser(str(path))) if path else DEFAULT_CACHE_PATH
+        self.revalidate_every = revalidate_every
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._lookups = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self.stats = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _entry(self, site, group, selector):
+        return self.stats.setdefault(site or 'unknown', {}).setdefault(group, {}).setdefault(
+            selector, {'hits': 0, 'misses': 0, 'consecutive_misses': 0, 'last_hit': 0.0, 'avg_ms': 0.0}
+        )
+
+    def _is_trusted(self, entry, now):
+        return (entry['hits'] > 0 and entry['consecutive_misses'] < DEMOTE_AFTER_MISSES
+                and now - entry['last_hit'] < self.max_age)
+
+    def order(self, site, group, selectors):
+        """Return selectors with recent winners first, or the default order on re-validation rounds"""
+        key = (site, group)
+        with self._lock:
+            self._lookups[key] = self._lookups.get(key, 0) + 1
+            if self.revalidate_every and self._lookups[key] % self.revalidate_every == 0:
+                return list(selectors)
+
+            known = self.stats.get(site or 'unknown', {}).get(group, {})
+            now = time.time()
+            trusted = [s for s in selectors if s in known and self._is_trusted(known[s], now)]
+            trusted.sort(key=lambda s: (-known[s]['hits'], selectors.index(s)))
+            return trusted + [s for s in selectors if s not in trusted]
+
+    def winner(self, site, group, selectors):
+        """The selector currently trusted most for a group (ties go to the earlier default), or None"""
+        known = self.stats.get(site or 'unknown', {}).get(group, {})
+        now = time.time()
+        trusted = [s for s in selectors if s in known and self._is_trusted(known[s], now)]
+        if not trusted:
+            return None
+        return min(trusted, key=lambda s: (-known[s]['hits'], selectors.index(s)))
+
+    def record_hit(self, site, group, selector, elapsed=0.0):
+        with self._lock:
+            entry = self._entry(site, group, selector)
+            entry['hits'] += 1
+            entry['consecutive_misses'] = 0
+            entry['last_hit'] = time.time()
+            elapsed_ms = elapsed * 1000
+            entry['avg_ms'] = round(elapsed_ms if entry['hits'] == 1 else entry['avg_ms'] * 0.8 + elapsed_ms * 0.2, 2)
+            self._dirty = True
+        self.save()
+
+    def record_miss(self, site, group, selector):
+        with self._lock:
+            entry = self._entry(site, group, selector)
+            entry['misses'] += 1
+            entry['consecutive_misses'] += 1
+            self._dirty = True
+
+    def save(self, force=False):
+        """Persist stats; writes are throttled unless force=True"""
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._last_save < SAVE_INTERVAL):
+                return
+            snapshot = json.dumps(self.stats, indent=2, sort_keys=True)
+            self._dirty = False
+            self._last_save = time.time()
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            self._dirty = True
@@ -0,0 +1,168 @@
+"""
+Stage history
+Recorded stage durations per provider and prompt size, used for percentile-based deadlines and polling
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_HISTORY_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "stage_history.sqlite3"
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_MARGIN = 1.5
+WINDOW = 200
+# Prompt sizes (characters) that behave alike; answers to longer prompts take longer
+SIZE_BUCKETS = (2000, 6000, 15000)
+
+
+def size_bucket(size):
+    """Bucket label for a prompt size, e.g. '<6000'; 'any' when the size is unknown"""
+    if size is None:
+        return 'any'
+    for limit in SIZE_BUCKETS:
+        if size < limit:
+            return f"<{limit}"
+    return f"{SIZE_BUCKETS[-1]}+"
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an unsorted list (q in 0..1)"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class StageHistory:
+    """
+    Durations of successful runs, keyed by (provider, stage, size bucket),
+    in a small SQLite table. deadline() turns the recent p99 into a timeout
+    (p99 * margin, kept between a floor and the static ceiling), falling back
+    to the static value until min_samples runs have been seen. The last
+    WINDOW samples per key are cached in memory, so lookups never hit disk.
+    """
+
+    def __init__(self, path=None, min_samples=DEFAULT_MIN_SAMPLES, margin=DEFAULT_MARGIN):
+        self.path = Path(os.path.expanduser(str(path))) if path else DEFAULT_HISTORY_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_samples = min_samples
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS stage_durations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    provider TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    size_bucket TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    outcome TEXT NOT NULL,
+                    recorded_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_stage_durations_key
+                    ON stage_durations (provider, stage, size_bucket, outcome);
+            """)
+
+    def record(self, provider, stage, seconds, size=None, outcome='ok'):
+        """Store one duration; only outcome='ok' runs feed the percentiles"""
+        bucket = size_bucket(size)
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO stage_durations (provider, stage, size_bucket, seconds, outcome, recorded_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (provider, stage, bucket, float(seconds), outcome, time.time())
+                    )
+            except sqlite3.Error:
+                pass
+            if outcome == 'ok':
+                for key in {(provider, stage, bucket), (provider, stage, 'any')}:
+                    if key in self._cache:
+                        self._cache[key] = (self._cache[key] + [float(seconds)])[-WINDOW:]
+
+    def durations(self, provider, stage, size=None):
+        """Recent successful durations for this size bucket, or for all sizes if the bucket is too thin"""
+        samples = self._load(provider, stage, size_bucket(size))
+        if len(samples) < self.min_samples and size is not None:
+            samples = self._load(provider, stage, 'any')
+        return samples
+
+    def _load(self, provider, stage, bucket):
+        key = (provider, stage, bucket)
+        with self._lock:
+            if key not in self._cache:
+                query = ("SELECT seconds FROM stage_durations WHERE provider = ? AND stage = ? AND outcome = 'ok'"
+                         + ("" if bucket == 'any' else " AND size_bucket = ?")
+                         + " ORDER BY id DESC LIMIT ?")
+                params = (provider, stage) + (() if bucket == 'any' else (bucket,)) + (WINDOW,)
+                try:
+                    rows = self._conn.execute(query, params).fetchall()
+                except sqlite3.Error:
+                    rows = []
+                self._cache[key] = [row['seconds'] for row in reversed(rows)]
+            return self._cache[key]
+
+    def percentile(self, provider, stage, q, size=None):
+        """q-th percentile of recent durations, or None with fewer than min_samples runs"""
+        samples = self.durations(provider, stage, size)
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, q)
+
+    def deadline(self, provider, stage, default, size=None, floor=0):
+        """p99 * margin bounded to [floor, default]; default itself until there is enough history"""
+        p99 = self.percentile(provider, stage, 0.99, size)
+        if p99 is None:
+            return default
+        return max(floor, min(default, p99 * self.margin))
+
+    def summary(self):
+        """{'provider/stage/bucket': {'runs', 'p50', 'p95', 'p99'}} for every key with successful runs"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT provider, stage, size_bucket FROM stage_durations WHERE outcome = 'ok'"
+            ).fetchall()
+        report = {}
+        for row in rows:
+            samples = self._load(row['provider'], row['stage'], row['size_bucket'])
+            if samples:
+                report[f"{row['provider']}/{row['stage']}/{row['size_bucket']}"] = {
+                    'runs': len(samples),
+                    'p50': round(percentile(samples, 0.5), 2),
+                    'p95': round(percentile(samples, 0.95), 2),
+                    'p99': round(percentile(samples, 0.99), 2)
+                }
+        return report
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AdaptivePoll:
+    """
+    Poll interval that drops to `fast` whenever the watched content changed
+    (tokens are streaming) and grows by `growth` per idle poll up to `slow`.
+    """
+
+    def __init__(self, fast=1.0, slow=6.0, growth=1.5):
+        self.fast = fast
+        self.slow = max(fast, slow)
+        self.growth = growth
+        self.interval = fast
+
+    def update(self, changed):
+        """Next interval after a poll that did (or did not) see a change"""
+        self.interval = self.fast if changed else min(self.slow, self.interval * self.growth)
+        return self.interval
+
+    def sleep(self, changed):
+        time.sleep(self.update(changed))
@@ -0,0 +1,66 @@
+"""
+Text classifier
+Keyword sets compiled into a single alternation regex, scored in one pass
+"""
+
+import re
+from bisect import bisect_right
+
+LINE_PATTERN = re.compile(r'[^\n]+')
+
+
+class KeywordClassifier:
+    """
+    Compiles every category's keywords into one case-insensitive alternation
+    (longest keywords first), so a text is scanned once no matter how many
+    keywords or categories there are.
+    """
+
+    def __init__(self, categories):
+        self.categories = {name: [k.lower() for k in keywords] for name, keywords in categories.items()}
+        self.keyword_categories = {}
+        for name, keywords in self.categories.items():
+            for keyword in keywords:
+                self.keyword_categories.setdefault(keyword, set()).add(name)
+
+        ordered = sorted(self.keyword_categories, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(k) for k in ordered), re.IGNORECASE)
+
+    def matches(self, text):
+        """Distinct keywords found per category: {category: set(keywords)}"""
+        found = {name: set() for name in self.categories}
+        for match in self.pattern.finditer(text):
+            keyword = match.group(0).lower()
+            for name in self.keyword_categories[keyword]:
+                found[name].add(keyword)
+        return found
+
+    def score_lines(self, text, min_length=0):
+        """
+        Split text into stripped lines longer than min_length and score them
+        all with a single scan of the text. Returns (lines, scores) where
+        scores[i] is {category: set(keywords)} for lines[i].
+        """
+        lines = []
+        starts = []
+        ends = []
+        for match in LINE_PATTERN.finditer(text):
+            line = match.group(0).strip()
+            if len(line) > min_length:
+                lines.append(line)
+                starts.append(match.start())
+                ends.append(match.end())
+
+        scores = [{name: set() for name in self.categories} for _ in lines]
+        if not lines:
+            return lines, scores
+
+        for match in self.pattern.finditer(text):
+            index = bisect_right(starts, match.start()) - 1
+            if index < 0 or match.end() > ends[index]:
+                continue
+            keyword = match.group(0).lower()
+            for name in self.keyword_categories[keyword]:
+                scores[index][name].add(keyword)
+
+        return lines, scores
@@ -0,0 +1,167 @@
+"""
+WebDriver profiler
+Records every WebDriver round trip with its latency, payload size and calling function
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+SELENIUM_MARKER = os.sep + 'selenium' + os.sep
+THIS_FILE = os.path.abspath(__file__)
+
+
+class RoundTripBudgetExceeded(RuntimeError):
+    """A code path made more WebDriver round trips than its budget allows"""
+
+
+def _payload_size(value):
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class WebDriverProfiler:
+    """
+    Replaces driver.execute on one driver instance. WebElement methods
+    (.text, is_displayed, click...) go through the same method, so every
+    command is seen. Each call is attributed to the first stack frame outside
+    Selenium and this module, e.g. 'code_generator._is_usable_input'.
+
+    budget() counts round trips made inside a block by the current thread;
+    in 'warn' mode an overrun is logged, in 'fail' mode it raises
+    RoundTripBudgetExceeded (meant for benchmarks).
+    """
+
+    def __init__(self, driver, logger=None, budgets=None, budget_mode='warn'):
+        self.driver = driver
+        self.logger = logger
+        self.budgets = dict(budgets or {})
+        self.budget_mode = budget_mode
+        self.stats = {}
+        self.overruns = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._original_execute = None
+
+    def install(self):
+        if self._original_execute is None:
+            self._original_execute = self.driver.execute
+            self.driver.execute = self._execute
+        return self
+
+    def uninstall(self):
+        if self._original_execute is not None:
+            self.driver.execute = self._original_execute
+            self._original_execute = None
+
+    def _caller(self):
+        frame = sys._getframe(2)
+        while frame:
+            filename = frame.f_code.co_filename
+            if SELENIUM_MARKER not in filename and os.path.abspath(filename) != THIS_FILE:
+                module = os.path.splitext(os.path.basename(filename))[0]
+                return f"{module}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        return 'unknown'
+
+    def _execute(self, driver_command, params=None):
+        caller = self._caller()
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._original_execute(driver_command, params)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            sent = _payload_size(params) if params else 0
+            received = _payload_size(response.get('value')) if isinstance(response, dict) else 0
+            self._record(caller, driver_command, elapsed, sent + received)
+
+    def _record(self, caller, command, elapsed, size):
+        with self._lock:
+            entry = self.stats.get((caller, command))
+            if entry is None:
+                entry = self.stats[(caller, command)] = {'calls': 0, 'total_s': 0.0, 'max_s': 0.0, 'bytes': 0}
+            entry['calls'] += 1
+            entry['total_s'] += elapsed
+            entry['max_s'] = max(entry['max_s'], elapsed)
+            entry['bytes'] += size
+
+        for scope in getattr(self._local, 'scopes', []):
+            scope['calls'] += 1
+
+    @contextmanager
+    def budget(self, name, limit=None):
+        """Count round trips in this block against budgets[name] (or limit); no-op without a budget"""
+        limit = limit if limit is not None else self.budgets.get(name)
+        if not limit:
+            yield
+            return
+
+        scope = {'calls': 0}
+        scopes = getattr(self._local, 'scopes', None)
+        if scopes is None:
+            scopes = self._local.scopes = []
+        scopes.append(scope)
+        try:
+            yield
+        finally:
+            scopes.remove(scope)
+        if scope['calls'] > limit:
+            with self._lock:
+                overrun = self.overruns.setdefault(name, {'count': 0, 'worst': 0, 'limit': limit})
+                overrun['count'] += 1
+                overrun['worst'] = max(overrun['worst'], scope['calls'])
+            message = f"WebDriver budget '{name}' exceeded: {scope['calls']} round trips (limit {limit})"
+            if self.budget_mode == 'fail':
+                raise RoundTripBudgetExceeded(message)
+            if self.logger:
+                self.logger.warning(message)
+
+    def top(self, limit=15, by='total_s'):
+        """Heaviest (caller, command) pairs"""
+        with self._lock:
+            rows = [dict(caller=caller, command=command, **entry) for (caller, command), entry in self.stats.items()]
+        rows.sort(key=lambda row: row[by], reverse=True)
+        return rows[:limit]
+
+    def totals(self):
+        with self._lock:
+            calls = sum(entry['calls'] for entry in self.stats.values())
+            seconds = sum(entry['total_s'] for entry in self.stats.values())
+            size = sum(entry['bytes'] for entry in self.stats.values())
+        return {'calls': calls, 'total_s': round(seconds, 3), 'bytes': size,
+                'wall_s': round(time.time() - self.started_at, 3)}
+
+    def report(self, limit=15):
+        """Plain-text table of the top offenders"""
+        totals = self.totals()
+        lines = [
+            f"WebDriver round trips: {totals['calls']} calls, {totals['total_s']:.2f}s in driver "
+            f"of {totals['wall_s']:.0f}s wall, {totals['bytes'] / 1024:.0f} KiB",
+            f"{'caller':<45} {'command':<28} {'calls':>6} {'total s':>8} {'avg ms':>8} {'max ms':>8} {'KiB':>7}"
+        ]
+        for row in self.top(limit):
+            lines.append(
+                f"{row['caller'][:45]:<45} {row['command'][:28]:<28} {row['calls']:>6} {row['total_s']:>8.2f} "
+                f"{row['total_s'] * 1000 / row['calls']:>8.1f} {row['max_s'] * 1000:>8.1f} {row['bytes'] / 1024:>7.1f}"
+            )
+        for name, overrun in sorted(self.overruns.items()):
+            lines.append(f"budget '{name}': exceeded {overrun['count']}x, worst {overrun['worst']} "
+                         f"(limit {overrun['limit']})")
+        return '\n'.join(lines)
+
+    def write_report(self, directory):
+        """Write the full per-caller breakdown as JSON; returns the path"""
+        os.makedirs(os.path.expanduser(directory), exist_ok=True)
+        path = os.path.join(os.path.expanduser(directory), f"webdriver_profile_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'totals': self.totals(), 'top': self.top(limit=1000), 'budgets': self.budgets,
+                       'overruns': self.overruns}, f, indent=2)
+        return path
@@ -0,0 +1,80 @@
+from utils.artifact_store import ArtifactStore
+
+HEADER = ''.join(f"  <a href=\"/page{n}\">Page {n}</a>\n" for n in range(400))
+
+
+def write_tree(root, title):
+    (root / 'src' / 'components').mkdir(parents=True)
+    (root / 'src' / 'components' / 'Header.jsx').write_text(HEADER, encoding='utf-8')
+    (root / 'src' / 'App.jsx').write_text(HEADER + f"<h1>{title}</h1>\n", encoding='utf-8')
+    (root / 'logo.bin').write_bytes(bytes(range(256)) * 4)
+    (root / 'node_modules').mkdir()
+    (root / 'node_modules' / 'big.js').write_text('ignored', encoding='utf-8')
+
+
+def test_near_identical_trees_share_chunks(tmp_path):
+    write_tree(tmp_path / 'one', 'PowerGym')
+    write_tree(tmp_path / 'two', 'PowerGym Pro')
+    store = ArtifactStore(root=str(tmp_path / 'store'))
+
+    store.store_tree('one', tmp_path / 'one')
+    first = store.stats()
+    store.store_tree('two', tmp_path / 'two')
+    second = store.stats()
+
+    assert second['logical_bytes'] == 2 * first['logical_bytes'] + len(' Pro')
+    # Only the changed line of App.jsx is new; everything else is shared
+    assert second['unique_bytes'] - first['unique_bytes'] < 200
+    assert second['stored_bytes'] < first['logical_bytes']
+    header = next(record for record in store.list_files('one') if record['path'].endswith('Header.jsx'))
+    assert store.snapshots_with_content(header['content_hash']) == ['one', 'two']
+
+
+def test_restore_and_read_round_trip_the_bytes(tmp_path):
+    write_tree(tmp_path / 'one', 'PowerGym')
+    store = ArtifactStore(root=str(tmp_path / 'store'))
+    snapshot = store.store_tree('one', tmp_path / 'one', extra_files={'.llm/response.txt': 'answer'})
+
+    assert snapshot['file_count'] == 4
+    assert [record['path'] for record in store.list_files('one')] == [
+        '.llm/response.txt', 'logo.bin', 'src/App.jsx', 'src/components/Header.jsx'
+    ]
+    assert store.read_file('one', 'logo.bin') == (tmp_path / 'one' / 'logo.bin').read_bytes()
+    assert store.read_text('one', '.llm/response.txt') == 'answer'
+
+    restored = store.restore_tree('one', tmp_path / 'restored')
+    for path in ('logo.bin', 'src/App.jsx', 'src/components/Header.jsx'):
+        assert (restored / path).read_bytes() == (tmp_path / 'one' / path).read_bytes()
+    assert not (restored / 'node_modules').exists()
+
+
+RESPONSE = """// Component: Header
+// File: src/components/Header.jsx
+export default function Header() {
+  return <header className="p-4">PowerGym</header>;
+}
+"""
+
+
+def build(tmp_path, **options):
+    from tools.phase2_complete_project_builder import CompleteProjectBuilder
+    from utils.component_index import ComponentIndex
+
+    builder = CompleteProjectBuilder(artifact_store=ArtifactStore(root=str(tmp_path / 'store')),
+                                     component_index=ComponentIndex(root=str(tmp_path / 'index')), **options)
+    builder.build_project_from_llm_response(RESPONSE, tmp_path / 'project')
+    return builder
+
+
+def test_builds_are_not_copied_into_the_store_by_default(tmp_path):
+    builder = build(tmp_path)
+
+    assert builder.last_snapshot is None
+    assert builder.artifact_store.stats()['snapshots'] == 0
+
+
+def test_snapshots_are_opt_in(tmp_path):
+    builder = build(tmp_path, snapshots=True)
+
+    assert builder.last_snapshot['file_count'] > 0
+    assert builder.artifact_store.read_text(builder.last_snapshot['name'], '.llm/response.txt') == RESPONSE
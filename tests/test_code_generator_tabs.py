@@ -0,0 +1,125 @@
+import pytest
+
+pytest.importorskip('selenium')
+from selenium.common.exceptions import NoSuchWindowException
+
+from core import code_generator as code_generator_module
+from core.code_generator import CodeGenerator
+
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        if handle not in self.driver.window_handles:
+            raise NoSuchWindowException(handle)
+        self.driver.current = handle
+
+
+class FakeDriver:
+    """Just enough of a WebDriver to track tabs"""
+
+    def __init__(self):
+        self.window_handles = ['main']
+        self.current = 'main'
+        self.switch_to = FakeSwitch(self)
+        self._next = 0
+
+    @property
+    def current_window_handle(self):
+        if self.current not in self.window_handles:
+            raise NoSuchWindowException(self.current)
+        return self.current
+
+    def execute_script(self, script, *args):
+        if 'window.open' in script:
+            self._next += 1
+            self.window_handles.append(f"tab{self._next}")
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+
+class FakeBrave:
+    def __init__(self):
+        self.driver = FakeDriver()
+
+    def open_background_tab(self, url):
+        existing = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+        return [h for h in self.driver.window_handles if h not in existing][-1]
+
+    def switch_to_tab(self, handle, wait_for_load=True):
+        try:
+            self.driver.switch_to.window(handle)
+            return True
+        except NoSuchWindowException:
+            return False
+
+
+class FakeLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def make_generator(tmp_path, **generation):
+    config = {
+        'urls': {'perplexity': 'https://www.perplexity.ai'},
+        'archive': {'directory': str(tmp_path / 'archive')},
+        'generation': dict({'race_providers': [], 'shards': 0}, **generation),
+        'scheduler': {}
+    }
+    return CodeGenerator(FakeBrave(), config, FakeLogger())
+
+
+class RecordingParallelMode:
+    """Stands in for ShardedGenerator / ProviderRace: uses the current tab like they do"""
+    seen = []
+
+    def __init__(self, brave, *args, **kwargs):
+        self.brave = brave
+
+    def _touch(self):
+        RecordingParallelMode.seen.append(self.brave.driver.current_window_handle)
+        self.brave.open_background_tab('https://example.invalid')
+
+    def generate(self, user_prompt):
+        self._touch()
+        return None
+
+    def run(self, prompt, timeout=None):
+        self._touch()
+        return None, None
+
+
+@pytest.fixture
+def parallel_mode(monkeypatch):
+    RecordingParallelMode.seen = []
+    monkeypatch.setattr(code_generator_module, 'ShardedGenerator', RecordingParallelMode)
+    monkeypatch.setattr(code_generator_module, 'ProviderRace', RecordingParallelMode)
+    monkeypatch.setattr(code_generator_module, 'load_providers',
+                        lambda config, names: {name: type('P', (), {'url': ''})() for name in names})
+    return RecordingParallelMode
+
+
+def test_warm_up_then_shard_leaves_driver_on_a_live_tab(tmp_path, parallel_mode):
+    generator = make_generator(tmp_path, shards=3)
+    assert generator.warm_up()
+
+    generator.generate_code('a landing page')
+
+    assert parallel_mode.seen == ['main']
+    assert generator.prepared_tab is None
+    assert 'tab1' not in generator.brave.driver.window_handles
+
+
+def test_warm_up_then_race_leaves_driver_on_a_live_tab(tmp_path, parallel_mode):
+    generator = make_generator(tmp_path, race_providers=['perplexity', 'chatgpt'])
+    generator.warm_up()
+    # prepare_input-style excursion that ends on the warm-up tab
+    generator.brave.switch_to_tab(generator.prepared_tab)
+
+    generator.generate_code('a landing page')
+
+    assert parallel_mode.seen == ['main']
@@ -0,0 +1,130 @@
+from tools.component_checks import check_component, continuation_code, is_truncated, stitch, validate_component
+
+TRUNCATED = """export default function Header() {
+  return (
+    <header className="p-4">
+      <nav>
+        <a href="/">Home</a>"""
+
+
+def test_truncated_component_is_detected():
+    assert is_truncated(TRUNCATED, 'src/components/Header.jsx')
+    assert not is_truncated("export default function A() {\n  return <div />;\n}\n", 'src/A.jsx')
+
+
+def test_missing_export_alone_is_not_truncation():
+    assert not is_truncated("function A() {\n  return <div />;\n}\n", 'src/A.jsx')
+
+
+def test_continuation_code_drops_header_fences_and_next_component():
+    answer = ("// File: src/components/Header.jsx\n```jsx\n        <a href=\"/\">Home</a>\n      </nav>\n```\n"
+              "// Component: Footer\n// File: src/components/Footer.jsx\n")
+
+    assert continuation_code(answer, 'src/components/Header.jsx') == '        <a href="/">Home</a>\n      </nav>'
+
+
+def test_stitch_keeps_overlapping_lines_once():
+    continuation = """      <nav>
+        <a href="/">Home</a>
+      </nav>
+    </header>
+  );
+}"""
+
+    stitched = stitch(TRUNCATED, continuation)
+
+    assert stitched.count('<nav>') == 1
+    assert stitched.count('Home</a>') == 1
+    assert not is_truncated(stitched, 'src/components/Header.jsx')
+
+
+def test_stitch_replaces_a_repeated_partial_line():
+    code = "export default function A() {\n  return <div>Hel"
+
+    assert stitch(code, "  return <div>Hello</div>;\n}") == "export default function A() {\n  return <div>Hello</div>;\n}"
+
+
+def test_stitch_takes_a_full_restart_as_is():
+    restart = TRUNCATED + "\n      </nav>\n    </header>\n  );\n}"
+
+    assert stitch(TRUNCATED, restart) == restart
+
+
+def test_stitch_appends_when_nothing_overlaps():
+    assert stitch("const a = [\n  1,", "  2,\n];") == "const a = [\n  1,\n  2,\n];"
+    assert stitch(TRUNCATED, "   \n") == TRUNCATED
+
+
+def test_valid_component_passes_untouched():
+    code = "export default function A() {\n  return <div title=\"a (b\">{'}'}</div>; // closes (\n}\n"
+
+    assert validate_component(code, 'src/A.jsx') == {'code': code, 'repairs': [], 'problems': []}
+
+
+def test_brackets_in_strings_comments_and_urls_are_ignored():
+    code = ("// closes } here\nconst url = 'https://example.com/(x';\n/* { */\n"
+            "const t = `${'{'}`;\nexport default function A() {\n  return null;\n}\n")
+
+    assert check_component(code, 'src/A.js') == []
+
+
+def test_stray_fence_and_trailing_prose_are_removed():
+    code = ("```jsx\nexport default function A() {\n  return <div />;\n}\n```\n\n"
+            "This component renders an empty div for the page.\n")
+
+    result = validate_component(code, 'src/A.jsx')
+
+    assert result['code'] == "export default function A() {\n  return <div />;\n}"
+    assert result['problems'] == []
+    assert 'removed stray code fence' in result['repairs']
+    assert 'removed 1 trailing prose line(s)' in result['repairs']
+
+
+def test_jsx_text_after_a_blank_line_is_kept():
+    code = "export default function A() {\n  return (\n    <p>\n\nWelcome to our shop today\n    </p>\n  );\n}\n"
+
+    assert validate_component(code, 'src/A.jsx')['code'] == code
+
+
+def test_open_brackets_are_reported_not_closed():
+    code = "export default function A() {\n  const items = [1, 2];\n  return items.map(n => n * 2);"
+
+    result = validate_component(code, 'src/A.js')
+
+    assert result == {'code': code, 'repairs': [], 'problems': ['1 unclosed bracket(s): {']}
+
+
+def test_nested_template_literals_pass_untouched():
+    code = "const t = `a ${x ? `{` : 1} b`;\nconst u = `${`${'}'}`}`;\nexport default t;\n"
+
+    assert validate_component(code, 'src/t.js') == {'code': code, 'repairs': [], 'problems': []}
+    assert not is_truncated(code, 'src/t.js')
+    assert is_truncated("const t = `a ${x ? `{` : 1} b;\nexport default t;\n", 'src/t.js')
+
+
+def test_brackets_in_regex_literals_are_ignored():
+    code = ("const open = /[{(]/g;\nconst parts = s.split(/\\)/);\nconst half = (a) / 2 / (b);\n"
+            "export default function A() {\n  return open.test(x) ? <a href=\"/\">{half}</a> : <br />;\n}\n")
+
+    assert check_component(code, 'src/A.jsx') == []
+
+
+def test_missing_export_default_is_added_for_the_file_component():
+    result = validate_component("function Hero() {\n  return <section />;\n}\n", 'src/components/Hero.jsx')
+
+    assert result['repairs'] == ['added export default Hero']
+    assert result['code'].endswith("export default Hero;\n")
+
+
+def test_ambiguous_breakage_is_reported_not_repaired():
+    code = "export default function A() {\n  return (\n    <div>\n      <span>Hi</span>\n  );\n}\n"
+
+    result = validate_component(code, 'src/A.jsx')
+
+    assert result['code'] == code
+    assert result['problems'] == ['unclosed JSX element(s): <div>']
+    assert check_component("const a = (1];\nexport default a;\n", 'src/a.js')
+
+
+def test_non_script_files_are_not_checked():
+    assert validate_component("body { color: red;", 'src/index.css')['problems'] == []
@@ -0,0 +1,119 @@
+import os
+import stat
+import threading
+
+import pytest
+
+from utils.component_index import ComponentIndex, content_hash
+
+HEADER = "export default function Header() {\r\n  return <header>Site</header>;   \r\n}\r\n"
+
+
+def test_pool_keeps_the_original_bytes(tmp_path):
+    index = ComponentIndex(root=str(tmp_path / 'index'))
+
+    record, reused = index.add('Header', HEADER, 'src/components/Header.jsx')
+
+    assert not reused
+    assert record['hash'] == content_hash(HEADER)
+    with open(record['pool_path'], 'rb') as f:
+        assert f.read() == HEADER.encode('utf-8')
+    assert record['size'] == len(HEADER.encode('utf-8'))
+
+
+def test_whitespace_variants_share_one_pool_entry(tmp_path):
+    index = ComponentIndex(root=str(tmp_path / 'index'))
+    first, _ = index.add('Header', HEADER)
+
+    second, reused = index.add('Header', HEADER.replace('\r\n', '\n').replace('   \n', '\n'))
+
+    assert reused
+    assert second['pool_path'] == first['pool_path']
+
+
+def test_projects_get_a_writable_copy_by_default(tmp_path):
+    index = ComponentIndex(root=str(tmp_path / 'index'))
+    destination = tmp_path / 'project' / 'src' / 'Header.jsx'
+
+    record, _ = index.link_component(tmp_path / 'project', 'Header', 'src/Header.jsx', destination, HEADER)
+
+    assert not os.path.samefile(destination, record['pool_path'])
+    assert destination.read_bytes() == HEADER.encode('utf-8')
+    destination.write_text('edited', encoding='utf-8')
+    with open(record['pool_path'], 'rb') as f:
+        assert f.read() == HEADER.encode('utf-8')
+
+
+def test_hardlink_mode_replaces_linked_files_without_touching_the_pool(tmp_path):
+    index = ComponentIndex(root=str(tmp_path / 'index'), link_mode='hardlink')
+    destination = tmp_path / 'project' / 'src' / 'Header.jsx'
+    record, _ = index.link_component(tmp_path / 'project', 'Header', 'src/Header.jsx', destination, HEADER)
+    assert os.path.samefile(destination, record['pool_path'])
+
+    index.link_component(tmp_path / 'project', 'Header', 'src/Header.jsx', destination, HEADER + '// v2\n')
+
+    assert stat.S_IMODE(os.stat(record['pool_path']).st_mode) & 0o222 == 0
+    with open(record['pool_path'], 'rb') as f:
+        assert f.read() == HEADER.encode('utf-8')
+
+
+def test_unknown_link_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ComponentIndex(root=str(tmp_path / 'index'), link_mode='symlink')
+
+
+def test_lookups_and_links_from_many_threads(tmp_path):
+    index = ComponentIndex(root=str(tmp_path / 'index'))
+    errors = []
+
+    def writer(worker):
+        try:
+            for n in range(30):
+                code = HEADER.replace('Site', f'Site {worker}-{n}')
+                destination = tmp_path / f'project{worker}' / f'Header{n}.jsx'
+                record, _ = index.link_component(f'project{worker}', 'Header', f'Header{n}.jsx', destination, code)
+                assert index.lookup(code)['hash'] == record['hash']
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(100):
+                index.find('Header')
+                index.find('Header', 'Header()')
+                index.projects_using('Header')
+                index.stats()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)] + \
+              [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert index.stats()['unique_components'] == index.stats()['usages'] == 120
+    assert len(index.projects_using(hash=content_hash(HEADER.replace('Site', 'Site 0-0')))) == 1
+
+
+@pytest.mark.parametrize('read', [
+    lambda index: index.lookup(HEADER),
+    lambda index: index.find('Header'),
+    lambda index: index.projects_using('Header'),
+    lambda index: index.stats(),
+], ids=['lookup', 'find', 'projects_using', 'stats'])
+def test_reads_wait_for_the_lock(tmp_path, read):
+    index = ComponentIndex(root=str(tmp_path / 'index'))
+    index.add('Header', HEADER)
+    results = []
+
+    with index._lock:
+        thread = threading.Thread(target=lambda: results.append(read(index)))
+        thread.start()
+        thread.join(0.2)
+        assert results == []
+    thread.join()
+
+    assert len(results) == 1
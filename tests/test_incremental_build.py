@@ -0,0 +1,88 @@
+import json
+import os
+
+from tools.phase2_complete_project_builder import CompleteProjectBuilder
+from utils.component_index import ComponentIndex
+
+HEADER = """export default function Header() {
+  return <header className="p-4">PowerGym</header>;
+}"""
+
+HERO = """export default function Hero() {
+  return <section className="py-20">Train harder</section>;
+}"""
+
+
+def response(hero=HERO):
+    return (f"// Component: Header\n// File: src/components/Header.jsx\n{HEADER}\n\n"
+            f"// Component: Hero\n// File: src/components/Hero.jsx\n{hero}\n")
+
+
+def build(tmp_path, content, incremental=False):
+    builder = CompleteProjectBuilder(component_index=ComponentIndex(root=str(tmp_path / 'index')))
+    builder.build_project_from_llm_response(content, tmp_path / 'project', incremental=incremental)
+    return builder
+
+
+def mtimes(project_dir):
+    return {path: os.stat(project_dir / path).st_mtime_ns
+            for path in ('src/components/Header.jsx', 'src/components/Hero.jsx', 'package.json')}
+
+
+def test_rebuild_skips_unchanged_files_and_rewrites_changed_ones(tmp_path):
+    project_dir = tmp_path / 'project'
+    build(tmp_path, response())
+    before = mtimes(project_dir)
+    (project_dir / 'node_modules' / 'react').mkdir(parents=True)
+    (project_dir / 'node_modules' / 'react' / 'index.js').write_text('cached', encoding='utf-8')
+
+    builder = build(tmp_path, response(HERO.replace('Train harder', 'Train smarter')), incremental=True)
+
+    after = mtimes(project_dir)
+    assert after['src/components/Header.jsx'] == before['src/components/Header.jsx']
+    assert after['package.json'] == before['package.json']
+    assert after['src/components/Hero.jsx'] != before['src/components/Hero.jsx']
+    assert 'Train smarter' in (project_dir / 'src/components/Hero.jsx').read_text(encoding='utf-8')
+    assert builder.build_changes['changed'] == ['src/components/Hero.jsx']
+    assert 'src/components/Header.jsx' in builder.build_changes['unchanged']
+    assert (project_dir / 'node_modules' / 'react' / 'index.js').read_text(encoding='utf-8') == 'cached'
+
+
+def test_file_edited_since_the_last_build_is_rewritten(tmp_path):
+    project_dir = tmp_path / 'project'
+    build(tmp_path, response())
+    (project_dir / 'src/components/Header.jsx').write_text('// edited by hand\n', encoding='utf-8')
+
+    builder = build(tmp_path, response(), incremental=True)
+
+    assert builder.build_changes['changed'] == ['src/components/Header.jsx']
+    assert (project_dir / 'src/components/Header.jsx').read_text(encoding='utf-8').startswith('export default')
+
+
+def test_full_rebuild_replaces_the_directory(tmp_path):
+    project_dir = tmp_path / 'project'
+    build(tmp_path, response())
+    (project_dir / 'node_modules').mkdir()
+
+    builder = build(tmp_path, response())
+
+    assert not (project_dir / 'node_modules').exists()
+    assert builder.build_changes['unchanged'] == []
+
+
+def test_manifest_round_trips_between_builds(tmp_path):
+    project_dir = tmp_path / 'project'
+    first = build(tmp_path, response())
+    manifest = first.load_manifest(project_dir)
+    assert manifest['manifest_version'] == 2
+    assert manifest['build_mode'] == 'full'
+
+    second = build(tmp_path, response(), incremental=True)
+
+    assert second.previous_files == manifest['files']
+    rebuilt = json.loads((project_dir / 'project_summary.json').read_text(encoding='utf-8'))
+    assert rebuilt['build_mode'] == 'incremental'
+    assert rebuilt['changes']['changed'] == rebuilt['changes']['added'] == []
+    for path, entry in manifest['files'].items():
+        assert {key: value for key, value in rebuilt['files'][path].items() if key != 'write_ms'} == \
+               {key: value for key, value in entry.items() if key != 'write_ms'}, path
@@ -0,0 +1,64 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from job_service import JobQueue, JobService, parse_job_request
+
+
+@pytest.mark.parametrize('payload, message', [
+    ([], 'body must be a JSON object'),
+    ('x', 'body must be a JSON object'),
+    ({'prompt': 42}, 'prompt must be a string'),
+    ({'prompt': ['a landing page']}, 'prompt must be a string'),
+    ({'prompt': 'short'}, 'prompt must be at least 10 characters'),
+    ({'prompt': 'a landing page', 'priority': 'high'}, 'priority must be an integer'),
+    ({'prompt': 'a landing page', 'priority': None}, 'priority must be an integer'),
+    ({'prompt': 'a landing page', 'enhance': 'yes'}, 'enhance must be true or false'),
+])
+def test_parse_job_request_rejects_bad_input(payload, message):
+    with pytest.raises(ValueError, match=message):
+        parse_job_request(payload)
+
+
+def test_parse_job_request_coerces_priority():
+    assert parse_job_request({'prompt': '  a landing page ', 'priority': '2'}) == ('a landing page', False, 2)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = JobService({'scheduler': {}}, db_path=str(tmp_path / 'jobs.sqlite3'), port=0, workers=0)
+    thread = threading.Thread(target=service.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service
+    service.httpd.shutdown()
+    service.shutdown()
+
+
+def post(service, body):
+    host, port = service.httpd.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    connection.request('POST', '/jobs', body=body, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@pytest.mark.parametrize('body', ['[]', '"x"', '{"prompt": 5}', '{"prompt": "a landing page", "priority": "x"}',
+                                  'not json'])
+def test_bad_job_requests_get_400(service, body):
+    status, payload = post(service, body)
+    assert status == 400
+    assert 'error' in payload
+
+
+def test_valid_job_request_is_queued(service):
+    status, job = post(service, json.dumps({'prompt': 'a landing page for a gym', 'priority': 1}))
+    assert status == 201
+    assert job['status'] == 'queued'
+    assert job['priority'] == 1
+
+
+def test_more_than_one_worker_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='workers=2'):
+        JobService({'scheduler': {}}, db_path=str(tmp_path / 'jobs.sqlite3'), port=0, workers=2)
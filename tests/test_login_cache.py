@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip('selenium')
+
+from core.code_generator import CodeGenerator
+
+
+class ProbeDriver:
+    session_id = 'session'
+
+    def __init__(self, probe):
+        self.probe = probe
+        self.probes = 0
+
+    def get_cookies(self):
+        return []
+
+    def execute_script(self, script, *args):
+        self.probes += 1
+        return dict(self.probe)
+
+
+class FakeBrave:
+    def __init__(self, probe):
+        self.driver = ProbeDriver(probe)
+        self.state = {}
+
+    def get_session_state(self, key, ttl):
+        return self.state.get(key)
+
+    def set_session_state(self, key, value):
+        self.state[key] = value
+
+
+class FakeLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def make_generator(tmp_path, probe):
+    config = {
+        'urls': {'perplexity': 'https://www.perplexity.ai'},
+        'archive': {'directory': str(tmp_path / 'archive')},
+        'generation': {'race_providers': [], 'shards': 0},
+        'scheduler': {}
+    }
+    return CodeGenerator(FakeBrave(probe), config, FakeLogger())
+
+
+def test_logged_out_result_is_probed_again(tmp_path):
+    generator = make_generator(tmp_path, {'limit_text': True})
+    assert generator._comprehensive_login_check() == (False, False)
+
+    generator.brave.driver.probe = {'user_selector': True, 'limit_text': True}
+
+    assert generator._comprehensive_login_check() == (True, False)
+    assert generator.brave.driver.probes == 2
+
+
+def test_cached_login_does_not_replay_the_remaining_count(tmp_path):
+    generator = make_generator(tmp_path, {'user_selector': True, 'limit_text': True, 'remaining': 3})
+    generator._comprehensive_login_check()
+    assert generator.quota_remaining == 3
+
+    assert generator._comprehensive_login_check() == (True, False)
+
+    assert generator.brave.driver.probes == 1
+    assert generator.quota_remaining is None
+    assert 'remaining' not in generator.brave.state[('login', generator.site)]
+
+
+def test_quota_is_read_again_after_the_answer(tmp_path):
+    generator = make_generator(tmp_path, {'user_selector': True, 'remaining': 3})
+    generator._comprehensive_login_check()
+
+    generator.brave.driver.probe = {'user_selector': True, 'remaining': 2}
+
+    assert generator._read_quota_remaining() == 2
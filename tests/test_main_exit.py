@@ -0,0 +1,26 @@
+import json
+import sys
+
+import pytest
+
+import main
+from utils import logger as logger_module
+
+
+def test_error_exit_flushes_queued_log_records(tmp_path, monkeypatch):
+    logger_module.shutdown_logging()  # start a pipeline that writes to tmp_path
+    log = logger_module.setup_logger(log_dir=str(tmp_path), console_level=logger_module.logging.CRITICAL)
+
+    def failing_build(response_file, incremental=False):
+        log.error("build failed for %s", response_file)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(main, 'build_only', failing_build)
+    monkeypatch.setattr(sys, 'argv', ['main.py', '--build-only', 'answer.txt'])
+
+    with pytest.raises(SystemExit):
+        main.main()
+
+    assert logger_module._listener is None
+    records = [json.loads(line) for line in (tmp_path / 'generator.log').read_text().splitlines()]
+    assert records[-1]['message'] == "build failed for answer.txt"
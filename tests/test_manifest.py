@@ -0,0 +1,42 @@
+import hashlib
+import json
+
+from tools.phase2_complete_project_builder import CompleteProjectBuilder
+from utils.component_index import ComponentIndex
+
+HEADER = """export default function Header() {
+  return <header className="p-4">PowerGym</header>;
+}"""
+
+RESPONSE = f"""// Component: Header
+// File: src/components/Header.jsx
+{HEADER}
+"""
+
+
+def test_manifest_hashes_are_sha256_of_the_bytes_on_disk(tmp_path):
+    index = ComponentIndex(root=str(tmp_path / 'index'))
+    # An earlier project stored a whitespace variant; this build gets the pool's bytes
+    index.add('Header', HEADER.replace('\n', '\r\n') + '\r\n', 'src/components/Header.jsx')
+    project_dir = tmp_path / 'project'
+
+    CompleteProjectBuilder(component_index=index).build_project_from_llm_response(RESPONSE, project_dir)
+
+    manifest = json.loads((project_dir / 'project_summary.json').read_text(encoding='utf-8'))
+    for path, entry in manifest['files'].items():
+        data = (project_dir / path).read_bytes()
+        assert entry['hash'] == hashlib.sha256(data).hexdigest(), path
+        assert entry['bytes'] == len(data), path
+    header = manifest['components']['Header']
+    assert header['hash'] == manifest['files']['src/components/Header.jsx']['hash']
+    assert b'\r\n' in (project_dir / 'src/components/Header.jsx').read_bytes()
+
+
+def test_parse_time_is_recorded_once_per_build(tmp_path):
+    project_dir = tmp_path / 'project'
+    builder = CompleteProjectBuilder(component_index=ComponentIndex(root=str(tmp_path / 'index')))
+    builder.build_project_from_llm_response(RESPONSE, project_dir)
+
+    manifest = json.loads((project_dir / 'project_summary.json').read_text(encoding='utf-8'))
+    assert manifest['timings']['parse_ms_total'] >= 0
+    assert all('parse_ms' not in component for component in manifest['components'].values())
@@ -0,0 +1,58 @@
+import json
+
+from utils.metrics import Histogram, MetricsRegistry
+
+
+def bucket_lines(histogram):
+    return [line for line in histogram.render() if '_bucket' in line]
+
+
+def test_observations_on_a_bound_fall_in_that_bucket():
+    histogram = Histogram('t_seconds', 'test', buckets=(1, 5))
+    for value in (0.5, 1, 1.01, 5, 7):
+        histogram.observe(value)
+
+    assert bucket_lines(histogram) == [
+        't_seconds_bucket{le="1.0"} 2',
+        't_seconds_bucket{le="5.0"} 4',
+        't_seconds_bucket{le="+Inf"} 5',
+    ]
+    assert 't_seconds_sum 14.51' in histogram.render()
+    assert 't_seconds_count 5' in histogram.render()
+
+
+def test_quantiles_use_the_nearest_rank():
+    histogram = Histogram('t_seconds', 'test', ['stage'])
+    for value in range(100, 0, -1):
+        histogram.observe(value, stage='submit')
+    histogram.observe(3, stage='other')
+
+    assert histogram.quantiles(stage='submit') == {'p50': 50, 'p95': 95, 'p99': 99}
+    assert histogram.quantiles(stage='other') == {'p50': 3, 'p95': 3, 'p99': 3}
+    assert histogram.quantiles(stage='missing') == {}
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter('t_total', 'test', ['site', 'group'])
+    counter.inc(site='a"b', group='c\\d\ne')
+
+    assert 't_total{site="a\\"b",group="c\\\\d\\ne"} 1' in registry.render_prometheus().split('\n')
+
+
+def test_dump_writes_prometheus_text_and_json(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter('t_total', 'test', ['status']).inc(2, status='done')
+    registry.histogram('t_seconds', 'test', buckets=(1,)).observe(0.5)
+
+    prom_path, json_path = registry.dump(tmp_path / 'metrics', prefix='batch')
+
+    assert prom_path.endswith('.prom') and json_path.endswith('.json')
+    with open(prom_path, encoding='utf-8') as f:
+        prom = f.read()
+    assert '# TYPE t_seconds histogram' in prom
+    assert 't_total{status="done"} 2' in prom
+    with open(json_path, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    assert snapshot['metrics']['t_total'] == {'done': 2}
+    assert snapshot['metrics']['t_seconds']['total'] == {'count': 1, 'sum': 0.5, 'p50': 0.5, 'p95': 0.5, 'p99': 0.5}
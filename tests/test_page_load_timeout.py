@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip('selenium')
+from selenium.common.exceptions import TimeoutException
+
+from core import brave_controller as brave_controller_module
+from core.brave_controller import BraveController
+
+
+class FakeSwitch:
+    def window(self, handle):
+        pass
+
+
+class FakeDriver:
+    window_handles = ['main', 'tab1']
+    switch_to = FakeSwitch()
+
+    def execute_script(self, script, *args):
+        return None
+
+    def get(self, url):
+        pass
+
+
+class FakeLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def make_controller(tmp_path, load_completes):
+    config = {'browser': {'debug_port': 9222}, 'timeouts': {'page_load': 20},
+              'selector_cache': {'path': str(tmp_path / 'selectors.json')}}
+    controller = BraveController(config, FakeLogger())
+    controller.driver = FakeDriver()
+    # p99 of earlier loads says this site usually loads within 5s
+    controller.adaptive_deadline = lambda *args, **kwargs: 5
+    controller.recorded = []
+    controller.record_stage = lambda *args, **kwargs: controller.recorded.append((args, kwargs))
+    waits = []
+
+    class FakeWait:
+        def __init__(self, driver, timeout):
+            waits.append(timeout)
+
+        def until(self, condition):
+            if not load_completes:
+                raise TimeoutException('page did not load')
+            return True
+
+    return controller, waits, FakeWait
+
+
+def test_navigation_waits_for_the_static_page_load_timeout(tmp_path, monkeypatch):
+    controller, waits, fake_wait = make_controller(tmp_path, load_completes=True)
+    monkeypatch.setattr(brave_controller_module, 'WebDriverWait', fake_wait)
+
+    assert controller.open_new_tab('https://www.perplexity.ai')
+
+    assert waits == [20]
+    assert controller.recorded[0][1] == {}
+
+
+def test_navigation_timeout_is_recorded(tmp_path, monkeypatch):
+    controller, waits, fake_wait = make_controller(tmp_path, load_completes=False)
+    monkeypatch.setattr(brave_controller_module, 'WebDriverWait', fake_wait)
+
+    assert not controller.open_new_tab('https://www.perplexity.ai')
+
+    (site, stage, _seconds), kwargs = controller.recorded[0]
+    assert (site, stage, kwargs) == ('www.perplexity.ai', 'page_load', {'outcome': 'timeout'})
@@ -0,0 +1,99 @@
+import pytest
+
+from tools.phase2_complete_project_builder import parse_code_components
+
+
+def legacy_parse(content, min_length=50):
+    """The line-by-line parser parse_code_components replaced, kept as the reference"""
+    lines = content.split('\n')
+    components = []
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if line.startswith('// Component:'):
+            component_name = line.replace('// Component:', '').strip()
+            if i + 1 < len(lines) and lines[i + 1].strip().startswith('// File:'):
+                file_path = lines[i + 1].strip().replace('// File:', '').strip()
+                code_lines = []
+                j = i + 2
+                while j < len(lines):
+                    if lines[j].strip().startswith('// Component:'):
+                        break
+                    code_lines.append(lines[j].rstrip())
+                    j += 1
+                code = '\n'.join(code_lines).strip()
+                for lang in ['jsx', 'javascript', 'js', 'typescript', 'ts', 'tsx', 'bash', 'json']:
+                    if code.startswith(f'{lang}\n'):
+                        code = code[len(lang) + 1:]
+                        break
+                if code.startswith('```'):
+                    code = '\n'.join(code.split('\n')[1:])
+                if code.endswith('```'):
+                    code = '\n'.join(code.split('\n')[:-1])
+                code = code.strip()
+                if len(code) > min_length:
+                    components.append({'name': component_name, 'file_path': file_path, 'code': code})
+                i = j - 1
+        i += 1
+    return components
+
+
+HEADER = """export default function Header() {
+  return (
+    <header className="bg-white shadow">
+      <a href="https://example.com/docs">Docs</a>
+    </header>
+  );
+}"""
+
+HERO = """import React from 'react';
+
+const Hero = ({ title }) => {
+  return <section className="py-20">{title}</section>;
+};
+
+export default Hero;"""
+
+RESPONSES = {
+    'plain': f"// Component: Header\n// File: src/components/Header.jsx\n{HEADER}\n\n"
+             f"// Component: Hero\n// File: src/components/Hero.jsx\n{HERO}\n",
+    'fenced': f"Here is your site.\n\n// Component: Header\n// File: src/components/Header.jsx\n```jsx\n{HEADER}\n```\n\n"
+              f"// Component: Hero\n// File: src/components/Hero.jsx\n```\n{HERO}\n```\n\nEnjoy!",
+    'language tag': f"// Component: Hero\n// File: src/components/Hero.jsx\njsx\n{HERO}\n",
+    'crlf and indented headers': (f"  // Component: Header  \r\n\t// File: src/components/Header.jsx \r\n{HEADER}\r\n"
+                                  f"// Component: Hero\r\n// File: src/components/Hero.jsx\r\n{HERO}\r\n"),
+    'trailing whitespace': f"// Component: Hero\n// File: src/components/Hero.jsx\n"
+                           + '\n'.join(line + '   ' for line in HERO.split('\n')) + '\n',
+    'missing file line': f"// Component: Header\n{HEADER}\n// Component: Hero\n// File: src/components/Hero.jsx\n{HERO}",
+    'short block': f"// Component: Tiny\n// File: src/Tiny.jsx\nexport default 1;\n"
+                   f"// Component: Hero\n// File: src/components/Hero.jsx\n{HERO}",
+    'header inside code': f"// Component: Hero\n// File: src/components/Hero.jsx\n{HERO}\n"
+                          "const note = '// Component: not a header';\n",
+    'no components': "Sorry, I can't help with that.",
+}
+
+
+@pytest.mark.parametrize('name', sorted(RESPONSES))
+def test_parse_matches_the_line_by_line_parser(name):
+    content = RESPONSES[name]
+    parsed = [{key: component[key] for key in ('name', 'file_path', 'code')}
+              for component in parse_code_components(content)]
+
+    assert parsed == legacy_parse(content)
+
+
+def test_short_blocks_are_reported_as_rejected():
+    rejected = []
+
+    parse_code_components(RESPONSES['short block'], rejected=rejected)
+
+    assert rejected == [{'name': 'Tiny', 'file_path': 'src/Tiny.jsx', 'reason': 'only 17 characters of code'}]
+
+
+def test_repeated_imports_are_the_one_intended_difference():
+    content = f"// Component: Hero\n// File: src/components/Hero.jsx\nimport React from 'react';\n{HERO}\n"
+
+    (component,) = parse_code_components(content)
+
+    assert legacy_parse(content)[0]['code'].count("import React from 'react';") == 2
+    assert component['code'] == HERO
@@ -0,0 +1,50 @@
+import os
+import stat
+
+from tools.phase2_complete_project_builder import CompleteProjectBuilder
+from utils.component_index import ComponentIndex
+
+HEADER = "export default function Header() {\n  return <header>Header</header>;\n}\n"
+
+
+def read_only(path):
+    return not os.stat(path).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+def link_into_project(tmp_path, project_dir):
+    index = ComponentIndex(root=str(tmp_path / 'index'), link_mode='hardlink')
+    destination = project_dir / 'src/components/Header.jsx'
+    record, _ = index.link_component(project_dir, 'Header', 'src/components/Header.jsx', destination, HEADER)
+    return index, destination, record['pool_path']
+
+
+def test_remove_orphaned_files_leaves_linked_pool_file_read_only(tmp_path):
+    project_dir = tmp_path / 'project'
+    index, destination, pool_path = link_into_project(tmp_path, project_dir)
+    if os.stat(pool_path).st_nlink < 2:
+        return  # filesystem without hard links: nothing shared to protect
+    assert read_only(pool_path)
+
+    builder = CompleteProjectBuilder(component_index=index)
+    builder.previous_files = {'src/components/Header.jsx': {'hash': 'x', 'bytes': 1}}
+    builder.remove_orphaned_files(project_dir)
+
+    assert not destination.exists()
+    assert not (project_dir / 'src').exists()
+    assert read_only(pool_path)
+    assert os.stat(pool_path).st_nlink == 1
+    with open(pool_path, encoding='utf-8') as f:
+        assert f.read() == HEADER
+
+
+def test_overwriting_a_linked_file_replaces_it_instead_of_writing_through(tmp_path):
+    project_dir = tmp_path / 'project'
+    index, destination, pool_path = link_into_project(tmp_path, project_dir)
+
+    builder = CompleteProjectBuilder(component_index=index)
+    builder._write_project_file(project_dir, 'src/components/Header.jsx', 'changed\n')
+
+    assert destination.read_text(encoding='utf-8') == 'changed\n'
+    with open(pool_path, encoding='utf-8') as f:
+        assert f.read() == HEADER
+    assert read_only(pool_path)
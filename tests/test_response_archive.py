@@ -0,0 +1,47 @@
+import threading
+
+from utils.response_archive import ResponseArchive
+
+
+def test_read_follows_a_capture_moved_by_compaction(tmp_path):
+    archive = ResponseArchive(root=str(tmp_path), segment_max_bytes=1)
+    old = archive.add('first answer', prompt='a landing page')
+    archive.add('second answer')  # seals the first segment
+
+    assert archive.compact(older_than_days=0) == 1
+    assert archive.read(old) == 'first answer'
+    assert archive.get(old['id'])['compressed']
+
+
+def test_reads_and_writes_from_many_threads(tmp_path):
+    archive = ResponseArchive(root=str(tmp_path), segment_max_bytes=256, compact_after_days=0)
+    errors = []
+
+    def writer(worker):
+        try:
+            for index in range(40):
+                record = archive.add(f"answer {worker}-{index} " * 5, job_id=f"job-{worker}")
+                assert archive.read(record['id']).startswith(f"answer {worker}-{index}")
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(200):
+                for record in archive.by_date(0, limit=20):
+                    archive.read(record)
+                archive.latest()
+                archive.count()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)] + \
+              [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert archive.count() == 160
+    assert len(archive.by_job('job-2')) == 40
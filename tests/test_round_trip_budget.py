@@ -0,0 +1,91 @@
+from contextlib import nullcontext
+
+import pytest
+
+from core.provider_race import ProviderRace
+from utils.webdriver_profiler import RoundTripBudgetExceeded, WebDriverProfiler
+
+
+class ChattyDriver:
+    """Every execute_script costs two round trips"""
+
+    window_handles = ['main']
+    current_window_handle = 'main'
+
+    def execute(self, command, params=None):
+        return {'value': None}
+
+    def execute_script(self, script, *args):
+        self.execute('executeScript')
+        self.execute('executeScript')
+        return {'generating': True, 'text': 'partial'}
+
+
+class FakeBrave:
+    def __init__(self, budgets):
+        self.driver = ChattyDriver()
+        self.profiler = WebDriverProfiler(self.driver, budgets=budgets, budget_mode='fail').install()
+
+    def round_trip_budget(self, name):
+        return self.profiler.budget(name) if self.profiler else nullcontext()
+
+    def open_background_tab(self, url):
+        return 'tab'
+
+    def switch_to_tab(self, handle, wait_for_load=True):
+        return True
+
+    def adaptive_deadline(self, *args, **kwargs):
+        return 5
+
+    def new_poll(self, interval):
+        return type('Poll', (), {'sleep': lambda self, changed: None})()
+
+
+class FakeProvider:
+    name = 'fake'
+    url = 'https://example.invalid'
+
+    def find_input(self, brave):
+        return object()
+
+    def submit(self, brave, element, prompt):
+        return True
+
+    def poll(self, brave):
+        return brave.driver.execute_script('poll')
+
+    def cancel(self, brave):
+        return False
+
+
+class FakeLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def test_race_poll_budget_violation_propagates():
+    race = ProviderRace(FakeBrave({'race_poll': 1}), {'timeouts': {'response_wait': 1}}, FakeLogger(),
+                        [FakeProvider()])
+
+    with pytest.raises(RoundTripBudgetExceeded):
+        race.run('a landing page')
+
+
+def test_generation_probe_budget_violation_propagates(tmp_path):
+    pytest.importorskip('selenium')
+    from core.code_generator import CodeGenerator
+
+    config = {
+        'urls': {'perplexity': 'https://www.perplexity.ai'},
+        'archive': {'directory': str(tmp_path / 'archive')},
+        'generation': {'race_providers': [], 'shards': 0},
+        'scheduler': {}
+    }
+    generator = CodeGenerator(FakeBrave({'generation_probe': 1}), config, FakeLogger())
+
+    with pytest.raises(RoundTripBudgetExceeded):
+        generator._is_still_generating()
+
+    generator.brave.profiler.budgets['generation_probe'] = 2
+    assert generator._is_still_generating() is True
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from core.scheduler import JobScheduler, QuotaExceeded, backoff_delay
+
+
+def make_scheduler(tmp_path, **account):
+    settings = dict({'provider': 'perplexity', 'name': 'default', 'max_concurrent': 5}, **account)
+    return JobScheduler([settings], max_attempts=3, backoff_base=0.01, backoff_cap=0.05,
+                        quota_reset_seconds=0.2, state_path=tmp_path / 'state.json')
+
+
+def test_running_out_of_quota_parks_account_until_reset(tmp_path):
+    scheduler = make_scheduler(tmp_path, quota=2)
+    for index in range(3):
+        scheduler.submit({'prompt': str(index)})
+
+    first, account = scheduler.acquire(timeout=1)
+    second, _ = scheduler.acquire(timeout=1)
+    assert first and second
+    assert account['remaining'] == 0
+    assert account['quota_reset_at'] > time.time()
+
+    # No quota left: a bounded wait gives up instead of blocking forever
+    assert scheduler.acquire(timeout=0.05) == (None, None)
+
+    # Once the quota window has passed the third job runs
+    start = time.time()
+    third, _ = scheduler.acquire(timeout=2)
+    assert third is not None
+    assert time.time() - start < 1
+
+
+def test_quota_exhaustion_does_not_hang_run(tmp_path):
+    scheduler = make_scheduler(tmp_path, quota=2)
+    for index in range(3):
+        scheduler.submit({'prompt': str(index)})
+
+    jobs = scheduler.run(lambda job, account: 'ok', workers=2)
+    assert [job['status'] for job in jobs] == ['done'] * 3
+
+
+def test_quota_exceeded_gives_attempt_back(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    job_id = scheduler.submit({'prompt': 'x'})
+    job, account = scheduler.acquire(timeout=1)
+    scheduler.fail(job, account, QuotaExceeded(reset_after=0.1))
+
+    assert scheduler.jobs[job_id]['status'] == 'queued'
+    assert scheduler.jobs[job_id]['attempts'] == 0
+    assert account['remaining'] == 0
+    # Running out of quota does not make the account look unreliable
+    assert account['failed'] == 0
+    assert list(account['recent']) == []
+
+
+def test_completion_without_a_fresh_reading_keeps_the_account_parked(tmp_path):
+    scheduler = make_scheduler(tmp_path, quota=1)
+    scheduler.submit({'prompt': 'a'})
+    scheduler.submit({'prompt': 'b'})
+
+    job, account = scheduler.acquire(timeout=1)
+    scheduler.complete(job, account, 'ok', remaining=None)
+
+    assert account['remaining'] == 0
+    assert scheduler.acquire(timeout=0.05) == (None, None)
+
+
+def test_failed_job_is_retried_with_backoff_then_given_up(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    job_id = scheduler.submit({'prompt': 'x'})
+
+    job, account = scheduler.acquire(timeout=1)
+    before = time.time()
+    scheduler.fail(job, account, RuntimeError('boom'))
+    assert job['status'] == 'queued'
+    assert job['not_before'] >= before
+
+    for _ in range(2):
+        job, account = scheduler.acquire(timeout=1)
+        scheduler.fail(job, account, RuntimeError('boom'))
+    assert scheduler.jobs[job_id]['status'] == 'failed'
+    assert scheduler.jobs[job_id]['attempts'] == 3
+
+
+def test_repeated_failures_cool_the_account_down(tmp_path):
+    scheduler = make_scheduler(tmp_path)
+    for index in range(3):
+        scheduler.submit({'prompt': str(index)})
+    for _ in range(3):
+        job, account = scheduler.acquire(timeout=1)
+        scheduler.fail(job, account, RuntimeError('boom'))
+    assert account['cooldown_until'] > time.time() - 0.05
+
+
+@pytest.mark.parametrize('attempt', [0, 1, 5, 20])
+def test_backoff_delay_stays_within_bounds(attempt):
+    for _ in range(50):
+        delay = backoff_delay(attempt, base=2.0, cap=30.0)
+        assert 1.0 <= delay <= min(30.0, 2.0 * 2 ** attempt)
@@ -0,0 +1,95 @@
+from core.sharded_generation import group_plan, merge_shards, parse_component_plan
+
+PLAN = [{'name': name, 'file_path': f'src/components/{name}.jsx'} for name in ('Header', 'Hero', 'Footer')]
+
+
+def block(name, body='return <div className="p-4" />;', file_path=None):
+    file_path = file_path or f'src/components/{name}.jsx'
+    return f"// Component: {name}\n// File: {file_path}\nexport default function {name}() {{\n  {body}\n}}\n"
+
+
+def test_plan_keeps_the_first_entry_per_file_path():
+    text = ("Here is the plan:\n// Component: Header // File: src/components/Header.jsx\n"
+            "- Component: Hero, File: src/components/Hero.jsx\n"
+            "// Component: HeaderAgain // File: src/components/Header.jsx\n"
+            "// Component: Styles // File: src/index.css\n"
+            "npm i framer-motion")
+
+    assert parse_component_plan(text) == [
+        {'name': 'Header', 'file_path': 'src/components/Header.jsx'},
+        {'name': 'Hero', 'file_path': 'src/components/Hero.jsx'},
+    ]
+
+
+def test_groups_are_contiguous_and_balanced():
+    plan = [{'name': f'C{n}', 'file_path': f'src/C{n}.jsx'} for n in range(7)]
+
+    groups = group_plan(plan, 3)
+
+    assert [len(group) for group in groups] == [3, 2, 2]
+    assert [item for group in groups for item in group] == plan
+    assert group_plan(plan[:2], 4) == [[plan[0]], [plan[1]]]
+
+
+def test_owner_wins_over_a_longer_copy_from_another_shard():
+    groups = group_plan(PLAN, 3)
+    answers = {0: block('Header'),
+               1: block('Hero') + block('Header', 'return <header>a much longer inline copy</header>;'),
+               2: block('Footer')}
+
+    content, report = merge_shards(answers, groups)
+
+    assert report == {'components': 3, 'conflicts': ['src/components/Header.jsx'], 'missing': []}
+    assert 'inline copy' not in content
+    assert content.index('Header.jsx') < content.index('Hero.jsx') < content.index('Footer.jsx')
+
+
+def test_longest_wins_between_equal_claims():
+    groups = group_plan(PLAN, 3)
+    helper = 'src/utils/format.js'
+    answers = {0: block('Header') + block('format', 'return String(value).trim();', helper),
+               1: block('Hero') + block('format', 'return Number(value).toFixed(2);', helper),
+               2: block('Footer')}
+
+    content, report = merge_shards(answers, groups)
+
+    assert report['conflicts'] == [helper]
+    assert 'toFixed' in content
+    assert content.rstrip().endswith('}') and content.index(helper) > content.index('Footer.jsx')
+
+
+def test_missing_files_are_reported():
+    groups = group_plan(PLAN, 3)
+
+    _content, report = merge_shards({0: block('Header'), 2: block('Footer')}, groups)
+
+    assert report == {'components': 2, 'conflicts': [], 'missing': ['src/components/Hero.jsx']}
+
+
+def test_retry_group_takes_ownership_of_the_files_it_requests():
+    groups = group_plan(PLAN, 3)
+    answers = {0: block('Header') + block('Hero', 'return <section>a longer copy from the header shard</section>;'),
+               2: block('Footer')}
+    _content, report = merge_shards(answers, groups)
+    assert report['missing'] == []
+
+    # Hero's own shard failed; once the retry shard delivers it, the retry's version wins
+    retry_group = [PLAN[1]]
+    answers[3] = block('Hero', 'return <section />;')
+    content, report = merge_shards(answers, groups + [retry_group])
+
+    assert 'header shard' not in content
+    assert 'return <section />;' in content
+    assert report['conflicts'] == ['src/components/Hero.jsx']
+
+
+def test_install_lines_are_merged_once_ahead_of_the_code():
+    groups = group_plan(PLAN, 3)
+    answers = {0: "npm i framer-motion\n" + block('Header'),
+               1: "  npm i framer-motion  \nnpm install react-icons\n" + block('Hero'),
+               2: block('Footer')}
+
+    content, _report = merge_shards(answers, groups)
+
+    assert content.startswith("npm i framer-motion\n\nnpm install react-icons\n\n// Component: Header")
+    assert content.count('framer-motion') == 1